@@ -0,0 +1,347 @@
+# benchmarks/orchestration_bench.py
+"""오케스트레이션 오버헤드 벤치마크.
+
+합성 DAG(chain / fan / diamond / layered)를 만들어 no-op, log-heavy 스텝으로
+PipelineBuilder.run_all_parallel 을 실제로 돌리고 아래 지표를 JSON으로 남긴다.
+
+- 스텝별 launch latency (워커 진입 -> 자식 프로세스 첫 줄)
+- scheduling delay (부모 완료 -> 워커 진입)
+- _log_stream 로그 라인 처리량
+- 오케스트레이터 peak RSS
+- makespan vs ideal (max(critical path, total work / workers))
+
+사용 예:
+    python -m benchmarks.orchestration_bench --sizes 10,100,1000 --output bench_results
+    python -m benchmarks.orchestration_bench --sizes 10,100,1000,10000 --baseline bench_results/prev.json
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import SHAPES, STEP_KINDS, critical_path, generate_dag, write_synthetic_pipeline
+from pipeline.logger import release_logger
+from pipeline.config_loader import ConfigLoader
+from pipeline.pipeline_builder import PipelineBuilder
+from pipeline.step_runner import StepRunner
+
+SCHEMA_VERSION = 1
+
+
+class _RssSampler:
+    """백그라운드에서 /proc/self/status 의 VmRSS 를 주기적으로 읽어 peak 기록"""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current_kb() -> int:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        # /proc 이 없는 환경: 프로세스 생애 최대값으로 대체 (Linux 기준 KB)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, self.current_kb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_kb = self.current_kb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_kb = max(self.peak_kb, self.current_kb())
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    data = sorted(values)
+
+    def pct(p):
+        return data[min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))]
+
+    return {
+        "count": len(data),
+        "mean": sum(data) / len(data),
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": data[-1],
+    }
+
+
+def _quiet_logger(name: str, log_file: str) -> logging.Logger:
+    """콘솔 출력 없이 파일에만 쓰는 로거 (벤치마크 출력 오염 방지)"""
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    fh = logging.FileHandler(log_file)
+    fh.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(fh)
+    return logger
+
+
+def _release_loggers(names) -> None:
+    """시나리오 간 로거/파일 핸들 정리 (같은 스텝 이름의 로거 재사용 방지)"""
+    for name in names:
+        release_logger(logging.getLogger(name))
+
+
+def _raise_fd_limit() -> None:
+    # 스텝 로거마다 FileHandler 를 열기 때문에 10k 노드에서는 soft limit 을 올려야 한다
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _parse_child_times(stdout: str):
+    start = end = None
+    for line in stdout.splitlines():
+        if line.startswith("BENCH_START "):
+            start = float(line.split()[1])
+        elif line.startswith("BENCH_END "):
+            end = float(line.split()[1])
+    return start, end
+
+
+def run_scenario(shape: str, num_nodes: int, step_kind: str, max_workers: int,
+                 log_lines: int, seed: int, workdir: str, console_logs: bool = False) -> dict:
+    dag = generate_dag(shape, num_nodes, seed=seed)
+    root = os.path.join(workdir, f"{shape}_{num_nodes}_{step_kind}")
+    config_path = write_synthetic_pipeline(root, dag, step_kind=step_kind, log_lines=log_lines)
+
+    bench_logger = _quiet_logger(f"bench.{shape}.{num_nodes}.{step_kind}", os.path.join(root, "logs", "bench.log"))
+
+    with _RssSampler() as rss:
+        t_build = time.perf_counter()
+        builder = PipelineBuilder(ConfigLoader(config_path), logger=bench_logger, target_date="20250101")
+        build_s = time.perf_counter() - t_build
+
+        if not console_logs:
+            # 스텝 로거의 콘솔 핸들러 제거 (파일 기록 경로는 그대로 측정)
+            for step in builder.steps:
+                for handler in list(step.logger.handlers):
+                    if type(handler) is logging.StreamHandler:
+                        step.logger.removeHandler(handler)
+
+        # 워커 진입/복귀 시각 기록용 래핑 (StepRunner 자체는 수정하지 않음)
+        timings = {}
+        for step in builder.steps:
+            original_run = step.run
+
+            def timed_run(mode="subprocess", _name=step.name, _run=original_run):
+                entered = time.time()
+                result = _run(mode)
+                timings[_name] = {"entered": entered, "returned": time.time(), "result": result}
+                return result
+
+            step.run = timed_run
+
+        t0 = time.time()
+        builder.run_all_parallel(max_workers=max_workers)
+        makespan = time.time() - t0
+
+    launch_ms, sched_ms, durations = [], [], {}
+    for name, t in timings.items():
+        child_start, child_end = _parse_child_times(t["result"].get("stdout", ""))
+        if child_start is not None:
+            launch_ms.append((child_start - t["entered"]) * 1000)
+        if child_start is not None and child_end is not None:
+            durations[name] = child_end - child_start
+        ready_at = max((timings[p]["returned"] for p in dag[name] if p in timings), default=t0)
+        sched_ms.append(max(0.0, t["entered"] - ready_at) * 1000)
+
+    total_work = sum(durations.values())
+    ideal = max(critical_path(dag, durations), total_work / max_workers)
+    log_total = len(dag) * log_lines if step_kind == "log_heavy" else 2 * len(dag)
+
+    _release_loggers(list(dag) + [bench_logger.name])
+
+    return {
+        "shape": shape,
+        "nodes": len(dag),
+        "edges": sum(len(p) for p in dag.values()),
+        "step_kind": step_kind,
+        "max_workers": max_workers,
+        "completed": len(timings),
+        "failed": len(builder.failed_steps),
+        "skipped": len(builder.skipped_steps),
+        "build_s": build_s,
+        "makespan_s": makespan,
+        "ideal_s": ideal,
+        "overhead_s": makespan - ideal,
+        "efficiency": (ideal / makespan) if makespan > 0 else None,
+        "launch_latency_ms": _percentiles(launch_ms),
+        "scheduling_delay_ms": _percentiles(sched_ms),
+        "log_lines": log_total,
+        "log_lines_per_s": log_total / makespan if makespan > 0 else None,
+        "peak_rss_mb": rss.peak_kb / 1024,
+    }
+
+
+def bench_log_stream(num_lines: int, workdir: str) -> dict:
+    """_log_stream 단독 처리량: 자식 프로세스 없이 파이프 대신 StringIO 로 주입"""
+    lines = []
+    for i in range(num_lines):
+        m = i % 10
+        if m < 6:
+            lines.append(f"[INFO] processed batch {i} rows=1024")
+        elif m < 8:
+            lines.append(f"plain progress line {i} without level")
+        elif m == 8:
+            lines.append(f"[WARNING] slow partition {i}")
+        else:
+            lines.append(f"retrying request {i} failed")
+    payload = "\n".join(lines) + "\n"
+
+    logger = _quiet_logger("bench.log_stream", os.path.join(workdir, "log_stream", "step.log"))
+    runner = StepRunner(name="log_stream", script_path="-", config_path="-", logger=logger)
+
+    collector = []
+    t0 = time.perf_counter()
+    runner._log_stream(io.StringIO(payload), collector)
+    elapsed = time.perf_counter() - t0
+    _release_loggers([logger.name])
+
+    return {
+        "lines": len(collector),
+        "elapsed_s": elapsed,
+        "lines_per_s": len(collector) / elapsed if elapsed > 0 else None,
+    }
+
+
+def _scenario_key(s: dict) -> str:
+    return f"{s['shape']}/{s['nodes']}/{s['step_kind']}/w{s['max_workers']}"
+
+
+def compare(current: dict, baseline: dict) -> list:
+    """baseline JSON 대비 makespan / overhead / launch p50 변화율"""
+    base = {_scenario_key(s): s for s in baseline.get("scenarios", [])}
+    rows = []
+    for s in current.get("scenarios", []):
+        b = base.get(_scenario_key(s))
+        if not b:
+            continue
+        row = {"scenario": _scenario_key(s)}
+        for field, getter in (
+            ("makespan_s", lambda x: x["makespan_s"]),
+            ("overhead_s", lambda x: x["overhead_s"]),
+            ("launch_p50_ms", lambda x: x["launch_latency_ms"].get("p50")),
+            ("peak_rss_mb", lambda x: x["peak_rss_mb"]),
+        ):
+            cur, old = getter(s), getter(b)
+            row[field] = {"baseline": old, "current": cur,
+                          "change": ((cur - old) / old) if old else None}
+        rows.append(row)
+    return rows
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _csv(value: str, cast=str) -> list:
+    return [cast(v) for v in value.split(",") if v.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Orchestration overhead benchmark")
+    parser.add_argument('--shapes', type=str, default=",".join(SHAPES))
+    parser.add_argument('--sizes', type=str, default="10,100,1000", help='Node counts, e.g. 10,100,1000,10000')
+    parser.add_argument('--step_kinds', type=str, default=",".join(STEP_KINDS))
+    parser.add_argument('--max_workers', type=int, default=4)
+    parser.add_argument('--log_lines', type=int, default=1000, help='Lines per log-heavy step')
+    parser.add_argument('--log_stream_lines', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default="bench_results", help='Directory for result JSON')
+    parser.add_argument('--baseline', type=str, help='Previous result JSON to compare against')
+    parser.add_argument('--console_logs', action='store_true', help='Keep step console handlers while measuring')
+    parser.add_argument('--keep_workdir', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    _raise_fd_limit()
+
+    workdir = tempfile.mkdtemp(prefix="orch_bench_")
+    results = {
+        "schema_version": SCHEMA_VERSION,
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "log_stream": bench_log_stream(args.log_stream_lines, workdir),
+        "scenarios": [],
+    }
+    print(f"[log_stream] {results['log_stream']['lines_per_s']:.0f} lines/s", flush=True)
+
+    for size in _csv(args.sizes, int):
+        for shape in _csv(args.shapes):
+            for kind in _csv(args.step_kinds):
+                s = run_scenario(shape, size, kind, args.max_workers, args.log_lines, args.seed, workdir,
+                                 console_logs=args.console_logs)
+                results["scenarios"].append(s)
+                print(
+                    f"[{_scenario_key(s)}] makespan={s['makespan_s']:.2f}s ideal={s['ideal_s']:.2f}s "
+                    f"launch_p50={s['launch_latency_ms'].get('p50', 0):.1f}ms "
+                    f"sched_p95={s['scheduling_delay_ms'].get('p95', 0):.1f}ms "
+                    f"rss={s['peak_rss_mb']:.1f}MB",
+                    flush=True,
+                )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["comparison"] = compare(results, json.load(f))
+        for row in results["comparison"]:
+            print(f"[compare] {row['scenario']} makespan change={row['makespan_s']['change']}", flush=True)
+
+    os.makedirs(args.output, exist_ok=True)
+    out_path = os.path.join(args.output, f"orchestration-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"📊 Results written to '{out_path}'")
+
+    if not args.keep_workdir:
+        import shutil
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# benchmarks/preprocess_bench.py
+"""피처 변환 처리량 벤치마크: NumPy 벡터화(steps.preprocess.features) vs 행 단위 파이썬 구현.
+
+합성 고객 데이터(cust_id, age, gender, purchase_date)를 만들어 fit / transform 을 각각 재고,
+두 구현 결과가 같은지도 함께 확인한다.
+
+사용 예:
+    python -m benchmarks.preprocess_bench --rows 10000,100000,1000000 --output bench_results
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.orchestration_bench import _csv, _git_revision
+from steps.preprocess.features import FeatureTransformer, data_fingerprint
+
+SCHEMA_VERSION = 1
+
+
+def make_columns(rows: int, seed: int = 0, missing_rate: float = 0.02) -> dict:
+    """ETL 결과를 흉내낸 컬럼 (문자열 날짜, 대소문자/공백 섞인 성별, 일부 결측)"""
+    rng = np.random.default_rng(seed)
+    gender = rng.choice(np.array(["M", "F", "m", " f", "U"], dtype=object), rows)
+    age = rng.integers(15, 90, rows).astype(np.float64)
+    dates = (np.datetime64("2023-01-01") + rng.integers(0, 730, rows)).astype(str).astype(object)
+    for col, empty in ((gender, None), (age, np.nan), (dates, None)):
+        col[rng.random(rows) < missing_rate] = empty
+    return {"cust_id": np.arange(rows), "age": age, "gender": gender, "purchase_date": dates}
+
+
+# ---- 행 단위 기준 구현 (벡터화 이전 방식) ----
+def naive_fit(columns: dict, age_bins) -> dict:
+    genders, ages, dates = set(), [], []
+    for g, a, d in zip(columns["gender"], columns["age"], columns["purchase_date"]):
+        if g is not None:
+            genders.add(g.strip().upper())
+        if a == a:
+            ages.append(a)
+        if d:
+            dates.append(datetime.strptime(d, "%Y-%m-%d").date())
+    ages.sort()
+    mid = len(ages) // 2
+    mean = sum(ages) / len(ages)
+    std = (sum((a - mean) ** 2 for a in ages) / len(ages)) ** 0.5
+    return {
+        "gender_vocab": sorted(genders - {""}),
+        "age_fill": ages[mid] if len(ages) % 2 else (ages[mid - 1] + ages[mid]) / 2,
+        "age_mean": mean,
+        "age_std": std or 1.0,
+        "age_bins": list(age_bins),
+        "date_ref": min(dates),
+    }
+
+
+def naive_transform(columns: dict, state: dict) -> list:
+    out = []
+    vocab = state["gender_vocab"]
+    for g, a, d in zip(columns["gender"], columns["age"], columns["purchase_date"]):
+        row = {}
+        g = g.strip().upper() if g is not None else ""
+        for v in vocab:
+            row[f"gender_{v}"] = 1.0 if g == v else 0.0
+        row["gender_unknown"] = 0.0 if g in vocab else 1.0
+
+        missing = a != a
+        a = state["age_fill"] if missing else a
+        row["age_scaled"] = (a - state["age_mean"]) / state["age_std"]
+        row["age_bin"] = sum(1 for edge in state["age_bins"][1:-1] if a >= edge)
+        row["age_missing"] = 1.0 if missing else 0.0
+
+        if d:
+            day = datetime.strptime(d, "%Y-%m-%d").date()
+            row.update(purchase_dow=day.weekday(), purchase_month=day.month, purchase_day=day.day,
+                       purchase_is_weekend=1.0 if day.weekday() >= 5 else 0.0,
+                       purchase_days_since_ref=(day - state["date_ref"]).days)
+        else:
+            row.update(purchase_dow=-1, purchase_month=-1, purchase_day=-1,
+                       purchase_is_weekend=0.0, purchase_days_since_ref=0)
+        out.append(row)
+    return out
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def run_case(rows: int, chunk_size: int, seed: int, naive_limit: int) -> dict:
+    columns = make_columns(rows, seed)
+    transformer = FeatureTransformer(chunk_size=chunk_size)
+    _, fit_s = _timed(transformer.fit, columns)
+    features, transform_s = _timed(transformer.transform, columns)
+    _, fingerprint_s = _timed(data_fingerprint, columns)
+
+    case = {
+        "rows": rows,
+        "chunk_size": chunk_size,
+        "vectorized": {
+            "fit_s": fit_s, "transform_s": transform_s, "fingerprint_s": fingerprint_s,
+            "transform_rows_per_s": rows / transform_s if transform_s else None,
+        },
+    }
+
+    # 행 단위 구현은 느리므로 naive_limit 이하 크기에서만 측정
+    if rows <= naive_limit:
+        state, naive_fit_s = _timed(naive_fit, columns, transformer.age_bins)
+        naive_rows, naive_transform_s = _timed(naive_transform, columns, state)
+        case["naive"] = {
+            "fit_s": naive_fit_s, "transform_s": naive_transform_s,
+            "transform_rows_per_s": rows / naive_transform_s if naive_transform_s else None,
+        }
+        case["speedup"] = {
+            "fit": naive_fit_s / fit_s if fit_s else None,
+            "transform": naive_transform_s / transform_s if transform_s else None,
+        }
+        case["outputs_match"] = all(
+            np.allclose(features[name], [r[name] for r in naive_rows], atol=1e-4)
+            for name in transformer.feature_names
+        )
+    return case
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Preprocessing throughput benchmark")
+    parser.add_argument('--rows', type=str, default="10000,100000,1000000")
+    parser.add_argument('--chunk_size', type=int, default=262144)
+    parser.add_argument('--naive_limit', type=int, default=1000000, help='Largest size to run the per-row baseline on')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default="bench_results", help='Directory for result JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    results = {
+        "schema_version": SCHEMA_VERSION,
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "cases": [],
+    }
+    for rows in _csv(args.rows, int):
+        case = run_case(rows, args.chunk_size, args.seed, args.naive_limit)
+        results["cases"].append(case)
+        line = f"[rows={rows}] vectorized={case['vectorized']['transform_rows_per_s']:.0f} rows/s"
+        if "naive" in case:
+            line += (f" naive={case['naive']['transform_rows_per_s']:.0f} rows/s "
+                     f"speedup={case['speedup']['transform']:.1f}x match={case['outputs_match']}")
+        print(line, flush=True)
+
+    os.makedirs(args.output, exist_ok=True)
+    out_path = os.path.join(args.output, f"preprocess-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"📊 Results written to '{out_path}'")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/synthetic.py
+
+import os
+import random
+import textwrap
+import yaml
+
+SHAPES = ("chain", "fan", "diamond", "layered")
+STEP_KINDS = ("noop", "log_heavy")
+
+
+def _step_name(i: int) -> str:
+    return f"s{i:05d}"
+
+
+def generate_dag(shape: str, num_nodes: int, seed: int = 0) -> dict:
+    """합성 DAG 생성: {step_name: [parents]}
+
+    - chain: s0 -> s1 -> ... -> sN
+    - fan: 루트 하나에서 N-1개 자식으로 펼쳐짐
+    - diamond: source -> (N-2개 병렬) -> sink
+    - layered: 약 sqrt(N)개 레이어, 각 노드는 이전 레이어에서 1~3개 부모 선택
+    """
+    if num_nodes < 1:
+        raise ValueError("num_nodes must be >= 1")
+
+    names = [_step_name(i) for i in range(num_nodes)]
+
+    if shape == "chain":
+        return {name: ([names[i - 1]] if i else []) for i, name in enumerate(names)}
+
+    if shape == "fan":
+        return {name: ([names[0]] if i else []) for i, name in enumerate(names)}
+
+    if shape == "diamond":
+        if num_nodes < 3:
+            return generate_dag("chain", num_nodes, seed)
+        source, middle, sink = names[0], names[1:-1], names[-1]
+        dag = {source: []}
+        dag.update({name: [source] for name in middle})
+        dag[sink] = list(middle)
+        return dag
+
+    if shape == "layered":
+        rng = random.Random(seed)
+        num_layers = max(1, int(num_nodes ** 0.5))
+        layers = [[] for _ in range(num_layers)]
+        for i, name in enumerate(names):
+            # 첫 레이어는 항상 채우고 나머지는 균등 분배
+            layers[0 if i == 0 else rng.randrange(num_layers)].append(name)
+        layers = [layer for layer in layers if layer]
+
+        dag = {}
+        for idx, layer in enumerate(layers):
+            for name in layer:
+                if idx == 0:
+                    dag[name] = []
+                    continue
+                # 대부분 바로 이전 레이어에서, 가끔 더 먼 레이어에서 부모 선택
+                candidates = layers[idx - 1] if rng.random() < 0.8 else [
+                    n for layer_ in layers[:idx] for n in layer_
+                ]
+                k = min(len(candidates), rng.randint(1, 3))
+                dag[name] = sorted(rng.sample(candidates, k))
+        # 이름 순서 유지 (등록 순서가 결과에 영향 주지 않도록)
+        return {name: dag[name] for name in names}
+
+    raise ValueError(f"Unknown DAG shape '{shape}'. Choose from {SHAPES}.")
+
+
+def critical_path(dag: dict, durations: dict) -> float:
+    """durations 기준 최장 경로 길이 (위상 순서는 dag 삽입 순서가 보장)"""
+    finish = {}
+    for name in _topological_order(dag):
+        start = max((finish[p] for p in dag[name]), default=0.0)
+        finish[name] = start + durations.get(name, 0.0)
+    return max(finish.values(), default=0.0)
+
+
+def _topological_order(dag: dict) -> list:
+    children = {name: [] for name in dag}
+    in_degree = {name: len(parents) for name, parents in dag.items()}
+    for name, parents in dag.items():
+        for p in parents:
+            children[p].append(name)
+
+    order = []
+    stack = [name for name, deg in in_degree.items() if deg == 0]
+    while stack:
+        cur = stack.pop()
+        order.append(cur)
+        for child in children[cur]:
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                stack.append(child)
+
+    if len(order) != len(dag):
+        raise ValueError("Synthetic DAG contains a cycle.")
+    return order
+
+
+_NOOP_SCRIPT = """\
+# synthetic no-op step (benchmark)
+import time
+print(f"BENCH_START {time.time():.6f}", flush=True)
+print(f"BENCH_END {time.time():.6f}", flush=True)
+"""
+
+_LOG_HEAVY_SCRIPT = """\
+# synthetic log-heavy step (benchmark)
+import sys
+import time
+
+LINES = {log_lines}
+
+print(f"BENCH_START {{time.time():.6f}}", flush=True)
+out = sys.stdout
+for i in range(LINES):
+    m = i % 10
+    if m < 6:
+        out.write(f"[INFO] processed batch {{i}} rows=1024\\n")
+    elif m < 8:
+        out.write(f"plain progress line {{i}} without level\\n")
+    elif m == 8:
+        out.write(f"[WARNING] slow partition {{i}}\\n")
+    else:
+        sys.stderr.write(f"retrying request {{i}}\\n")
+out.flush()
+print(f"BENCH_END {{time.time():.6f}}", flush=True)
+"""
+
+
+def write_synthetic_pipeline(root: str, dag: dict, step_kind: str = "noop", log_lines: int = 1000) -> str:
+    """root 아래에 config.yaml + 스텝 스크립트를 생성하고 config 경로 반환"""
+    if step_kind not in STEP_KINDS:
+        raise ValueError(f"Unknown step kind '{step_kind}'. Choose from {STEP_KINDS}.")
+
+    os.makedirs(root, exist_ok=True)
+    script_path = os.path.join(root, f"step_{step_kind}.py")
+    with open(script_path, "w") as f:
+        if step_kind == "noop":
+            f.write(_NOOP_SCRIPT)
+        else:
+            f.write(textwrap.dedent(_LOG_HEAVY_SCRIPT.format(log_lines=log_lines)))
+
+    params_path = os.path.join(root, "step_params.yaml")
+    with open(params_path, "w") as f:
+        yaml.safe_dump({"name": "synthetic", "config": {}}, f)
+
+    config = {
+        "name": "synthetic_benchmark",
+        "options": {"force": False, "checkpoint_dir": os.path.join(root, "state", "checkpoints")},
+        "global": {"env": "bench"},
+        "logging": {"log_file": os.path.join(root, "logs", "pipeline.log"), "level": "INFO"},
+        "dag": {
+            name: {"script": script_path, "config": params_path, "depends_on": parents}
+            for name, parents in dag.items()
+        },
+    }
+    config_path = os.path.join(root, "config.yaml")
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    return config_path
@@ -1,10 +1,13 @@
 # main.py
 
 import argparse
+import json
 import sys
 from pipeline.config_loader import ConfigLoader
 from pipeline.pipeline_builder import PipelineBuilder
 from pipeline.logger import setup_logger
+from pipeline.metrics import RunMetrics, MetricsServer
+from pipeline.daemon import PipelineDaemon, submit_and_wait
 
 def parse_args():
     parser = argparse.ArgumentParser(description="ML Workflow")
@@ -13,6 +16,26 @@ def parse_args():
     parser.add_argument('--target_date', type=str, help='Run only specific date')
     parser.add_argument('--parallel', action='store_true', default=True)
     parser.add_argument('--visualize_dag', action='store_true', default=True, help='Save DAG as an image')
+    parser.add_argument('--max_workers', type=int, default=None, help='Concurrent steps (default: options.max_workers or 4)')
+    parser.add_argument('--adaptive_workers', action='store_true', default=None,
+                        help='Adapt concurrency to host load (bounds: options.adaptive_workers)')
+    parser.add_argument('--daemon', action='store_true', help='Run as a long-lived daemon accepting run requests')
+    parser.add_argument('--submit', action='store_true', help='Submit this run to a running daemon and wait for it')
+    parser.add_argument('--no_wait', action='store_true', help='With --submit, return right after the run is accepted')
+    parser.add_argument('--daemon_socket', type=str, default=None, help='Daemon unix socket (default: daemon.socket)')
+    parser.add_argument('--spool_dir', type=str, default=None, help='Daemon spool directory (default: daemon.spool_dir)')
+    parser.add_argument('--metrics_port', '--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics (/metrics) and DAG status (/status) on this port')
+    parser.add_argument('--plan', action='store_true', help='Simulate the run from history/estimates without executing')
+    parser.add_argument('--plan_backfill', type=int, default=1, help='With --plan, number of target dates run together')
+    parser.add_argument('--plan_trials', type=int, default=20, help='With --plan, Monte Carlo trials over history samples')
+    parser.add_argument('--plan_output', type=str, default=None, help='With --plan, write the report as JSON')
+    parser.add_argument('--full-refresh', '--full_refresh', dest='full_refresh', action='store_true',
+                        help='Ignore incremental watermarks and reprocess everything (state: options.watermark_db)')
+    parser.add_argument('--profile', type=str, nargs='?', const='all', default=None,
+                        help='Profile all steps, or only the given comma-separated steps (output: <run dir>/profiles)')
+    parser.add_argument('--profiler', type=str, choices=['cprofile', 'sample'], default=None,
+                        help='With --profile, profiler to use (default: options.profile.profiler or cprofile)')
 
     return parser.parse_args()
 
@@ -23,9 +46,64 @@ if __name__ == "__main__":
     config_loader = ConfigLoader(args.config_file)
     project_name = config_loader.config_data.get("name", "main")
 
-    logger = setup_logger(project_name, log_file=config_loader.get_log_file(), level=config_loader.get_log_level())
+    daemon_cfg = config_loader.config_data.get("daemon", {}) or {}
+    socket_path = args.daemon_socket or daemon_cfg.get("socket", "/tmp/ml_pipeline.sock")
 
-    builder = PipelineBuilder(config_loader, target_date=args.target_date, selected_step=args.step)
+    if args.submit:
+        # 데몬에 run 요청만 보내는 thin client (설정 파싱/워커는 데몬이 보유)
+        logger = setup_logger(f"{project_name}-client", log_file=None, level=config_loader.get_log_level())
+        request = {"config": args.config_file, "target_date": args.target_date}
+        if args.step:
+            request["steps"] = [s.strip() for s in args.step.split(",") if s.strip()]
+        if args.full_refresh:
+            request["full_refresh"] = True
+        status = submit_and_wait(socket_path, request, wait_for_result=not args.no_wait, logger=logger)
+        if status.get("failed"):
+            logger.error(f"❌ Failed steps: {', '.join(status['failed'])}")
+        sys.exit(1 if status["state"] == "failed" else 0)
+
+    if args.daemon:
+        options = config_loader.config_data.get("options", {}) or {}
+        daemon = PipelineDaemon(
+            max_workers=args.max_workers or int(daemon_cfg.get("max_workers", options.get("max_workers", 4))),
+            socket_path=socket_path,
+            spool_dir=args.spool_dir or daemon_cfg.get("spool_dir"),
+            history_file=options.get("history_file"),
+            logger=setup_logger(f"{project_name}-daemon", log_file=config_loader.get_log_file(), level=config_loader.get_log_level()),
+        )
+        try:
+            daemon.run_forever()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    # logging.dir 설정 시 logs/<target_date>/<run_id>/ 아래에 run 단위로 로그 분리
+    log_layout = config_loader.get_log_layout(args.target_date)
+    if log_layout:
+        logger = setup_logger(project_name, log_file=log_layout.pipeline_log, level=config_loader.get_log_level(), layout=log_layout)
+        logger.info(f"Run id: {log_layout.run_id} (logs: {log_layout.run_dir})")
+    else:
+        logger = setup_logger(project_name, log_file=config_loader.get_log_file(), level=config_loader.get_log_level())
+
+    metrics = None
+    if args.metrics_port is not None:
+        metrics = RunMetrics()
+        server = MetricsServer(metrics, port=args.metrics_port).start()
+        logger.info(f"📈 Metrics endpoint: http://127.0.0.1:{server.port}/metrics (status: /status)")
+
+    builder = PipelineBuilder(
+        config_loader, target_date=args.target_date, selected_step=args.step,
+        log_layout=log_layout, metrics=metrics, profile=args.profile, profiler=args.profiler,
+        full_refresh=args.full_refresh
+    )
+
+    if args.plan:
+        report = builder.plan(max_workers=args.max_workers, backfill=args.plan_backfill, trials=args.plan_trials)
+        if args.plan_output:
+            with open(args.plan_output, "w") as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"🗺️  Plan written to {args.plan_output}")
+        sys.exit(0)
 
     if args.step:
         if args.step not in builder.get_step_names():
@@ -38,7 +116,7 @@ if __name__ == "__main__":
         sys.exit(0)  # ✅ 여기 추가: 단일 step 실행 후 종료
 
     if args.parallel:
-        builder.run_all_parallel(max_workers=4)
+        builder.run_all_parallel(max_workers=args.max_workers, adaptive=args.adaptive_workers)
     else:
         builder.run_all()
 
@@ -0,0 +1,188 @@
+# pipeline/autoscaler.py
+"""run_all_parallel 의 동시 실행 스텝 수를 호스트 부하에 맞춰 조절.
+
+- 초기값: CPU 수 (affinity, cgroup v1/v2 quota 중 작은 값)를 [min, max] 로 clamp
+- 실행 중: interval 마다 load average / 메모리 압박 / 최근 스텝 CPU 효율을 보고 ±1 조정
+- 모든 판단은 로그로 남긴다 (변경 시 INFO, 유지 시 DEBUG)
+"""
+
+import math
+import os
+import time
+from collections import deque
+from typing import Optional
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """cgroup CPU quota (코어 수). 제한이 없으면 None"""
+    # cgroup v2: "<quota> <period>" 또는 "max <period>"
+    line = _read_first_line("/sys/fs/cgroup/cpu.max")
+    if line:
+        quota, _, period = line.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    # cgroup v1
+    quota = _read_first_line("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period = _read_first_line("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_limit()
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def memory_available_ratio() -> Optional[float]:
+    """MemAvailable / MemTotal (/proc/meminfo 가 없으면 None)"""
+    try:
+        info = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                info[key] = int(rest.split()[0])
+        return info["MemAvailable"] / info["MemTotal"]
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        return None
+
+
+def memory_pressure() -> Optional[float]:
+    """PSI memory 'some avg10' (%). 커널이 PSI 를 지원하지 않으면 None"""
+    line = _read_first_line("/proc/pressure/memory")
+    if not line:
+        return None
+    for part in line.split():
+        if part.startswith("avg10="):
+            return float(part.split("=", 1)[1])
+    return None
+
+
+def load_per_cpu(cpus: int) -> Optional[float]:
+    try:
+        return os.getloadavg()[0] / cpus
+    except (AttributeError, OSError):
+        return None
+
+
+class AdaptiveConcurrency:
+    def __init__(
+        self,
+        logger,
+        min_workers: int = 1,
+        max_workers: int = 16,
+        interval_s: float = 5.0,
+        history=None,
+        high_load: float = 1.5,
+        low_load: float = 0.7,
+        min_mem_available: float = 0.10,
+        max_mem_pressure: float = 10.0,
+        probe=None,
+    ):
+        if min_workers < 1 or max_workers < min_workers:
+            raise ValueError(f"Invalid adaptive worker bounds: min={min_workers}, max={max_workers}")
+        self.logger = logger
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.interval_s = interval_s
+        self.history = history
+        self.high_load = high_load
+        self.low_load = low_load
+        self.min_mem_available = min_mem_available
+        self.max_mem_pressure = max_mem_pressure
+        # 테스트에서 호스트 지표를 대체할 수 있도록 probe 주입 허용
+        self.probe = probe or self._probe_host
+        self.cpus = available_cpus()
+
+        self.limit = None
+        self.decisions = []
+        self._recent = deque(maxlen=20)  # (duration_s, cpu_s) 최근 완료 스텝
+        self._last_eval = 0.0
+
+    def _clamp(self, n: int) -> int:
+        return max(self.min_workers, min(self.max_workers, n))
+
+    def _probe_host(self) -> dict:
+        return {
+            "load_per_cpu": load_per_cpu(self.cpus),
+            "mem_available": memory_available_ratio(),
+            "mem_pressure": memory_pressure(),
+        }
+
+    def initial(self) -> int:
+        self.limit = self._clamp(self.cpus)
+        self._log_decision(None, self.limit, f"initial from cpus={self.cpus} (affinity/cgroup quota)")
+        self._last_eval = time.monotonic()
+        return self.limit
+
+    def observe(self, result: dict):
+        """완료된 스텝의 wall/CPU 시간 반영 (StepRunner 결과의 duration_s/cpu_s)"""
+        if result.get("duration_s") and result.get("cpu_s") is not None:
+            self._recent.append((result["duration_s"], result["cpu_s"]))
+
+    def cpu_efficiency(self) -> Optional[float]:
+        wall = sum(d for d, _ in self._recent)
+        if wall > 0:
+            return sum(c for _, c in self._recent) / wall
+        # 이번 run 에서 아직 완료된 스텝이 없으면 과거 이력 사용
+        return self.history.cpu_efficiency() if self.history else None
+
+    def adjust(self, running: int, backlog: int, force: bool = False) -> int:
+        """interval 이 지났으면 지표를 보고 limit 를 ±1 조정"""
+        now = time.monotonic()
+        if not force and now - self._last_eval < self.interval_s:
+            return self.limit
+        self._last_eval = now
+
+        host = self.probe()
+        eff = self.cpu_efficiency()
+        load, mem_avail, mem_psi = host.get("load_per_cpu"), host.get("mem_available"), host.get("mem_pressure")
+        current = self.limit
+        target, reason = current, "hold"
+
+        if (mem_avail is not None and mem_avail < self.min_mem_available) or \
+                (mem_psi is not None and mem_psi > self.max_mem_pressure):
+            target, reason = current - 1, "memory pressure"
+        elif load is not None and load > self.high_load:
+            target, reason = current - 1, "host overloaded"
+        elif backlog > 0 and running >= current:
+            # 스텝들이 CPU 를 다 쓰지 못하면 (I/O 대기 위주) 코어 수 이상으로 늘려도 된다
+            cpu_bound_cap = self.cpus / eff if eff else self.cpus
+            if (load is None or load < self.low_load) and current < cpu_bound_cap:
+                target, reason = current + 1, "idle capacity with backlog"
+            else:
+                reason = "hold (cpu-bound steps at capacity)"
+
+        target = self._clamp(target)
+        self._log_decision(current, target, reason, load=load, mem_available=mem_avail,
+                           mem_pressure=mem_psi, cpu_efficiency=eff, running=running, backlog=backlog)
+        self.limit = target
+        return target
+
+    def _log_decision(self, old, new, reason, **signals):
+        decision = {"at": time.time(), "from": old, "to": new, "reason": reason, **signals}
+        self.decisions.append(decision)
+        fmt = ", ".join(
+            f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in signals.items()
+        )
+        message = f"🔧 Concurrency {old} -> {new}: {reason}" + (f" ({fmt})" if fmt else "")
+        if old is None or old != new:
+            self.logger.info(message)
+        else:
+            self.logger.debug(message)
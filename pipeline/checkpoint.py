@@ -0,0 +1,79 @@
+# pipeline/checkpoint.py
+"""(스텝 프로세스 쪽) 체크포인트 헬퍼. 재시도된 attempt 가 처음부터 다시 하지 않고 이어서 진행하도록.
+
+StepRunner 가 넘겨주는 환경 변수:
+  PIPELINE_ATTEMPT         현재 attempt 번호 (1부터)
+  PIPELINE_CHECKPOINT_DIR  (run_id, step, target_date) 별로 고정된 디렉토리. 스텝 성공 시 삭제된다
+
+사용 예:
+    state = load_checkpoint("train_state", default={"epoch": 0})
+    for epoch in range(state["epoch"], epochs):
+        ...
+        save_checkpoint("train_state", {"epoch": epoch + 1, "weights": weights})
+
+파이프라인 밖에서 단독 실행하면 체크포인트 디렉토리가 없으므로 save 는 무시되고 load 는 default 를 돌려준다.
+"""
+
+import os
+import pickle
+from contextlib import contextmanager
+from typing import Optional
+
+ATTEMPT_ENV = "PIPELINE_ATTEMPT"
+CHECKPOINT_DIR_ENV = "PIPELINE_CHECKPOINT_DIR"
+
+
+def current_attempt() -> int:
+    return int(os.environ.get(ATTEMPT_ENV, "1"))
+
+
+def is_retry() -> bool:
+    return current_attempt() > 1
+
+
+def checkpoint_dir() -> Optional[str]:
+    return os.environ.get(CHECKPOINT_DIR_ENV) or None
+
+
+def checkpoint_path(name: str) -> Optional[str]:
+    root = checkpoint_dir()
+    return os.path.join(root, name) if root else None
+
+
+@contextmanager
+def atomic_checkpoint(name: str):
+    """체크포인트 파일을 임시 경로에 쓰고 끝나면 원자적으로 교체 (모델 save(path) 류 API 용).
+    yield 값이 None 이면 체크포인트 비활성 상태"""
+    path = checkpoint_path(name)
+    if path is None:
+        yield None
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp.{os.getpid()}"
+    try:
+        yield tmp
+        if not os.path.exists(tmp):
+            raise FileNotFoundError(f"Checkpoint '{name}' was not written to {tmp}; nothing to commit.")
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)  # 중간에 죽어도 이전 체크포인트는 온전히 남는다
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def save_checkpoint(name: str, obj) -> Optional[str]:
+    with atomic_checkpoint(name) as tmp:
+        if tmp is None:
+            return None
+        with open(tmp, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return checkpoint_path(name)
+
+
+def load_checkpoint(name: str, default=None):
+    path = checkpoint_path(name)
+    if path is None or not os.path.exists(path):
+        return default
+    with open(path, "rb") as f:
+        return pickle.load(f)
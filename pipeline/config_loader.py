@@ -1,7 +1,9 @@
 # pipeline/config_loader.py
 
+import os
 import yaml
 from steps.settings import GlobalConfig
+from pipeline.logger import RunLogLayout, DEFAULT_MAX_BYTES, DEFAULT_BACKUP_COUNT
 
 class ConfigLoader:
     def __init__(self, config_file: str, validate: bool = True):
@@ -28,15 +30,39 @@ class ConfigLoader:
                 raise ValueError(f"Missing '{field}' section in config file.")
 
     def get_log_file(self, step_name=None) -> str:
-        
+
+        # 오케스트레이터가 띄운 스텝 프로세스는 run/attempt 전용 로그 파일을 받는다
+        if step_name and os.environ.get("PIPELINE_STEP_LOG_FILE"):
+            return os.environ["PIPELINE_STEP_LOG_FILE"]
+
+        # 스텝 전용 파일이 없으면 파이프라인 log_file 로 (설정된 로그 위치 밖에 쓰지 않도록)
+        pipeline_log = self.config_data.get("logging", {}).get("log_file", "logs/pipeline.log")
         if step_name:
-            return self.config_data.get("logging", {}).get(step_name, "logs/pipeline.log")
+            return self.config_data.get("logging", {}).get(step_name, pipeline_log)
         else:
-            return self.config_data.get("logging", {}).get("log_file", "logs/pipeline.log")
+            return pipeline_log
 
     def get_log_level(self) -> str:
         return self.config_data.get("logging", {}).get("level", "INFO")
 
+    def get_log_dir(self):
+        """logging.dir 이 설정되면 run/date 단위 로그 레이아웃 사용"""
+        return self.config_data.get("logging", {}).get("dir")
+
+    def get_log_layout(self, target_date=None, run_id=None):
+        log_dir = self.get_log_dir()
+        if not log_dir:
+            return None
+        logging_cfg = self.config_data.get("logging", {})
+        return RunLogLayout(
+            root=log_dir,
+            target_date=target_date,
+            run_id=run_id,
+            max_bytes=int(logging_cfg.get("max_bytes", DEFAULT_MAX_BYTES)),
+            backup_count=int(logging_cfg.get("backup_count", DEFAULT_BACKUP_COUNT)),
+            compress=bool(logging_cfg.get("compress", True)),
+        )
+
     def get_global_config(self) -> GlobalConfig:
         global_data = self.config_data.get("global")
         if not global_data:
@@ -0,0 +1,417 @@
+# pipeline/daemon.py
+"""장시간 떠 있는 파이프라인 데몬.
+
+- 설정(YAML)과 DAG 구조(load_dag: dag 정규화 + 스텝별 sweep 설정)는 파일 mtime 기준으로 캐시해서
+  run 마다 다시 파싱하지 않는다. 로거/StepRunner 는 run 별 로그 디렉토리/target_date 를 쓰므로 run 마다 만든다.
+- 워커 풀(ThreadPoolExecutor)과 실행 이력(RunHistory)을 모든 run 이 공유한다.
+- 여러 run 의 ready 스텝을 round-robin 으로 꺼내 공정하게 제출한다.
+  (cron 두 개가 각자 워커 4개씩 띄워 박스를 과점유하던 문제 해결)
+
+run 요청 = {"config": ..., "target_date": ..., "steps": [...], "full_refresh": false} (steps 생략 시 전체 DAG)
+
+접수 경로:
+  1) 로컬 unix socket: 한 줄 JSON 요청 -> 한 줄 JSON 응답
+     {"op": "submit", ...} / {"op": "status", "run_id": ...} / {"op": "list"} / {"op": "shutdown"}
+  2) spool 디렉토리: <spool>/incoming/*.jsonl (한 줄 = run 요청 하나)
+     처리된 파일은 <spool>/processed/ 로 이동, run 상태는 <spool>/status/<run_id>.json
+"""
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Optional
+
+from pipeline.config_loader import ConfigLoader
+from pipeline.history import RunHistory
+from pipeline.logger import new_run_id, release_logger, setup_logger
+from pipeline.pipeline_builder import PipelineBuilder, _run_step_wrapper, load_dag
+from pipeline.pools import ConcurrencyPools
+from pipeline.sensors import SensorManager
+
+RUN_STATES = ("queued", "running", "success", "failed")
+
+
+class _ActiveRun:
+    def __init__(self, run_id: str, request: dict):
+        self.run_id = run_id
+        self.request = request
+        self.state = "queued"
+        self.error = None
+        self.builder = None
+        self.dag_run = None
+        self.name_to_step = {}
+        self.running = set()
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # 스케줄 루프의 상태 변경과 소켓/spool 스레드의 status() 스냅샷을 직렬화
+        self.lock = threading.RLock()
+
+    def status(self) -> dict:
+        with self.lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict:
+        steps = {}
+        if self.dag_run:
+            for name in self.builder.dag_cfg:
+                steps[name] = self.dag_run.status.get(name) or ("running" if name in self.running else "pending")
+        return {
+            "run_id": self.run_id,
+            "state": self.state,
+            "config": self.request.get("config"),
+            "target_date": self.request.get("target_date"),
+            "steps": steps,
+            "failed": [name for name, _ in self.dag_run.failed_steps] if self.dag_run else [],
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class PipelineDaemon:
+    def __init__(
+        self,
+        max_workers: int = 4,
+        socket_path: Optional[str] = None,
+        spool_dir: Optional[str] = None,
+        history_file: Optional[str] = None,
+        logger=None,
+        poll_interval: float = 0.5,
+    ):
+        self.max_workers = max_workers
+        self.socket_path = socket_path
+        self.spool_dir = spool_dir
+        self.poll_interval = poll_interval
+        self.logger = logger or setup_logger("pipeline-daemon", "logs/daemon.log")
+        self.history = RunHistory(history_file) if history_file else None
+
+        self._loaders = {}  # config path -> (mtime, ConfigLoader)
+        self._dags = {}     # (config path, steps) -> (mtime, load_dag 결과)
+        self._inbox = queue.Queue()
+        self._runs = {}      # run_id -> _ActiveRun (완료 포함)
+        self._active = []    # 스케줄 대상 run (제출 순서)
+        self._rr = 0         # round-robin 시작 위치
+        self._lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = None
+        # pool 슬롯은 모든 run 이 공유 (같은 Athena workgroup 을 여러 run 이 동시에 쓰는 경우)
+        self.pools = ConcurrencyPools(logger=self.logger)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline-worker")
+        # sensor 스텝은 워커 슬롯 없이 평가, 결과는 (run_id, step) 키로 돌아온다
+        self._sensor_done = queue.Queue()
+        self._sensors = SensorManager(lambda key, result: self._sensor_done.put((key, result)), self.logger)
+
+    # ---- 요청 접수 ----
+    def submit(self, request: dict) -> str:
+        if not request.get("config"):
+            raise ValueError("Run request requires 'config'.")
+        run_id = request.get("run_id") or new_run_id()
+        run = _ActiveRun(run_id, dict(request))
+        with self._lock:
+            if run_id in self._runs:
+                raise ValueError(f"Duplicate run_id '{run_id}'.")
+            self._runs[run_id] = run
+        self._inbox.put(run)
+        self._write_status(run)
+        self.logger.info(f"📥 Accepted run {run_id}: config={request.get('config')} "
+                         f"target_date={request.get('target_date')} steps={request.get('steps') or 'all'}")
+        return run_id
+
+    def status(self, run_id: Optional[str] = None):
+        with self._lock:
+            if run_id is not None:
+                run = self._runs.get(run_id)
+                return run.status() if run else None
+            return [run.status() for run in self._runs.values()]
+
+    def _intake_spool(self):
+        incoming = os.path.join(self.spool_dir, "incoming")
+        processed = os.path.join(self.spool_dir, "processed")
+        for fname in sorted(os.listdir(incoming)):
+            if not fname.endswith(".jsonl"):
+                continue  # 작성 중인 파일은 .tmp 등으로 두었다가 rename 하는 것을 전제
+            path = os.path.join(incoming, fname)
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self.submit(json.loads(line))
+                    except (ValueError, json.JSONDecodeError) as e:
+                        self.logger.error(f"❌ Rejected spool request in {fname}: {e}")
+            os.replace(path, os.path.join(processed, fname))
+
+    def _write_status(self, run: _ActiveRun):
+        if not self.spool_dir:
+            return
+        path = os.path.join(self.spool_dir, "status", f"{run.run_id}.json")
+        tmp = path + ".tmp"
+        # 접수(소켓 스레드)와 스케줄 루프가 같은 run 상태를 동시에 쓸 수 있다
+        with self._status_lock:
+            with open(tmp, "w") as f:
+                json.dump(run.status(), f)
+            os.replace(tmp, path)
+
+    # ---- warm state ----
+    def _get_loader(self, config_path: str) -> ConfigLoader:
+        mtime = os.path.getmtime(config_path)
+        cached = self._loaders.get(config_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        loader = ConfigLoader(config_path)
+        self._loaders[config_path] = (mtime, loader)
+        return loader
+
+    def _get_dag(self, config_path: str, loader: ConfigLoader, only_steps=None) -> dict:
+        """DAG 구조 캐시. 파이프라인 설정이나 스텝 설정(sweep) 파일이 바뀌면 다시 읽는다"""
+        key = (config_path, tuple(only_steps or ()))
+        mtime = os.path.getmtime(config_path)
+        cached = self._dags.get(key)
+        if cached and cached[0] == mtime and all(
+            os.path.exists(path) and os.path.getmtime(path) == m for path, m in cached[1]["files"].items()
+        ):
+            return cached[1]
+        spec = load_dag(loader.config_data, only_steps)
+        self._dags[key] = (mtime, spec)
+        return spec
+
+    def _activate(self, run: _ActiveRun):
+        try:
+            loader = self._get_loader(run.request["config"])
+            target_date = run.request.get("target_date")
+            layout = loader.get_log_layout(target_date, run_id=run.run_id)
+            run.builder = PipelineBuilder(
+                loader, target_date=target_date, log_layout=layout,
+                history=self.history, only_steps=run.request.get("steps"),
+                full_refresh=run.request.get("full_refresh", False),
+                dag_spec=self._get_dag(run.request["config"], loader, run.request.get("steps")),
+            )
+            for pool, slots in run.builder.pools.slots.items():
+                self.pools.define(pool, slots)
+            # 공유 pool 정의가 이 run 의 스텝 요구 슬롯을 수용하는지 다시 확인
+            for step_name in run.builder.dag_cfg:
+                pool, pool_slots = run.builder.step_pool(step_name)
+                if pool:
+                    self.pools.validate_step(step_name, pool, pool_slots)
+            run.dag_run = run.builder.new_dag_run()
+            run.name_to_step = {step.name: step for step in run.builder.steps}
+        except Exception as e:
+            self.logger.error(f"❌ Run {run.run_id} could not start: {e}")
+            run.state, run.error, run.finished_at = "failed", str(e), time.time()
+            self._write_status(run)
+            return
+        run.state, run.started_at = "running", time.time()
+        self._active.append(run)
+        self._write_status(run)
+
+    def _finalize(self, run: _ActiveRun):
+        with run.lock:
+            # 요약의 pool 대기는 데몬 공유 pool 에서 이 run 이 기다린 시간
+            run.builder.finish_dag_run(
+                run.dag_run, pool_summary=self.pools.summary(owner=run.run_id, names=run.builder.pools.slots)
+            )
+            self.pools.forget(run.run_id)
+            run.state = "failed" if run.dag_run.failed_steps else "success"
+            run.finished_at = time.time()
+        self._active.remove(run)
+        self._write_status(run)
+        self.logger.info(f"🏁 Run {run.run_id} finished: {run.state}")
+        # run 별 로거 정리 (장시간 프로세스 fd 누수 방지)
+        if run.builder.log_layout:
+            release_logger(run.builder.logger)
+            for step in run.builder.steps:
+                release_logger(step.logger)
+
+    # ---- 스케줄러 ----
+    def _next_ready(self):
+        """round-robin 으로 다음 제출 대상 (run, step_name) 선택"""
+        n = len(self._active)
+        for i in range(n):
+            run = self._active[(self._rr + i) % n]
+            if run.dag_run.ready and not run.dag_run.aborted:
+                with run.lock:
+                    step_name = run.dag_run.pop_dispatchable(
+                        lambda name: self.pools.try_acquire(name, *run.builder.step_pool(name), owner=run.run_id)
+                    )
+                    if step_name is not None:
+                        run.running.add(step_name)
+                if step_name is None:
+                    continue  # 이 run 의 ready 스텝은 모두 pool 대기
+                self._rr = (self._rr + i + 1) % n
+                return run, step_name
+        return None, None
+
+    def run_forever(self):
+        if self.spool_dir:
+            for sub in ("incoming", "processed", "status"):
+                os.makedirs(os.path.join(self.spool_dir, sub), exist_ok=True)
+        if self.socket_path:
+            self._start_socket_server()
+        self.logger.info(f"🛰️  Pipeline daemon started (max_workers={self.max_workers}, "
+                         f"socket={self.socket_path}, spool={self.spool_dir})")
+
+        futures = {}
+        last_spool = 0.0
+        try:
+            while not self._stop.is_set():
+                if self.spool_dir and time.monotonic() - last_spool >= self.poll_interval:
+                    self._intake_spool()
+                    last_spool = time.monotonic()
+
+                while not self._inbox.empty():
+                    self._activate(self._inbox.get_nowait())
+
+                for run in self._active:
+                    for step_name in [n for n in run.dag_run.ready if n in run.builder.sensor_steps]:
+                        with run.lock:
+                            run.dag_run.take_ready(step_name)
+                            run.running.add(step_name)
+                        self._sensors.start(run.builder.build_sensor(step_name), key=(run.run_id, step_name))
+
+                while len(futures) < self.max_workers:
+                    run, step_name = self._next_ready()
+                    if run is None:
+                        break
+                    future = self._executor.submit(_run_step_wrapper, run.name_to_step[step_name])
+                    futures[future] = (run, step_name)
+
+                if futures:
+                    done, _ = wait(list(futures), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                else:
+                    done = ()
+                    self._stop.wait(min(self.poll_interval, 0.1))
+
+                changed = set()
+                for future in done:
+                    run, step_name = futures.pop(future)
+                    self.pools.release(*run.builder.step_pool(step_name))
+                    try:
+                        _name, result = future.result()
+                    except Exception as e:
+                        result = {"success": False, "stderr": str(e)}
+                    with run.lock:
+                        run.running.discard(step_name)
+                        run.builder.complete_step(run.dag_run, step_name, result)
+                    changed.add(run)
+
+                while not self._sensor_done.empty():
+                    (run_id, step_name), result = self._sensor_done.get_nowait()
+                    run = self._runs[run_id]
+                    with run.lock:
+                        run.running.discard(step_name)
+                        run.builder.complete_step(run.dag_run, step_name, result)
+                    changed.add(run)
+
+                with self._lock:
+                    for run in list(self._active):
+                        if run.dag_run.aborted:
+                            # 중단된 run 의 sensor 는 더 기다릴 필요 없음
+                            for step_name in run.running & run.builder.sensor_steps:
+                                self._sensors.cancel((run.run_id, step_name))
+                                with run.lock:
+                                    run.running.discard(step_name)
+                        # aborted run 은 실행 중 스텝이 끝나길 기다렸다가 종료
+                        if not run.running and (run.dag_run.finished or run.dag_run.aborted):
+                            self._finalize(run)
+                        elif run in changed:
+                            self._write_status(run)
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        self._sensors.stop()
+        self._executor.shutdown(wait=True)
+
+    # ---- unix socket ----
+    def _start_socket_server(self):
+        daemon = self
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # 이전 프로세스가 남긴 소켓 파일
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = json.loads(self.rfile.readline())
+                    response = daemon._handle_request(request)
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                self.wfile.write((json.dumps(response, default=str) + "\n").encode())
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="daemon-socket", daemon=True).start()
+
+    def _handle_request(self, request: dict) -> dict:
+        op = request.pop("op", "submit")
+        if op == "submit":
+            return {"ok": True, "run_id": self.submit(request)}
+        if op == "status":
+            status = self.status(request.get("run_id"))
+            if status is None:
+                return {"ok": False, "error": f"Unknown run_id '{request.get('run_id')}'."}
+            return {"ok": True, "status": status}
+        if op == "list":
+            return {"ok": True, "runs": self.status()}
+        if op == "pools":
+            return {"ok": True, "pools": self.pools.summary(), "in_use": dict(self.pools.used)}
+        if op == "shutdown":
+            self.stop()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op '{op}'."}
+
+
+# ---- 클라이언트 (main.py --submit) ----
+def send_request(socket_path: str, request: dict, timeout: float = 30.0) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + "\n").encode())
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            buf += chunk
+    return json.loads(buf)
+
+
+def submit_and_wait(socket_path: str, request: dict, wait_for_result: bool = True,
+                    poll_interval: float = 1.0, logger=None) -> dict:
+    response = send_request(socket_path, dict(request, op="submit"))
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error"))
+    run_id = response["run_id"]
+    if logger:
+        logger.info(f"📤 Submitted run {run_id}")
+    if not wait_for_result:
+        return {"run_id": run_id, "state": "queued"}
+
+    last_state = None
+    while True:
+        status = send_request(socket_path, {"op": "status", "run_id": run_id})["status"]
+        if logger and status["state"] != last_state:
+            logger.info(f"Run {run_id}: {status['state']} ({datetime.now():%H:%M:%S})")
+            last_state = status["state"]
+        if status["state"] in ("success", "failed"):
+            return status
+        time.sleep(poll_interval)
@@ -0,0 +1,176 @@
+# pipeline/dag_run.py
+
+from collections import defaultdict, deque
+
+# 부모가 모두 끝났을 때 자식을 실행할 조건 (dag 항목의 trigger_rule)
+#   all_success: 부모가 모두 성공해야 실행 (기본)
+#   one_success: 부모 중 하나라도 성공하면 실행 (sweep 선택 노드)
+TRIGGER_RULES = ("all_success", "one_success")
+
+
+def build_dependency_graph(dag_cfg: dict):
+    """
+    graph: parent -> [children]
+    in_degree: child -> #parents
+    reverse: child -> [parents]
+    """
+    graph = defaultdict(list)
+    in_degree = defaultdict(int)
+    reverse = defaultdict(list)
+
+    for step_name, step_info in dag_cfg.items():
+        deps = step_info.get("depends_on", []) or []
+        for dep in deps:
+            graph[dep].append(step_name)
+            reverse[step_name].append(dep)
+            in_degree[step_name] += 1
+        if step_name not in in_degree:
+            in_degree[step_name] = 0
+
+    return graph, in_degree, reverse
+
+
+class DagRun:
+    """DAG 한 번 실행의 상태 머신 (실행 방식과 무관한 의존성/force/스킵 판단만 담당).
+
+    - 기본: 부모 성공이어야 자식 실행. 부모 실패/스킵 시 자식 스킵 (손자까지 전파).
+    - 전역/스텝 force 활성: 부모 실패/스킵이어도 자식 강제 실행.
+    - force가 하나도 없으면, 최초 실패 시 aborted=True (스케줄러가 신규 제출 중단).
+    - trigger_rule: one_success 인 자식은 부모 중 하나만 성공해도 실행.
+      자식이 모두 one_success 인 스텝(sweep variant)의 실패는 run 을 중단시키지 않는다.
+    """
+
+    def __init__(self, dag_cfg: dict, step_force: dict, global_force: bool, logger, metrics=None):
+        self.dag_cfg = dag_cfg
+        self.step_force = step_force
+        self.global_force = global_force
+        self.force_any = global_force or any(step_force.values())
+        self.logger = logger
+        self.metrics = metrics
+
+        self.graph, self.in_degree, self.reverse = build_dependency_graph(dag_cfg)
+        self.in_degree = dict(self.in_degree)
+
+        self.trigger_rule = {}
+        for name, info in dag_cfg.items():
+            rule = info.get("trigger_rule", "all_success")
+            if rule not in TRIGGER_RULES:
+                raise ValueError(
+                    f"Step '{name}' has unknown trigger_rule '{rule}'. Choose from {', '.join(TRIGGER_RULES)}."
+                )
+            self.trigger_rule[name] = rule
+        self._tolerated = {
+            name for name, children in self.graph.items()
+            if children and all(self.trigger_rule.get(c) == "one_success" for c in children)
+        }
+
+        self.status = {}   # name -> "success" | "skipped" | "failed"
+        self.success_steps = []
+        self.skipped_steps = []
+        self.failed_steps = []
+        self.running = set()
+
+        # in_degree==0 루트 노드 큐
+        self.ready = deque()
+        for name, deg in self.in_degree.items():
+            if deg == 0:
+                self._mark_ready(name)
+
+    def _mark_ready(self, name: str):
+        # ready 진입 시점부터 queued (워커 limit / pool 슬롯 대기도 queue_depth 에 잡힌다)
+        self.ready.append(name)
+        if self.metrics:
+            self.metrics.step_queued(name)
+
+    @property
+    def aborted(self) -> bool:
+        return not self.force_any and any(name not in self._tolerated for name, _ in self.failed_steps)
+
+    @property
+    def finished(self) -> bool:
+        return not self.ready and not self.running
+
+    def is_forced(self, name: str) -> bool:
+        return self.global_force or self.step_force.get(name, False)
+
+    def pop_ready(self):
+        name = self.ready.popleft()
+        self.running.add(name)
+        return name
+
+    def take_ready(self, name: str):
+        """특정 ready 스텝을 꺼낸다 (pool 등으로 순서를 건너뛰어 제출할 때)"""
+        self.ready.remove(name)
+        self.running.add(name)
+        return name
+
+    def pop_dispatchable(self, can_start):
+        """ready 순서대로 can_start(name) 이 True 인 첫 스텝을 꺼낸다 (pool 대기 스텝은 건너뜀)"""
+        for name in list(self.ready):
+            if can_start(name):
+                return self.take_ready(name)
+        return None
+
+    def _format_parent_statuses(self, child):
+        parents = self.reverse.get(child, [])
+        parts = [f"{p}={self.status.get(p, 'pending')}" for p in parents]
+        return ", ".join(parts) if parts else "(no-parents)"
+
+    def complete(self, step_name: str, result: dict) -> str:
+        """스텝 결과 반영 후 자식 평가. 반환값은 상태 문자열"""
+        self.running.discard(step_name)
+        reason = result.get("error") or result.get("stderr") or "unknown error"
+
+        if result.get("success"):
+            self.logger.info(f"✅ Step '{step_name}' completed.")
+            state = "success"
+            self.success_steps.append(step_name)
+        elif result.get("skipped"):
+            self.logger.warning(f"⚠️ Step '{step_name}' was skipped.")
+            state = "skipped"
+            self.skipped_steps.append(step_name)
+        else:
+            self.logger.error(f"❌ Step '{step_name}' failed: {reason}")
+            state = "failed"
+            self.failed_steps.append((step_name, reason))
+
+        self._settle(step_name, state)
+        return state
+
+    def _settle(self, step_name: str, state: str):
+        self.status[step_name] = state
+        if self.metrics:
+            self.metrics.step_finished(step_name, state)
+
+        # 자식 후보 in_degree 갱신 및 평가 (스킵은 명시적 스택으로 손자까지 전파)
+        pending = [step_name]
+        while pending:
+            parent = pending.pop()
+            for child in self.graph.get(parent, []):
+                self.in_degree[child] -= 1
+                if self.in_degree[child] != 0:
+                    continue
+
+                parent_ok = [self.status.get(p) == "success" for p in self.reverse.get(child, [])]
+                runnable = any(parent_ok) if self.trigger_rule.get(child) == "one_success" else all(parent_ok)
+
+                if not runnable and not self.is_forced(child):
+                    # 강제 아님 → 스킵 (부모 상태 함께 로깅)
+                    self.logger.warning(
+                        f"⏭️  Skipping '{child}' due to non-success dependency "
+                        f"(parents: {self._format_parent_statuses(child)}); force is off."
+                    )
+                    self.status[child] = "skipped"
+                    self.skipped_steps.append(child)
+                    if self.metrics:
+                        self.metrics.step_finished(child, "skipped")
+                    pending.append(child)
+                    continue
+
+                # 실행 가능 (정상, one_success 충족 또는 강제)
+                if not runnable:
+                    self.logger.warning(
+                        f"⚡ Forcing run of '{child}' "
+                        f"(parents: {self._format_parent_statuses(child)})."
+                    )
+                self._mark_ready(child)
@@ -0,0 +1,82 @@
+# pipeline/history.py
+
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Optional
+
+
+class RunHistory:
+    """스텝 실행 이력 (JSONL, append-only).
+
+    한 줄 = 스텝 한 번 완료: run_id, step, target_date, status, duration_s, cpu_s.
+    스텝별 최근 keep_last 개만 메모리에 유지한다.
+    """
+
+    def __init__(self, path: str, keep_last: int = 200):
+        self.path = path
+        self.keep_last = keep_last
+        self._lock = threading.Lock()
+        self._by_step = defaultdict(lambda: deque(maxlen=keep_last))
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 중간에 잘린 줄은 무시
+                self._by_step[entry.get("step")].append(entry)
+
+    def record(self, step: str, status: str, duration_s: Optional[float], cpu_s: Optional[float] = None,
+               run_id: Optional[str] = None, target_date: Optional[str] = None, **extra):
+        entry = {
+            "run_id": run_id,
+            "step": step,
+            "target_date": target_date,
+            "status": status,
+            "duration_s": duration_s,
+            "cpu_s": cpu_s,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        entry.update(extra)
+        with self._lock:
+            self._by_step[step].append(entry)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def entries(self, step: str) -> list:
+        with self._lock:
+            return list(self._by_step.get(step, ()))
+
+    def durations(self, step: str, successful_only: bool = True) -> list:
+        return [
+            e["duration_s"] for e in self.entries(step)
+            if e.get("duration_s") is not None and (not successful_only or e.get("status") == "success")
+        ]
+
+    def percentile(self, step: str, pct: float) -> Optional[float]:
+        data = sorted(self.durations(step))
+        if not data:
+            return None
+        return data[min(len(data) - 1, int(round(pct / 100 * (len(data) - 1))))]
+
+    def cpu_efficiency(self, step: Optional[str] = None, last: int = 20) -> Optional[float]:
+        """최근 실행의 CPU 시간 / wall 시간 (1.0 = 코어 하나를 꽉 씀)"""
+        with self._lock:
+            if step is not None:
+                entries = list(self._by_step.get(step, ()))[-last:]
+            else:
+                entries = [e for q in self._by_step.values() for e in list(q)[-last:]]
+        cpu = sum(e["cpu_s"] for e in entries if e.get("cpu_s") is not None and e.get("duration_s"))
+        wall = sum(e["duration_s"] for e in entries if e.get("cpu_s") is not None and e.get("duration_s"))
+        return (cpu / wall) if wall > 0 else None
@@ -1,27 +1,252 @@
 # pipeline/logger.py
 
+import gzip
+import json
 import logging
+import logging.handlers
+import atexit
 import os
+import queue
+import shutil
 import sys
+import threading
 import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
 
 _logger_cache = {}
 
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# 오케스트레이터 -> 스텝 프로세스로 넘기는 로그 rotate 설정 (StepRunner._build_env)
+STEP_LOG_FILE_ENV = "PIPELINE_STEP_LOG_FILE"
+LOG_MAX_BYTES_ENV = "PIPELINE_LOG_MAX_BYTES"
+LOG_BACKUP_COUNT_ENV = "PIPELINE_LOG_BACKUP_COUNT"
+LOG_COMPRESS_ENV = "PIPELINE_LOG_COMPRESS"
+
+
+class _BackgroundCompressor:
+    """rotate 된 로그 세그먼트를 백그라운드 스레드에서 gzip 압축"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="log-compressor", daemon=True)
+                self._thread.start()
+
+    def submit(self, source: str, dest: str) -> threading.Event:
+        """압축 작업 등록. 반환된 Event 는 이 작업이 끝나면 set 된다"""
+        self._ensure_started()
+        done = threading.Event()
+        self._queue.put((source, dest, done))
+        return done
+
+    def wait_idle(self):
+        """대기 중인 압축 작업이 모두 끝날 때까지 블록"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            source, dest, done = self._queue.get()
+            try:
+                tmp = dest + ".tmp"
+                with open(source, "rb") as f_in, gzip.open(tmp, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                os.replace(tmp, dest)
+                os.remove(source)
+            except OSError:
+                # 압축 실패 시 원본 세그먼트는 그대로 둔다 (로그 유실 방지)
+                traceback.print_exc()
+            finally:
+                done.set()
+                self._queue.task_done()
+
+
+_compressor = _BackgroundCompressor()
+atexit.register(_compressor.wait_idle)
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """크기 기준 rotate + rotate 된 세그먼트는 백그라운드에서 .gz 로 압축"""
+
+    def __init__(self, filename: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT, compress: bool = True):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, delay=True)
+        self.compress = compress
+        self._pending = None  # 이 파일의 직전 세그먼트 압축 완료 Event
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = self._rotate_and_compress
+
+    def doRollover(self):
+        if self.compress and self._pending is not None:
+            # 이 파일의 직전 세그먼트 압축이 끝나야 .1.gz -> .2.gz rename 체인이 안전하다
+            # (다른 핸들러의 압축은 기다리지 않는다)
+            self._pending.wait()
+        super().doRollover()
+
+    def _rotate_and_compress(self, source: str, dest: str):
+        pending = dest[: -len(".gz")] + ".pending"
+        if os.path.exists(source):
+            os.replace(source, pending)
+            self._pending = _compressor.submit(pending, dest)
+
+
+def new_run_id() -> str:
+    """시간순 정렬 가능한 run id (예: 20250523T101500-1a2b3c)"""
+    return f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+class RunLogLayout:
+    """run/date 단위 로그 디렉토리 구조
+
+    <root>/<target_date>/<run_id>/pipeline.log
+    <root>/<target_date>/<run_id>/<step>/attempt-<n>.log        (오케스트레이터가 수집한 스텝 출력)
+    <root>/<target_date>/<run_id>/<step>/attempt-<n>.step.log   (스텝 프로세스 자체 로그)
+    <root>/index/<run_id>.jsonl                                  (스텝 attempt -> 로그 경로 인덱스)
+    """
+
+    def __init__(self, root: str = "logs", target_date: Optional[str] = None, run_id: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, backup_count: int = DEFAULT_BACKUP_COUNT,
+                 compress: bool = True):
+        self.root = root
+        self.target_date = target_date or datetime.now().strftime("%Y%m%d")
+        self.run_id = run_id or new_run_id()
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.run_dir = os.path.join(root, self.target_date, self.run_id)
+        self._index_lock = threading.Lock()
+
+    @property
+    def pipeline_log(self) -> str:
+        return os.path.join(self.run_dir, "pipeline.log")
+
+    @property
+    def index_file(self) -> str:
+        return index_path(self.root, self.run_id)
+
+    def attempt_log(self, step_name: str, attempt: int) -> str:
+        return os.path.join(self.run_dir, step_name, f"attempt-{attempt}.log")
+
+    def step_process_log(self, step_name: str, attempt: int) -> str:
+        return os.path.join(self.run_dir, step_name, f"attempt-{attempt}.step.log")
+
+    def make_handler(self, log_file: str) -> logging.Handler:
+        return _rotating_handler(log_file, self.max_bytes, self.backup_count, self.compress)
+
+    def step_env(self, step_name: str, attempt: int) -> dict:
+        """스텝 프로세스가 자기 로그 파일을 같은 rotate 설정으로 열도록 넘기는 환경 변수"""
+        return {
+            STEP_LOG_FILE_ENV: self.step_process_log(step_name, attempt),
+            LOG_MAX_BYTES_ENV: str(self.max_bytes or 0),
+            LOG_BACKUP_COUNT_ENV: str(self.backup_count),
+            LOG_COMPRESS_ENV: "1" if self.compress else "0",
+        }
+
+    def record_attempt(self, step_name: str, attempt: int, **extra):
+        entry = {
+            "run_id": self.run_id,
+            "target_date": self.target_date,
+            "step": step_name,
+            "attempt": attempt,
+            "log": self.attempt_log(step_name, attempt),
+            "step_log": self.step_process_log(step_name, attempt),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        entry.update(extra)
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        with self._index_lock, open(self.index_file, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    @contextmanager
+    def attempt(self, logger: logging.Logger, step_name: str, attempt: int, env: str = "DEV"):
+        """attempt 동안 스텝 로거에 전용 파일 핸들러를 붙인다"""
+        handler = self.make_handler(self.attempt_log(step_name, attempt))
+        handler.setLevel(logging.DEBUG)
+        handler.setFormatter(_file_formatter(step_name, env))
+        logger.addHandler(handler)
+        self.record_attempt(step_name, attempt, status="started")
+        try:
+            yield handler
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+
+def _rotating_handler(log_file: str, max_bytes: int, backup_count: int, compress: bool) -> logging.Handler:
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    if max_bytes and max_bytes > 0:
+        return CompressingRotatingFileHandler(log_file, max_bytes, backup_count, compress)
+    return logging.FileHandler(log_file, delay=True)
+
+
+def _step_process_handler(log_file: str) -> logging.Handler:
+    """스텝 프로세스 쪽: 오케스트레이터가 넘긴 run 로그 파일이면 layout 과 같은 rotate/압축 적용"""
+    if log_file == os.environ.get(STEP_LOG_FILE_ENV) and LOG_MAX_BYTES_ENV in os.environ:
+        return _rotating_handler(
+            log_file, int(os.environ[LOG_MAX_BYTES_ENV]),
+            int(os.environ.get(LOG_BACKUP_COUNT_ENV, DEFAULT_BACKUP_COUNT)),
+            os.environ.get(LOG_COMPRESS_ENV, "1") == "1",
+        )
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    return logging.FileHandler(log_file)
+
+
+def index_path(root: str, run_id: str) -> str:
+    return os.path.join(root, "index", f"{run_id}.jsonl")
+
+
+def find_attempt_log(root: str, run_id: str, step_name: str, attempt: Optional[int] = None) -> Optional[dict]:
+    """run 인덱스에서 스텝 attempt 의 로그 위치 조회 (attempt 생략 시 마지막 attempt)"""
+    path = index_path(root, run_id)
+    if not os.path.exists(path):
+        return None
+
+    found = None
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["step"] != step_name:
+                continue
+            if attempt is None or entry["attempt"] == attempt:
+                found = entry if found is None or entry["attempt"] >= found["attempt"] else found
+    return found
+
+
+def _file_formatter(name: str, env: str) -> logging.Formatter:
+    return logging.Formatter(f"[{env.upper()}] [%(asctime)s] %(levelname)s {name}: %(message)s")
+
+
 def setup_logger(
     name: str,
-    log_file: str = "logs/pipeline.log",
+    log_file: Optional[str] = "logs/pipeline.log",
     level: str = "INFO",
     stream_to_stdout: bool = True,
     split_streams: bool = True,
-    env: str = "DEV"  # "DEV" 또는 "PRD"
+    env: str = "DEV",  # "DEV" 또는 "PRD"
+    layout: Optional[RunLogLayout] = None
 ) -> logging.Logger:
-    
-    if name in _logger_cache:
-        return _logger_cache[name]
+    """로거 생성/캐시.
 
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    layout 이 주어지면 run 별로 분리된 로거를 만들고 (동시 실행/backfill 간 섞임 방지)
+    파일 핸들러는 layout 의 rotate/압축 설정을 따른다. log_file=None 이면 파일 핸들러 없음.
+    """
+    cache_key = (name, log_file, layout.run_id if layout else None)
+    if cache_key in _logger_cache:
+        return _logger_cache[cache_key]
 
-    logger = logging.getLogger(name)
+    logger_name = f"{name}.{layout.run_id}" if layout else name
+    logger = logging.getLogger(logger_name)
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
     logger.propagate = False
 
@@ -29,13 +254,16 @@ def setup_logger(
 
         env_tag = f"[{env.upper()}]"
 
-        file_formatter = logging.Formatter(f"{env_tag} [%(asctime)s] %(levelname)s %(name)s: %(message)s")
         console_formatter = logging.Formatter(f"{env_tag} [%(asctime)s] [%(levelname)s] %(message)s")
 
-        fh = logging.FileHandler(log_file)
-        fh.setLevel(logging.DEBUG)
-        fh.setFormatter(file_formatter)
-        logger.addHandler(fh)
+        if log_file:
+            if layout:
+                fh = layout.make_handler(log_file)
+            else:
+                fh = _step_process_handler(log_file)
+            fh.setLevel(logging.DEBUG)
+            fh.setFormatter(_file_formatter(name, env))
+            logger.addHandler(fh)
 
         if split_streams:
             # ✅ stdout handler (DEBUG, INFO)
@@ -59,5 +287,15 @@ def setup_logger(
             ch.setFormatter(console_formatter)
             logger.addHandler(ch)
 
-    _logger_cache[name] = logger
-    return logger
\ No newline at end of file
+    _logger_cache[cache_key] = logger
+    return logger
+
+
+def release_logger(logger: logging.Logger):
+    """run 종료 시 로거 핸들러 정리 (장시간 떠 있는 프로세스의 fd 누수 방지)"""
+    for key, cached in list(_logger_cache.items()):
+        if cached is logger:
+            del _logger_cache[key]
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
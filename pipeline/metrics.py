@@ -0,0 +1,244 @@
+# pipeline/metrics.py
+"""실행 중인 파이프라인 상태를 Prometheus/OpenMetrics 텍스트와 JSON 으로 노출.
+
+RunMetrics 는 스케줄러/StepRunner 가 이벤트를 기록하는 thread-safe 저장소이고,
+MetricsServer 는 백그라운드 스레드에서 도는 내장 HTTP 서버다.
+
+    GET /metrics  -> Prometheus text (Accept 에 openmetrics 가 있으면 OpenMetrics)
+    GET /status   -> DAG 상태 JSON
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+STEP_STATES = ("pending", "queued", "running", "success", "failed", "skipped")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def read_rss_bytes(pid: int) -> Optional[int]:
+    """/proc/<pid>/status 의 VmRSS (프로세스 종료/비 Linux 환경이면 None)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class RunMetrics:
+    """스텝 상태/시간/재시도/로그 라인 수를 기록. 스크레이프 시점에 집계만 한다."""
+
+    def __init__(self, rate_window: float = 10.0):
+        self._lock = threading.Lock()
+        self.rate_window = rate_window
+        self.run_id = None
+        self.started_at = None
+        self.max_workers = 0
+        self.steps = {}
+        self._log_lines_total = 0
+        self._log_samples = deque()  # (timestamp, total) 최근 구간 처리량 계산용
+
+    # ---- 스케줄러 이벤트 ----
+    def start_run(self, step_deps: dict, max_workers: int, run_id: Optional[str] = None):
+        with self._lock:
+            self.run_id = run_id
+            self.started_at = time.time()
+            self.max_workers = max_workers
+            for name, deps in step_deps.items():
+                self.steps[name] = {
+                    "state": "pending",
+                    "depends_on": list(deps or []),
+                    "attempts": 0,
+                    "started_at": None,
+                    "finished_at": None,
+                    "pid": None,
+                    "log_lines": 0,
+                }
+
+    def set_max_workers(self, max_workers: int):
+        with self._lock:
+            self.max_workers = max_workers
+
+    def _set_state(self, name: str, state: str, **fields):
+        with self._lock:
+            step = self.steps.setdefault(name, {
+                "state": "pending", "depends_on": [], "attempts": 0, "started_at": None,
+                "finished_at": None, "pid": None, "log_lines": 0,
+            })
+            step["state"] = state
+            step.update(fields)
+
+    def step_queued(self, name: str):
+        self._set_state(name, "queued")
+
+    def step_started(self, name: str):
+        self._set_state(name, "running", started_at=time.time(), finished_at=None)
+
+    def step_finished(self, name: str, state: str):
+        self._set_state(name, state, finished_at=time.time(), pid=None)
+
+    # ---- StepRunner 이벤트 ----
+    def attempt_started(self, name: str, attempt: int, pid: Optional[int]):
+        with self._lock:
+            step = self.steps.get(name)
+            if step is not None:
+                step["attempts"] = max(step["attempts"], attempt)
+                step["pid"] = pid
+
+    def log_lines(self, name: str, count: int):
+        """StepRunner 가 attempt 별로 모아 둔 로그 라인 수를 한 번에 반영 (라인마다 lock 잡지 않음)"""
+        if count <= 0:
+            return
+        with self._lock:
+            self._log_lines_total += count
+            step = self.steps.get(name)
+            if step is not None:
+                step["log_lines"] += count
+
+    def log_line(self, name: str):
+        self.log_lines(name, 1)
+
+    # ---- 집계 ----
+    def _log_rate(self, now: float) -> float:
+        samples = self._log_samples
+        samples.append((now, self._log_lines_total))
+        # window 보다 오래된 샘플은 기준점 하나만 남긴다. 스크레이프 간격이 window 보다 길면
+        # 기준점 = 직전 스크레이프 (현재 샘플만 남아 0 이 되는 것을 방지)
+        while len(samples) > 2 and now - samples[1][0] >= self.rate_window:
+            samples.popleft()
+        t0, n0 = samples[0]
+        return (self._log_lines_total - n0) / (now - t0) if now > t0 else 0.0
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        with self._lock:
+            steps = {name: dict(info) for name, info in self.steps.items()}
+            log_rate = self._log_rate(now)
+            log_total = self._log_lines_total
+            max_workers = self.max_workers
+            run_id, started_at = self.run_id, self.started_at
+
+        counts = {state: 0 for state in STEP_STATES}
+        for info in steps.values():
+            counts[info["state"]] = counts.get(info["state"], 0) + 1
+            start, end = info["started_at"], info["finished_at"]
+            info["elapsed_s"] = ((end or now) - start) if start else None
+            info["retries"] = max(0, info["attempts"] - 1)
+            # RSS 는 스크레이프 시점에만 읽는다 (실행 경로에 부하 없음)
+            info["rss_bytes"] = read_rss_bytes(info["pid"]) if info["state"] == "running" and info["pid"] else None
+
+        return {
+            "run_id": run_id,
+            "started_at": started_at,
+            "elapsed_s": (now - started_at) if started_at else None,
+            "max_workers": max_workers,
+            "active_workers": counts["running"],
+            "queue_depth": counts["queued"],
+            "states": counts,
+            "log_lines_total": log_total,
+            "log_lines_per_s": log_rate,
+            "steps": steps,
+        }
+
+    def render_prometheus(self, openmetrics: bool = False) -> str:
+        snap = self.snapshot()
+        lines = []
+
+        def metric(name, mtype, help_text, samples):
+            sample_name = f"{name}_total" if mtype == "counter" else name
+            # OpenMetrics 는 counter family 이름에 _total 을 붙이지 않고, 0.0.4 텍스트는 샘플 이름과 같아야 한다
+            family = name if openmetrics else sample_name
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {mtype}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{sample_name}{{{label_str}}} {value}" if label_str else f"{sample_name} {value}")
+
+        metric("pipeline_steps", "gauge", "Number of steps by state.",
+               [({"state": s}, n) for s, n in snap["states"].items()])
+        metric("pipeline_queue_depth", "gauge", "Steps ready to run but not yet started (waiting for a worker or pool slot).",
+               [({}, snap["queue_depth"])])
+        metric("pipeline_active_workers", "gauge", "Steps currently running.",
+               [({}, snap["active_workers"])])
+        metric("pipeline_max_workers", "gauge", "Configured worker limit.",
+               [({}, snap["max_workers"])])
+        metric("pipeline_step_elapsed_seconds", "gauge", "Elapsed wall time per step.",
+               [({"step": n, "state": i["state"]}, round(i["elapsed_s"], 3) if i["elapsed_s"] is not None else None)
+                for n, i in snap["steps"].items()])
+        metric("pipeline_step_retries", "counter", "Retry attempts per step.",
+               [({"step": n}, i["retries"]) for n, i in snap["steps"].items()])
+        metric("pipeline_log_lines", "counter", "Log lines captured from step processes.",
+               [({"step": n}, i["log_lines"]) for n, i in snap["steps"].items()])
+        metric("pipeline_log_lines_per_second", "gauge", "Captured log lines per second (recent window).",
+               [({}, round(snap["log_lines_per_s"], 3))])
+        metric("pipeline_step_rss_bytes", "gauge", "Resident set size of running step processes.",
+               [({"step": n}, i["rss_bytes"]) for n, i in snap["steps"].items()])
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics: RunMetrics = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/metrics":
+            openmetrics = "application/openmetrics-text" in (self.headers.get("Accept") or "")
+            body = self.metrics.render_prometheus(openmetrics=openmetrics).encode()
+            ctype = OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+        elif path == "/status":
+            body = json.dumps(self.metrics.snapshot(), default=str).encode()
+            ctype = "application/json"
+        elif path in ("/", "/healthz"):
+            body, ctype = b"ok\n", "text/plain"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 스크레이프마다 stderr 로 찍히는 access log 억제
+        pass
+
+
+class MetricsServer:
+    """RunMetrics 를 노출하는 HTTP 서버 (daemon 스레드)"""
+
+    def __init__(self, metrics: RunMetrics, port: int = 0, host: str = "127.0.0.1"):
+        handler = type("MetricsHandler", (_MetricsHandler,), {"metrics": metrics})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join(timeout=5)
@@ -1,12 +1,31 @@
 # pipeline/pipeline_builder.py
 import os
 from collections import defaultdict, deque
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from pipeline.autoscaler import AdaptiveConcurrency
+from pipeline.dag_run import DagRun, build_dependency_graph
+from pipeline.history import RunHistory
+from pipeline.planner import PlanSimulator, log_plan, replicate_dag
+from pipeline.pools import ConcurrencyPools, parse_pools
+from pipeline.profiling import PROFILERS, ProfiledStep, merge_profiles, top_frames
+from pipeline.speculation import SpeculationPolicy
+from pipeline.sensors import SensorManager, build_sensor, wait_for_sensor
 from pipeline.step_runner import StepRunner
-from pipeline.logger import setup_logger
-
-
-def _run_step_wrapper(step: StepRunner):
+from pipeline.watermark import (
+    FULL_REFRESH_ENV, PENDING_WATERMARK_ENV, PENDING_WATERMARK_FILE, WATERMARK_DB_ENV, WATERMARK_KEY_ENV,
+)
+from pipeline.sweep import (
+    SuccessiveHalving, SweepMonitor, SweepSelector, best_file_env, load_sweep, write_variant_configs,
+    METRICS_FILE_ENV, VARIANT_SEPARATOR,
+)
+from pipeline.logger import new_run_id, setup_logger
+
+
+def _run_step_wrapper(step: StepRunner, metrics=None):
+    if metrics:
+        metrics.step_started(step.name)
     return step.name, step.run()
 
 
@@ -27,48 +46,223 @@ def _to_bool(value, default=False):
     return default
 
 
+def load_dag(config_data: dict, only_steps=None) -> dict:
+    """dag 섹션 정규화 + 스텝별 sweep 설정 로드 (run 마다 바뀌지 않는 부분, 데몬이 캐시)
+
+    반환: {"dag": {name: info}, "sweeps": {name: sweep_cfg}, "files": {스텝 config 경로: mtime}}
+    """
+    # depends_on None → []
+    raw_dag = config_data.get("dag", {}) or {}
+    dag_cfg = {}
+    for name, info in raw_dag.items():
+        info = dict(info or {})
+        deps = info.get("depends_on")
+        if deps is None:
+            info["depends_on"] = []
+        dag_cfg[name] = info
+
+    # 일부 스텝만 실행: 선택되지 않은 부모 의존성은 이미 충족된 것으로 본다
+    if only_steps:
+        unknown = set(only_steps) - set(dag_cfg)
+        if unknown:
+            raise ValueError(f"Unknown step(s) in selection: {', '.join(sorted(unknown))}")
+        dag_cfg = {
+            name: dict(info, depends_on=[d for d in info["depends_on"] if d in only_steps])
+            for name, info in dag_cfg.items() if name in only_steps
+        }
+
+    sweeps, files = {}, {}
+    for name, info in dag_cfg.items():
+        config_path = info.get("config")
+        if info.get("type") is not None or not config_path or not os.path.exists(config_path):
+            continue  # 누락된 설정은 스텝 등록 시 에러
+        files[config_path] = os.path.getmtime(config_path)
+        sweep_cfg = load_sweep(config_path)
+        if sweep_cfg:
+            sweeps[name] = sweep_cfg
+    return {"dag": dag_cfg, "sweeps": sweeps, "files": files}
+
+
 class PipelineBuilder:
-    def __init__(self, config_loader, logger=None, target_date=None, selected_step=None):
+    def __init__(self, config_loader, logger=None, target_date=None, selected_step=None, log_layout=None, metrics=None,
+                 history=None, only_steps=None, profile=None, profiler=None, full_refresh=False, dag_spec=None):
         self.config_loader = config_loader
+        self.metrics = metrics
 
         self.env = self.config_loader.config_data.get("global")['env']
 
-        self.logger = logger or setup_logger(
-            "pipeline", self.config_loader.get_log_file(), self.config_loader.get_log_level()
-        )
+        # logging.dir 설정 시 run/date 단위 로그 디렉토리 사용
+        self.log_layout = log_layout or self.config_loader.get_log_layout(target_date)
+        self.run_id = self.log_layout.run_id if self.log_layout else None
+
+        if self.log_layout:
+            self.logger = logger or setup_logger(
+                "pipeline", self.log_layout.pipeline_log, self.config_loader.get_log_level(), layout=self.log_layout
+            )
+        else:
+            self.logger = logger or setup_logger(
+                "pipeline", self.config_loader.get_log_file(), self.config_loader.get_log_level()
+            )
         self.target_date = target_date
         self.selected_step = selected_step
 
         # ✅ 입력/설정 안정성: force 안전 변환
         options = self.config_loader.config_data.get("options", {}) or {}
         self.global_force = _to_bool(options.get("force", False), default=False)
-
-        # DAG 섹션 캐시 (depends_on None → [])
-        raw_dag = self.config_loader.config_data.get("dag", {}) or {}
-        self.dag_cfg = {}
-        for name, info in raw_dag.items():
-            info = dict(info or {})
-            deps = info.get("depends_on")
-            if deps is None:
-                info["depends_on"] = []
-            self.dag_cfg[name] = info
+        self.max_workers = int(options.get("max_workers", 4))
+        self.adaptive_cfg = dict(options.get("adaptive_workers") or {})
+        self.adaptive_cfg["enabled"] = _to_bool(self.adaptive_cfg.get("enabled", False), default=False)
+        self.speculative_cfg = dict(options.get("speculative") or {})
+        self.speculation = None
+
+        # 스텝 실행 이력 (adaptive 동시성 판단 등에 사용). 설정 없으면 기록 안 함
+        history_file = options.get("history_file")
+        self.history = history or (RunHistory(history_file) if history_file else None)
+
+        # DAG 구조 (데몬은 load_dag 결과를 설정 mtime 기준으로 캐시해 넘긴다)
+        dag_spec = dag_spec or load_dag(self.config_loader.config_data, only_steps)
+        self.dag_cfg = {name: dict(info) for name, info in dag_spec["dag"].items()}
+        self._sweep_cfgs = dag_spec["sweeps"]
+
+        # 스텝 설정에 sweep: 이 있으면 병렬 variant + 선택 노드로 펼친다
+        self.sweep_dir = options.get("sweep_dir", "state/sweeps")
+        # 재시도 attempt 가 이어서 진행할 수 있도록 스텝별 체크포인트 디렉토리 제공
+        self.checkpoint_dir = options.get("checkpoint_dir", "state/checkpoints")
+        # 증분 처리 스텝의 watermark 저장소 + --full-refresh (pipeline/watermark.py)
+        self.full_refresh = _to_bool(full_refresh, default=False)
+        self.state_env = {WATERMARK_DB_ENV: options.get("watermark_db", "state/watermarks.sqlite")}
+        if self.full_refresh:
+            self.state_env[FULL_REFRESH_ENV] = "1"
+        self.sweeps = {}  # step_name -> {"variants": [...], "sweep": cfg, "dir": ...}
+        # run 로그 디렉토리가 없어도 run 끼리 variant 출력/best.json/체크포인트가 섞이지 않도록 run id 로 분리
+        self._state_run_id = self.run_id or new_run_id()
+        self._selectors = {}  # step_name -> SweepSelector
+        self._sweep_monitors = []
+        self._expand_sweeps()
+
+        # 프로파일링: profile 인자("all" 또는 스텝 이름 목록, --profile) + dag 항목의 profile: true
+        self.profile_cfg = dict(options.get("profile") or {})
+        self.profile_steps = self._resolve_profile_steps(profile)
+        self.profiler = profiler or self.profile_cfg.get("profiler", "cprofile")
+        if self.profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{self.profiler}'. Choose from {', '.join(PROFILERS)}.")
+        self.profile_dir = self._profile_dir() if self.profile_steps else None
+
+        # 공유 외부 자원별 동시 실행 슬롯 (pools 섹션, dag 항목의 pool/pool_slots)
+        self.pools = ConcurrencyPools(parse_pools(self.config_loader.config_data.get("pools")), self.logger)
 
         self.steps = []
+        self.sensor_steps = set()
         self.failed_steps = []
         self.skipped_steps = []
         self._register_steps()
 
+    def _expand_sweeps(self):
+        """sweep 스텝 X -> X__v0..X__vN (병렬 variant) + X (best variant 선택 노드)"""
+        expanded = {}
+        for name, info in self.dag_cfg.items():
+            sweep_cfg = self._sweep_cfgs.get(name)
+            if not sweep_cfg:
+                expanded[name] = info
+                continue
+
+            sweep_dir = os.path.join(self.sweep_dir, self.target_date or "latest", self._state_run_id, name)
+            variants = write_variant_configs(name, info["config"], sweep_dir)
+            self.sweeps[name] = {"variants": variants, "sweep": sweep_cfg, "dir": sweep_dir}
+            for variant in variants:
+                expanded[variant["name"]] = dict(info, config=variant["config"])
+            # 선택 노드는 일부 variant 가 실패/조기 종료돼도 성공한 것 중에서 고른다
+            expanded[name] = {
+                "type": "select", "depends_on": [v["name"] for v in variants], "trigger_rule": "one_success",
+                "estimate_s": 0,
+            }
+            self.logger.info(
+                f"🔀 Sweep '{name}': {len(variants)} variant(s) ({sweep_cfg.get('mode', 'grid')}) -> {sweep_dir}"
+            )
+        self.dag_cfg = expanded
+
+    def _resolve_profile_steps(self, profile) -> set:
+        if profile in ("all", True):
+            return {name for name, info in self.dag_cfg.items() if info.get("type") != "sensor"}
+        requested = {s.strip() for s in profile.split(",") if s.strip()} if isinstance(profile, str) else set(profile or [])
+        unknown = requested - {n.split(VARIANT_SEPARATOR, 1)[0] for n in self.dag_cfg}
+        if unknown:
+            self.logger.warning(f"⚠️ Profiling requested for unknown step(s): {', '.join(sorted(unknown))}")
+        # sweep variant 는 원래 스텝 이름으로도 선택된다
+        return {
+            name for name, info in self.dag_cfg.items()
+            if info.get("type") != "sensor" and (
+                _to_bool(info.get("profile", False)) or name.split(VARIANT_SEPARATOR, 1)[0] in requested
+            )
+        }
+
+    def _profile_dir(self) -> str:
+        # run 로그 디렉토리가 있으면 그 아래, 없으면 options.profile.dir/<date>/<run>
+        if self.log_layout:
+            return os.path.join(self.log_layout.run_dir, "profiles")
+        run = self.run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.profile_cfg.get("dir", "state/profiles"), self.target_date or "latest", run)
+
+    def _step_profile(self, step_name):
+        if step_name not in self.profile_steps:
+            return None
+        return {
+            "dir": self.profile_dir, "profiler": self.profiler,
+            "interval_ms": float(self.profile_cfg.get("interval_ms", 5.0)),
+        }
+
+    def _variant_env(self, step_name) -> dict:
+        env = {WATERMARK_KEY_ENV: step_name}
+        for sweep_name, sweep in self.sweeps.items():
+            for variant in sweep["variants"]:
+                if variant["name"] == step_name:
+                    env[METRICS_FILE_ENV] = variant["metrics_file"]
+                    # variant 는 원래 스텝의 watermark 로 같은 구간을 조회하고, 전진은 선택 노드가 best 것만 한 번
+                    env[WATERMARK_KEY_ENV] = sweep_name
+                    env[PENDING_WATERMARK_ENV] = os.path.join(variant["dir"], PENDING_WATERMARK_FILE)
+        # sweep 선택 노드에 의존하는 스텝은 best.json 경로를 받는다
+        for dep in self.dag_cfg[step_name].get("depends_on", []):
+            if dep in self.sweeps:
+                env[best_file_env(dep)] = os.path.join(self.sweeps[dep]["dir"], "best.json")
+        return env
+
     def _register_steps(self):
         log_level = self.config_loader.get_log_level()
 
         for step_name, step_info in self.dag_cfg.items():
+            if step_info.get("type") == "select":
+                sweep = self.sweeps[step_name]
+                self.logger.info(f"Registering sweep selector: {step_name} <- {len(sweep['variants'])} variant(s)")
+                selector = SweepSelector(
+                    step_name, sweep["variants"], metric=sweep["sweep"].get("metric", "score"),
+                    goal=sweep["sweep"].get("goal", "max"), sweep_dir=sweep["dir"], logger=self.logger,
+                )
+                self._selectors[step_name] = selector
+                profile = self._step_profile(step_name)
+                # in-process 노드는 워커 스레드 안에서 직접 프로파일
+                self.steps.append(ProfiledStep(
+                    selector, output_dir=profile["dir"], profiler=profile["profiler"], interval_ms=profile["interval_ms"]
+                ) if profile else selector)
+                continue
+
+            if step_info.get("type") == "sensor":
+                # sensor 는 프로세스를 띄우지 않는다. 설정 오류는 등록 시점에 드러나도록 미리 생성
+                sensor = self.build_sensor(step_name)
+                self.sensor_steps.add(step_name)
+                self.logger.info(f"Registering sensor: {step_name} -> {sensor.describe()}")
+                continue
+
             script = step_info.get("script")
             config_path = step_info.get("config")
             retries = step_info.get("retries", 1)
 
-            step_logger = setup_logger(
-                step_name, self.config_loader.get_log_file(step_name), self.config_loader.get_log_level()
-            )
+            if self.log_layout:
+                # 파일 출력은 attempt 별 핸들러가 담당 (StepRunner 참고)
+                step_logger = setup_logger(step_name, None, log_level, layout=self.log_layout)
+            else:
+                step_logger = setup_logger(
+                    step_name, self.config_loader.get_log_file(step_name), self.config_loader.get_log_level()
+                )
 
             if not script or not config_path:
                 raise ValueError(f"Step '{step_name}' must have 'script' and 'config'.")
@@ -76,72 +270,115 @@ class PipelineBuilder:
             if not os.path.exists(config_path):
                 raise FileNotFoundError(f"Config for step '{step_name}' not found: {config_path}")
 
-            self.logger.info(f"Registering step: {step_name} -> {script}")
+            pool, pool_slots = self.step_pool(step_name)
+            if pool:
+                self.pools.validate_step(step_name, pool, pool_slots)
+
+            self.logger.info(f"Registering step: {step_name} -> {script}" + (f" (pool: {pool} x{pool_slots})" if pool else ""))
 
             self.steps.append(StepRunner(
                 name=step_name,
                 script_path=script,
                 config_path=config_path,
                 logger=step_logger,
+                log_file=None if self.log_layout else self.config_loader.get_log_file(step_name),
                 retries=retries,
                 log_level=log_level,
-                target_date=self.target_date
+                target_date=self.target_date,
+                log_layout=self.log_layout,
+                metrics=self.metrics,
+                env=dict(self.state_env, **self._variant_env(step_name)),
+                checkpoint_root=self.checkpoint_dir,
+                run_id=self._state_run_id,
+                profile=self._step_profile(step_name)
             ))
         self._print_dag_structure()
 
+    def build_sensor(self, step_name):
+        return build_sensor(step_name, self.dag_cfg[step_name].get("sensor"), self.target_date)
+
+    def _run_single(self, step_name) -> dict:
+        """스텝 하나를 현재 스레드에서 끝까지 실행 (sensor 면 조건 충족까지 대기)"""
+        if step_name in self.sensor_steps:
+            return wait_for_sensor(self.build_sensor(step_name), self.logger)
+        step = next(s for s in self.steps if s.name == step_name)
+        return step.run("subprocess")
+
+    def step_pool(self, step_name):
+        info = self.dag_cfg.get(step_name, {})
+        pool = info.get("pool")
+        return pool, int(info.get("pool_slots", 1)) if pool else 0
+
     def _build_dependency_graph(self):
         """
         graph: parent -> [children]
         in_degree: child -> #parents
         reverse: child -> [parents]
         """
-        graph = defaultdict(list)
-        in_degree = defaultdict(int)
-        reverse = defaultdict(list)
+        return build_dependency_graph(self.dag_cfg)
 
-        for step_name, step_info in self.dag_cfg.items():
-            deps = step_info.get("depends_on", []) or []
-            for dep in deps:
-                graph[dep].append(step_name)
-                reverse[step_name].append(dep)
-                in_degree[step_name] += 1
-            if step_name not in in_degree:
-                in_degree[step_name] = 0
+    def _start_metrics(self, max_workers):
+        if self.metrics:
+            self.metrics.start_run(
+                {name: info.get("depends_on", []) for name, info in self.dag_cfg.items()},
+                max_workers, run_id=self.run_id
+            )
 
-        return graph, in_degree, reverse
+    def _finish_metrics(self, step_name, result):
+        state = "success" if result.get("success") else "skipped" if result.get("skipped") else "failed"
+        if self.metrics:
+            self.metrics.step_finished(step_name, state)
+        self._record_history(step_name, state, result)
 
     def get_step_names(self):
-        return [step.name for step in self.steps]
+        return list(self.dag_cfg)
 
     def run_all(self):
         """순차 실행 (기존 동작 유지)"""
         self.logger.info("🚀 Pipeline execution started.")
         success_steps = []
+        self._start_metrics(max_workers=1)
 
-        for step in self.steps:
-            self.logger.info(f"▶️ Running step: {step.name}")
-            result = step.run("subprocess")
+        for step_name in self.get_step_names():
+            self.logger.info(f"▶️ Running step: {step_name}")
+            if self.metrics:
+                self.metrics.step_started(step_name)
+            result = self._run_single(step_name)
             reason = result.get("error") or result.get("stderr") or "unknown error"
 
             if result.get("success"):
-                success_steps.append(step.name)
+                success_steps.append(step_name)
             elif result.get("skipped"):
-                self.logger.warning(f"⚠️ Step '{step.name}' was skipped.")
-                self.skipped_steps.append(step.name)
+                self.logger.warning(f"⚠️ Step '{step_name}' was skipped.")
+                self.skipped_steps.append(step_name)
             else:
-                self.logger.error(f"❌ Step '{step.name}' failed: {reason}")
-                self.failed_steps.append((step.name, reason))
+                self.logger.error(f"❌ Step '{step_name}' failed: {reason}")
+                self.failed_steps.append((step_name, reason))
+            self._finish_metrics(step_name, result)
 
         self._print_summary(success_steps)
+        self._write_profile_report()
 
     def run_step(self, step_name):
-        step_dict = {s.name: s for s in self.steps}
-        step = step_dict.get(step_name)
-        if not step:
+        if step_name not in self.dag_cfg:
             self.logger.error(f"Step '{step_name}' not found in DAG.")
             return
+        if step_name in self.sweeps:
+            # sweep 스텝 단독 실행: 선택 노드만으로는 비교할 variant 결과가 없으므로 variant 들 + 선택 노드를 실행
+            names = [v["name"] for v in self.sweeps[step_name]["variants"]] + [step_name]
+            self.dag_cfg = {
+                name: dict(self.dag_cfg[name], depends_on=[d for d in self.dag_cfg[name]["depends_on"] if d in names])
+                for name in names
+            }
+            self.logger.info(f"🔀 Running sweep step '{step_name}' as {len(names) - 1} variant(s) + selection")
+            self.run_all_parallel()
+            return
 
-        result = step.run("subprocess")
+        self._start_metrics(max_workers=1)
+        if self.metrics:
+            self.metrics.step_started(step_name)
+        result = self._run_single(step_name)
+        self._finish_metrics(step_name, result)
         reason = result.get("error") or result.get("stderr") or "unknown error"
 
         if result.get("success"):
@@ -152,116 +389,235 @@ class PipelineBuilder:
         else:
             self.logger.error(f"❌ Step '{step_name}' failed: {reason}")
             self.failed_steps.append((step_name, reason))
+        self._write_profile_report()
 
-    def run_all_parallel(self, max_workers=4):
+    def run_all_parallel(self, max_workers=None, adaptive=None):
         """
         병렬 실행 + 의존성 제어.
         - 기본: 부모 성공이어야 자식 실행. 부모 실패/스킵 시 자식 스킵.
         - 전역/스텝 force 활성: 부모 실패/스킵이어도 자식 강제 실행.
         - force가 하나도 없으면, 최초 실패 시 전체 중단(기존 동작 유지).
+        - adaptive: 동시 실행 수를 호스트 부하/이력에 따라 [min, max] 안에서 조절.
+          (None 이면 options.adaptive_workers.enabled 설정을 따른다)
+        - speculative: true 스텝이 이력 p95 x multiplier 를 넘기면 빈 슬롯에 중복 실행, 먼저 끝난 쪽 채택.
         """
         self.logger.info("🚀 DAG parallel execution started.")
-        graph, in_degree, reverse = self._build_dependency_graph()
         name_to_step = {step.name: step for step in self.steps}
 
-        # ✅ 스텝별 강제 실행 플래그 (입력 안정 변환)
-        step_force = {name: _to_bool(info.get("force", False), default=False) for name, info in self.dag_cfg.items()}
-        force_any = self.global_force or any(step_force.values())
-
-        # 상태 추적
-        status = {}   # name -> "success" | "skipped" | "failed"
-        completed = set()
-        success_steps = []
+        max_workers = max_workers or self.max_workers
+        adaptive = self.adaptive_cfg.get("enabled", False) if adaptive is None else adaptive
+        scaler = None
+        if adaptive:
+            scaler = AdaptiveConcurrency(
+                self.logger,
+                min_workers=int(self.adaptive_cfg.get("min_workers", 1)),
+                max_workers=int(self.adaptive_cfg.get("max_workers", max(max_workers, 1))),
+                interval_s=float(self.adaptive_cfg.get("interval_s", 5)),
+                history=self.history,
+            )
+            limit, pool_size = scaler.initial(), scaler.max_workers
+        else:
+            limit = pool_size = max_workers
+
+        self._start_metrics(limit)
+        run = self.new_dag_run()
+
+        # 워커 완료와 sensor 완료를 한 큐로 받아 어느 쪽이든 즉시 자식 평가
+        completions = queue.Queue()
+        sensors = SensorManager(lambda name, result: completions.put((name, result)), self.logger) \
+            if self.sensor_steps else None
+        running = {}  # step_name -> future (워커 슬롯 사용 중)
+        duplicates = {}  # step_name -> (future, runner) speculative 중복 실행 (역시 슬롯 사용)
+        waiting = set()  # 결과를 아직 큐에서 받지 못한 sensor (SensorManager.active 는 결과 전달 전에 줄어든다)
+        settled = set()  # 승자가 정해져 남은 attempt 결과는 버릴 스텝
+        speculation = SpeculationPolicy(self.dag_cfg, self.history, self.logger, **self.speculative_cfg)
+        self.speculation = speculation
+
+        def _on_future_done(name):
+            return lambda future: completions.put((name, future))
+
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            while True:
+                # 기존 동작 유지: force 전혀 없고 실패 발생 시 신규 제출 중단
+                if run.aborted:
+                    self.logger.error("🛑 Aborting DAG execution due to failure (force mode is off).")
+                    if sensors:
+                        sensors.cancel_all()
+                    break
 
-        # in_degree==0 루트 노드 큐
-        queue = deque([name for name, deg in in_degree.items() if deg == 0])
-
-        def _format_parent_statuses(child):
-            parents = reverse.get(child, [])
-            parts = [f"{p}={status.get(p, 'pending')}" for p in parents]
-            return ", ".join(parts) if parts else "(no-parents)"
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {}
-
-            # 초기 큐 제출
-            while queue:
-                step_name = queue.popleft()
-                futures[executor.submit(_run_step_wrapper, name_to_step[step_name])] = step_name
-
-            while futures:
-                for future in as_completed(list(futures.keys())):
-                    step_name = futures.pop(future)
-                    try:
-                        _name, result = future.result()
-                    except Exception as e:
-                        result = {"success": False, "stderr": str(e)}
-
-                    reason = result.get("error") or result.get("stderr") or "unknown error"
-
-                    if result.get("success"):
-                        self.logger.info(f"✅ Step '{step_name}' completed.")
-                        status[step_name] = "success"
-                        success_steps.append(step_name)
-                    elif result.get("skipped"):
-                        self.logger.warning(f"⚠️ Step '{step_name}' was skipped.")
-                        status[step_name] = "skipped"
-                        self.skipped_steps.append(step_name)
-                    else:
-                        self.logger.error(f"❌ Step '{step_name}' failed: {reason}")
-                        status[step_name] = "failed"
-                        self.failed_steps.append((step_name, reason))
-
-                    completed.add(step_name)
-
-                    # 자식 후보 in_degree 갱신 및 평가
-                    for child in graph.get(step_name, []):
-                        in_degree[child] -= 1
-                        if in_degree[child] == 0:
-                            parents = reverse.get(child, [])
-                            parent_statuses = [status.get(p) for p in parents]
-                            any_parent_not_success = any(s != "success" for s in parent_statuses)
-
-                            if any_parent_not_success and not (self.global_force or step_force.get(child, False)):
-                                # 강제 아님 → 스킵 (부모 상태 함께 로깅)
-                                self.logger.warning(
-                                    f"⏭️  Skipping '{child}' due to non-success dependency "
-                                    f"(parents: {_format_parent_statuses(child)}); force is off."
-                                )
-                                status[child] = "skipped"
-                                self.skipped_steps.append(child)
-                                completed.add(child)
-
-                                # 손자들 in_degree 감소 전파
-                                for gchild in graph.get(child, []):
-                                    in_degree[gchild] -= 1
-                                    if in_degree[gchild] == 0:
-                                        queue.append(gchild)
-                                continue
-
-                            # 실행 가능 (정상 또는 강제)
-                            if any_parent_not_success and (self.global_force or step_force.get(child, False)):
-                                self.logger.warning(
-                                    f"⚡ Forcing run of '{child}' "
-                                    f"(parents: {_format_parent_statuses(child)})."
-                                )
-                            queue.append(child)
-
-                # 큐에 쌓인 작업 제출
-                while queue:
-                    nxt = queue.popleft()
-                    if nxt in completed or nxt in (futures.values()):
+                # sensor 는 워커 슬롯 없이 SensorManager 가 평가
+                for step_name in [n for n in run.ready if n in self.sensor_steps]:
+                    run.take_ready(step_name)
+                    if self.metrics:
+                        self.metrics.step_started(step_name)
+                    waiting.add(step_name)
+                    sensors.start(self.build_sensor(step_name))
+
+                # 현재 limit 안에서 ready 스텝 제출 (pool 슬롯이 없는 스텝은 ready 에 남겨둔다)
+                while run.ready and len(running) + len(duplicates) < limit:
+                    step_name = run.pop_dispatchable(lambda n: self.pools.try_acquire(n, *self.step_pool(n)))
+                    if step_name is None:
+                        break
+                    future = executor.submit(_run_step_wrapper, name_to_step[step_name], self.metrics)
+                    running[step_name] = future
+                    speculation.step_started(step_name)
+                    future.add_done_callback(_on_future_done(step_name))
+
+                # ready 스텝을 다 넣고도 슬롯이 남으면 straggler 중복 실행
+                for step_name in speculation.stragglers([n for n in running if n not in settled]):
+                    if len(running) + len(duplicates) >= limit:
+                        break
+                    if not self.pools.try_acquire(step_name, *self.step_pool(step_name)):
                         continue
-                    futures[executor.submit(_run_step_wrapper, name_to_step[nxt])] = nxt
+                    runner = name_to_step[step_name].speculative_copy()
+                    future = executor.submit(_run_step_wrapper, runner)
+                    duplicates[step_name] = (future, runner)
+                    speculation.launched_for(step_name)
+                    future.add_done_callback(_on_future_done(step_name))
 
-                # 기존 동작 유지: force 전혀 없고 실패 발생 시 중단
-                if not force_any and any(v == "failed" for v in status.values()):
-                    self.logger.error("🛑 Aborting DAG execution due to failure (force mode is off).")
+                if not running and not duplicates and not waiting:
                     break
 
-        self._print_summary(success_steps)
+                # 하나라도 끝나면 즉시 자식 평가 (adaptive / speculation 이면 주기적으로 깨어나 재평가)
+                timeouts = [t for t in (scaler.interval_s if scaler else None,
+                                        speculation.check_interval_s if speculation.enabled else None) if t]
+                try:
+                    events = [completions.get(timeout=min(timeouts) if timeouts else None)]
+                except queue.Empty:
+                    events = []
+                while not completions.empty():
+                    events.append(completions.get_nowait())
+
+                for step_name, payload in events:
+                    if isinstance(payload, Future):
+                        is_duplicate = step_name in duplicates and duplicates[step_name][0] is payload
+                        if is_duplicate:
+                            duplicates.pop(step_name)
+                        else:
+                            running.pop(step_name, None)
+                        self.pools.release(*self.step_pool(step_name))
+                        try:
+                            _name, result = payload.result()
+                        except Exception as e:
+                            result = {"success": False, "stderr": str(e)}
+
+                        if step_name in settled:
+                            # speculative 경쟁에서 진 attempt (이미 종료 요청됨)
+                            if not running.get(step_name) and step_name not in duplicates:
+                                settled.discard(step_name)
+                                # 진 attempt 까지 끝난 뒤 공유 체크포인트 정리 (승자가 먼저 지우면 저장과 경합)
+                                name_to_step[step_name].cleanup_checkpoints()
+                            continue
+                        other = running.get(step_name) if is_duplicate else duplicates.get(step_name, (None,))[0]
+                        if other is not None:
+                            if not result.get("success"):
+                                continue  # 실패한 쪽은 버리고 남은 attempt 결과를 기다린다
+                            loser = name_to_step[step_name] if is_duplicate else duplicates[step_name][1]
+                            loser.kill("another attempt of this step finished first")
+                            settled.add(step_name)
+                        if step_name in speculation.speculated:
+                            won = is_duplicate and bool(result.get("success"))
+                            speculation.resolved(step_name, speculative_won=won)
+                            if other is None and result.get("success"):
+                                name_to_step[step_name].cleanup_checkpoints()  # 남은 attempt 없음
+                            # 이력(p95 임계값)에는 승자 attempt 가 아니라 원본 제출부터의 wall time
+                            result = dict(result, speculative_won=won, duration_s=speculation.wall_time(step_name))
+                        if scaler:
+                            scaler.observe(result)
+                    else:
+                        result = payload  # sensor 결과
+                        waiting.discard(step_name)
+
+                    self.complete_step(run, step_name, result)
+
+                if scaler:
+                    new_limit = scaler.adjust(running=len(running), backlog=len(run.ready))
+                    if new_limit != limit and self.metrics:
+                        self.metrics.set_max_workers(new_limit)
+                    limit = new_limit
 
-    def _print_summary(self, success_steps):
+        if sensors:
+            sensors.stop()
+        self.finish_dag_run(run)
+
+    def plan(self, max_workers=None, backfill=1, trials=0, default_s=60.0) -> dict:
+        """실행 없이 이력/estimate_s 기반으로 스케줄을 시뮬레이션 (--plan).
+        backfill > 1 이면 같은 DAG 를 그 수만큼 복제해 워커/풀을 공유하는 것으로 본다.
+        """
+        max_workers = max_workers or self.max_workers
+        simulator = PlanSimulator(
+            replicate_dag(self.dag_cfg, backfill), history=self.history,
+            pools=self.pools.slots, sensor_steps=self.sensor_steps, default_s=default_s,
+        )
+        report = simulator.plan(max_workers, trials=trials)
+        log_plan(report, self.logger)
+        return report
+
+    def new_dag_run(self) -> DagRun:
+        # ✅ 스텝별 강제 실행 플래그 (입력 안정 변환)
+        step_force = {name: _to_bool(info.get("force", False), default=False) for name, info in self.dag_cfg.items()}
+        run = DagRun(self.dag_cfg, step_force, self.global_force, self.logger, metrics=self.metrics)
+        pruned = self._start_sweep_monitors()
+        # 선택 노드는 이번 run 에서 성공했고 조기 종료되지 않은 variant 만 비교
+        for name, selector in self._selectors.items():
+            selector.bind(run.status, pruned.get(name))
+        return run
+
+    def _start_sweep_monitors(self) -> dict:
+        """halving 이 설정된 sweep 의 모니터 시작. {step_name: 조기 종료된 variant 집합}"""
+        pruned = {}
+        runners = {step.name: step for step in self.steps}
+        for name, sweep in self.sweeps.items():
+            halving_cfg = sweep["sweep"].get("halving")
+            if not halving_cfg:
+                continue
+            halving = SuccessiveHalving(
+                rungs=halving_cfg.get("rungs", [1]), eta=halving_cfg.get("eta", 3),
+                min_reports=halving_cfg.get("min_reports"), goal=sweep["sweep"].get("goal", "max"),
+            )
+            self._sweep_monitors.append(SweepMonitor(
+                name, sweep["variants"], runners, halving, metric=sweep["sweep"].get("metric", "score"),
+                logger=self.logger, poll_interval=float(halving_cfg.get("poll_interval_s", 1.0)),
+            ).start())
+            pruned[name] = halving.pruned
+        return pruned
+
+    def finish_dag_run(self, run: DagRun, pool_summary: dict = None):
+        """pool_summary: 공유 pool 을 쓰는 경우(데몬) 이 run 의 대기 요약"""
+        for monitor in self._sweep_monitors:
+            monitor.stop()
+        self._sweep_monitors = []
+        self.skipped_steps.extend(run.skipped_steps)
+        self.failed_steps.extend(run.failed_steps)
+        self._print_summary(run.success_steps, pool_summary)
+        self._write_profile_report()
+
+    def _write_profile_report(self):
+        """attempt 별 프로파일을 스텝별/run 전체 collapsed + flamegraph 로 합친다"""
+        if not self.profile_dir or not os.path.isdir(self.profile_dir):
+            return
+        profiles = merge_profiles(self.profile_dir, VARIANT_SEPARATOR)
+        if not profiles:
+            return
+        self.logger.info(f"🔥 Profiles ({self.profiler}) for {len(profiles)} step(s): {self.profile_dir}/run.svg")
+        totals = {name: sum(collapsed.values()) for name, collapsed in profiles.items()}
+        for step_name in sorted(totals, key=totals.get, reverse=True):
+            hot = ", ".join(f"{label} {us / 1e6:.2f}s" for label, us in top_frames(profiles[step_name], 3))
+            self.logger.info(f"   - {step_name}: {totals[step_name] / 1e6:.2f}s profiled; top self time: {hot}")
+
+    def complete_step(self, run: DagRun, step_name, result) -> str:
+        state = run.complete(step_name, result)
+        self._record_history(step_name, state, result)
+        return state
+
+    def _record_history(self, step_name, state, result):
+        if self.history and result.get("duration_s") is not None:
+            self.history.record(
+                step_name, state, result.get("duration_s"), result.get("cpu_s"),
+                run_id=self.run_id, target_date=self.target_date
+            )
+
+    def _print_summary(self, success_steps, pool_summary: dict = None):
         self.logger.info("📋 Pipeline Summary")
         if success_steps:
             self.logger.info(f"✅ Successful: {', '.join(success_steps)}")
@@ -273,6 +629,15 @@ class PipelineBuilder:
                 self.logger.error(f" - {name}: {reason}")
         else:
             self.logger.info("🎉 All steps completed successfully.")
+        if self.speculation and self.speculation.launched:
+            self.logger.info(
+                f"🏎️  Speculative attempts: {self.speculation.launched} launched, {self.speculation.won} won"
+            )
+        for pool, info in (pool_summary if pool_summary is not None else self.pools.summary()).items():
+            self.logger.info(
+                f"⏳ Pool '{pool}' ({info['slots']} slots): waited {info['wait_s']:.1f}s "
+                f"across {info['waited_steps']} step(s)"
+            )
 
     def _print_dag_structure(self):
         """DAG를 컴포넌트별 + 레벨(계층) 단위로 출력.
@@ -0,0 +1,258 @@
+# pipeline/planner.py
+"""DAG 를 실행하지 않고 스케줄러 동작을 시뮬레이션해 makespan 을 예측한다 (main.py --plan).
+
+스텝 소요 시간은 실행 이력(RunHistory) 분포 -> dag 항목의 estimate_s -> default_s 순으로 정한다.
+시뮬레이션은 run_all_parallel 과 같은 규칙을 따른다:
+  ready FIFO, max_workers 슬롯, pool 슬롯 대기, sensor 는 워커 슬롯을 쓰지 않음.
+"""
+
+import heapq
+import random
+import statistics
+from collections import deque
+
+DEFAULT_WORKER_SWEEP = (1, 2, 4, 8, 16, 32)
+
+
+def replicate_dag(dag_cfg: dict, copies: int) -> dict:
+    """backfill 처럼 같은 DAG 를 날짜 수만큼 복제 (스텝 이름 뒤에 @<index>)"""
+    if copies <= 1:
+        return dag_cfg
+    out = {}
+    for k in range(copies):
+        for name, info in dag_cfg.items():
+            out[f"{name}@{k}"] = dict(info, depends_on=[f"{d}@{k}" for d in info.get("depends_on") or []])
+    return out
+
+
+def _base_name(name: str) -> str:
+    return name.split("@", 1)[0]
+
+
+class PlanSimulator:
+    def __init__(self, dag_cfg: dict, history=None, pools: dict = None, sensor_steps=(), default_s: float = 60.0):
+        self.dag_cfg = dag_cfg
+        self.history = history
+        self.pools = dict(pools or {})
+        self.sensor_steps = set(sensor_steps)
+        self.default_s = default_s
+
+        names = list(dag_cfg)
+        self.names = names
+        index = {name: i for i, name in enumerate(names)}
+        self.children = [[] for _ in names]
+        self.parents = [[] for _ in names]
+        for name, info in dag_cfg.items():
+            for dep in info.get("depends_on") or []:
+                if dep not in index:
+                    raise ValueError(f"Step '{name}' depends on unknown step '{dep}'.")
+                self.children[index[dep]].append(index[name])
+                self.parents[index[name]].append(index[dep])
+        self.in_degree = [len(p) for p in self.parents]
+        self.pool_of = []
+        for name in names:
+            info = dag_cfg[name]
+            pool = info.get("pool")
+            self.pool_of.append((pool, int(info.get("pool_slots", 1))) if pool else None)
+        self.is_sensor = [_base_name(n) in self.sensor_steps for n in names]
+
+        # 스텝별 소요 시간 분포 (이력 우선)
+        self.samples, self.sources = [], []
+        cache = {}
+        for name in names:
+            base = _base_name(name)
+            if base not in cache:
+                cache[base] = self._distribution(base, dag_cfg[name])
+            samples, source = cache[base]
+            self.samples.append(samples)
+            self.sources.append(source)
+
+    def _distribution(self, base: str, info: dict):
+        if self.history:
+            observed = self.history.durations(base)
+            if observed:
+                return observed, "history"
+        estimate = info.get("estimate_s", info.get("estimate"))
+        if estimate is not None:
+            return [float(estimate)], "estimate"
+        return [self.default_s], "default"
+
+    def expected_durations(self) -> list:
+        return [statistics.median(s) for s in self.samples]
+
+    def sample_durations(self, rng: random.Random) -> list:
+        return [rng.choice(s) for s in self.samples]
+
+    def critical_path(self, durations: list):
+        """(길이, 경로 스텝 이름 목록) — Kahn 순서로 최장 경로 계산"""
+        n = len(self.names)
+        finish = [0.0] * n
+        best_parent = [-1] * n
+        indeg = list(self.in_degree)
+        q = deque(i for i in range(n) if indeg[i] == 0)
+        order = []
+        while q:
+            u = q.popleft()
+            order.append(u)
+            start = 0.0
+            for p in self.parents[u]:
+                if finish[p] > start:
+                    start, best_parent[u] = finish[p], p
+            finish[u] = start + durations[u]
+            for v in self.children[u]:
+                indeg[v] -= 1
+                if indeg[v] == 0:
+                    q.append(v)
+        if len(order) != n:
+            raise ValueError("DAG contains a cycle.")
+        if not n:
+            return 0.0, []
+        end = max(range(n), key=finish.__getitem__)
+        path = []
+        while end != -1:
+            path.append(self.names[end])
+            end = best_parent[end]
+        return max(finish), path[::-1]
+
+    def simulate(self, workers: int, durations: list) -> dict:
+        """이벤트 기반 리스트 스케줄링. O((V+E) log V)"""
+        n = len(self.names)
+        indeg = list(self.in_degree)
+        ready = deque()
+        pool_used = {p: 0 for p in self.pools}
+        pool_waiting = {p: deque() for p in self.pools}
+        free_workers = list(range(workers))  # min-heap: 낮은 번호 워커부터 사용
+        heapq.heapify(free_workers)
+        busy = [0.0] * workers
+        events = []  # (finish_time, seq, step, worker)
+        seq = 0
+        now = 0.0
+        done = 0
+        pool_wait = {p: 0.0 for p in self.pools}
+        blocked_since = {}
+
+        def _start(i, worker):
+            nonlocal seq
+            heapq.heappush(events, (now + durations[i], seq, i, worker))
+            seq += 1
+            if worker is not None:
+                busy[worker] += durations[i]
+
+        def _make_ready(i):
+            # sensor 는 워커 슬롯 없이 바로 시작
+            if self.is_sensor[i]:
+                _start(i, None)
+            else:
+                ready.append(i)
+
+        for i in range(n):
+            if indeg[i] == 0:
+                _make_ready(i)
+
+        def _acquire(i, name, slots) -> bool:
+            if pool_used.get(name, 0) + slots > self.pools.get(name, slots):
+                return False
+            pool_used[name] = pool_used.get(name, 0) + slots
+            return True
+
+        while done < n:
+            # 풀 대기 스텝 먼저 (실제 스케줄러처럼 먼저 재시도). 풀별 FIFO 에서 남은 슬롯에 들어가는 head 만 꺼낸다
+            for name, waiting in pool_waiting.items():
+                while waiting and free_workers and _acquire(waiting[0], *self.pool_of[waiting[0]]):
+                    i = waiting.popleft()
+                    pool_wait[name] = pool_wait.get(name, 0.0) + now - blocked_since.pop(i)
+                    _start(i, heapq.heappop(free_workers))
+
+            while ready and free_workers:
+                i = ready.popleft()
+                pool = self.pool_of[i]
+                if pool and not _acquire(i, *pool):
+                    pool_waiting.setdefault(pool[0], deque()).append(i)
+                    blocked_since[i] = now
+                    continue
+                _start(i, heapq.heappop(free_workers))
+
+            if not events:
+                break  # pool 정의보다 큰 slot 요구 등으로 진행 불가
+            now, _, i, worker = heapq.heappop(events)
+            done += 1
+            if worker is not None:
+                heapq.heappush(free_workers, worker)
+            pool = self.pool_of[i]
+            if pool:
+                name, slots = pool
+                pool_used[name] -= slots
+            for v in self.children[i]:
+                indeg[v] -= 1
+                if indeg[v] == 0:
+                    _make_ready(v)
+
+        makespan = now
+        return {
+            "workers": workers,
+            "makespan_s": makespan,
+            "total_work_s": sum(d for d, s in zip(durations, self.is_sensor) if not s),
+            "worker_utilization": [(b / makespan) if makespan > 0 else 0.0 for b in busy],
+            "pool_wait_s": pool_wait,
+            "completed": done,
+        }
+
+    def plan(self, workers: int, sweep=DEFAULT_WORKER_SWEEP, trials: int = 0, seed: int = 0) -> dict:
+        expected = self.expected_durations()
+        cp_length, cp_path = self.critical_path(expected)
+        base = self.simulate(workers, expected)
+
+        sweep_results = []
+        for w in sorted(set(sweep) | {workers}):
+            sim = self.simulate(w, expected)
+            sweep_results.append({"workers": w, "makespan_s": sim["makespan_s"],
+                                  "mean_utilization": statistics.fmean(sim["worker_utilization"])})
+
+        distribution = None
+        if trials > 0:
+            rng = random.Random(seed)
+            makespans = sorted(self.simulate(workers, self.sample_durations(rng))["makespan_s"] for _ in range(trials))
+            distribution = {
+                "trials": trials,
+                "p50_s": makespans[len(makespans) // 2],
+                "p90_s": makespans[min(len(makespans) - 1, int(0.9 * len(makespans)))],
+                "max_s": makespans[-1],
+            }
+
+        sources = {}
+        for name, src in zip(self.names, self.sources):
+            sources[src] = sources.get(src, 0) + 1
+
+        return {
+            "steps": len(self.names),
+            "workers": workers,
+            "expected_makespan_s": base["makespan_s"],
+            "lower_bound_s": max(cp_length, base["total_work_s"] / max(workers, 1)),
+            "critical_path_s": cp_length,
+            "critical_path": cp_path,
+            "worker_utilization": base["worker_utilization"],
+            "pool_wait_s": base["pool_wait_s"],
+            "worker_sweep": sweep_results,
+            "makespan_distribution": distribution,
+            "duration_sources": sources,
+        }
+
+
+def log_plan(report: dict, logger):
+    logger.info(f"🗺️  Plan: {report['steps']} step(s), {report['workers']} worker(s)")
+    logger.info(f"   Expected makespan: {report['expected_makespan_s']:.1f}s "
+                f"(lower bound {report['lower_bound_s']:.1f}s)")
+    dist = report.get("makespan_distribution")
+    if dist:
+        logger.info(f"   Makespan distribution ({dist['trials']} trials): "
+                    f"p50={dist['p50_s']:.1f}s p90={dist['p90_s']:.1f}s max={dist['max_s']:.1f}s")
+    path = report["critical_path"]
+    shown = " -> ".join(path if len(path) <= 12 else path[:6] + ["..."] + path[-5:])
+    logger.info(f"   Critical path ({report['critical_path_s']:.1f}s): {shown}")
+    util = report["worker_utilization"]
+    logger.info("   Worker utilization: " + ", ".join(f"w{i}={u:.0%}" for i, u in enumerate(util)))
+    for pool, wait_s in report["pool_wait_s"].items():
+        logger.info(f"   Pool '{pool}' wait: {wait_s:.1f}s")
+    logger.info("   Worker sweep: " + ", ".join(
+        f"{r['workers']}w={r['makespan_s']:.1f}s" for r in report["worker_sweep"]))
+    logger.info("   Duration sources: " + ", ".join(f"{k}={v}" for k, v in report["duration_sources"].items()))
@@ -0,0 +1,122 @@
+# pipeline/pools.py
+
+import threading
+import time
+from collections import defaultdict
+
+
+def parse_pools(pools_cfg) -> dict:
+    """config.yaml 의 pools 섹션 -> {pool: slots}
+
+    pools:
+      athena: 3            # 짧은 형태
+      s3_export:
+        slots: 2           # 긴 형태
+    """
+    pools = {}
+    for name, cfg in (pools_cfg or {}).items():
+        slots = cfg.get("slots") if isinstance(cfg, dict) else cfg
+        try:
+            slots = int(slots)
+        except (TypeError, ValueError):
+            raise ValueError(f"Pool '{name}' must define an integer 'slots'.")
+        if slots < 1:
+            raise ValueError(f"Pool '{name}' must have at least 1 slot (got {slots}).")
+        pools[name] = slots
+    return pools
+
+
+class ConcurrencyPools:
+    """외부 공유 자원(Athena workgroup 등)별 동시 실행 슬롯.
+
+    max_workers 와 별개로, pool 에 여유 슬롯이 없으면 ready 스텝을 대기시킨다.
+    대기 시간은 pool 별로 누적해서 summary 에 보고한다.
+    데몬처럼 여러 run 이 공유할 때는 owner(run_id) 별로도 누적한다 (summary(owner=...)).
+    """
+
+    def __init__(self, pools: dict = None, logger=None):
+        self.slots = dict(pools or {})
+        self.logger = logger
+        self.used = defaultdict(int)
+        self.wait_s = defaultdict(float)     # pool -> 누적 대기 시간
+        self.waited_steps = defaultdict(set)  # pool -> 대기했던 스텝
+        self._waiting_since = {}              # (owner, step) -> 대기 시작 시각
+        self._owner_wait_s = defaultdict(float)     # (owner, pool) -> 누적 대기 시간
+        self._owner_waited_steps = defaultdict(set)  # (owner, pool) -> 대기했던 스텝
+        self._lock = threading.Lock()
+
+    def define(self, name: str, slots: int):
+        """pool 정의 추가. 여러 설정이 같은 pool 을 다르게 정의하면 큰 값을 쓴다
+        (작은 값을 유지하면 pool_slots 가 그보다 큰 스텝은 영원히 대기)"""
+        with self._lock:
+            current = self.slots.get(name)
+            if current is not None and current >= slots:
+                return
+            self.slots[name] = slots
+        if current is not None and self.logger:
+            self.logger.warning(f"⚠️ Pool '{name}' redefined with more slots: {current} -> {slots}")
+
+    def validate_step(self, step_name: str, pool: str, pool_slots: int):
+        if pool not in self.slots:
+            raise ValueError(f"Step '{step_name}' uses undefined pool '{pool}'.")
+        if pool_slots < 1 or pool_slots > self.slots[pool]:
+            raise ValueError(
+                f"Step '{step_name}' requests {pool_slots} slot(s) of pool '{pool}' "
+                f"which only has {self.slots[pool]}."
+            )
+
+    def try_acquire(self, step_name: str, pool: str, pool_slots: int = 1, owner=None) -> bool:
+        if not pool:
+            return True
+        key = (owner, step_name)
+        with self._lock:
+            if self.used[pool] + pool_slots <= self.slots[pool]:
+                self.used[pool] += pool_slots
+                started = self._waiting_since.pop(key, None)
+                if started is not None:
+                    waited = time.monotonic() - started
+                    self.wait_s[pool] += waited
+                    self._owner_wait_s[(owner, pool)] += waited
+                return True
+            if key not in self._waiting_since:
+                self._waiting_since[key] = time.monotonic()
+                self.waited_steps[pool].add(step_name)
+                self._owner_waited_steps[(owner, pool)].add(step_name)
+                if self.logger:
+                    self.logger.info(
+                        f"⏳ Step '{step_name}' waiting for pool '{pool}' "
+                        f"({self.used[pool]}/{self.slots[pool]} slots in use)"
+                    )
+            return False
+
+    def release(self, pool: str, pool_slots: int = 1):
+        if not pool:
+            return
+        with self._lock:
+            self.used[pool] = max(0, self.used[pool] - pool_slots)
+
+    def summary(self, owner=None, names=None) -> dict:
+        """pool 별 슬롯/대기 요약. owner 를 주면 그 run 의 대기만, names 를 주면 해당 pool 만"""
+        with self._lock:
+            if owner is None:
+                wait_s, waited = self.wait_s, self.waited_steps
+            else:
+                wait_s = {pool: v for (o, pool), v in self._owner_wait_s.items() if o == owner}
+                waited = {pool: v for (o, pool), v in self._owner_waited_steps.items() if o == owner}
+            return {
+                name: {
+                    "slots": slots,
+                    "wait_s": round(wait_s.get(name, 0.0), 3),
+                    "waited_steps": len(waited.get(name, ())),
+                }
+                for name, slots in self.slots.items() if names is None or name in names
+            }
+
+    def forget(self, owner):
+        """끝난 run 의 owner 별 기록 정리 (장시간 데몬 메모리)"""
+        with self._lock:
+            for key in [k for k in self._waiting_since if k[0] == owner]:
+                del self._waiting_since[key]
+            for table in (self._owner_wait_s, self._owner_waited_steps):
+                for key in [k for k in table if k[0] == owner]:
+                    del table[key]
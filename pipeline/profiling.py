@@ -0,0 +1,278 @@
+# pipeline/profiling.py
+"""스텝 CPU 프로파일링 (main.py --profile).
+
+StepRunner 는 프로파일 대상 스텝을 `python -u pipeline/profiling.py --output <prefix> <script> ...` 로 띄운다.
+이 파일은 스크립트로 직접 실행되므로 표준 라이브러리만 사용한다.
+
+- cprofile: 결정적 프로파일. <prefix>.prof (pstats) + 호출 그래프로 근사한 collapsed stack
+- sample:   interval_ms 마다 메인 스레드 스택을 샘플링 (오버헤드 낮음, 실제 스택 그대로)
+
+산출물 (run artifact dir/profiles 아래):
+  <step>/attempt-<n>.collapsed / .svg (/.prof)   attempt 별
+  <step>.collapsed / .svg                          스텝 단위 합산
+  run.collapsed / .svg                             run 전체 (스텝 이름이 최상위 프레임, sweep variant 는 원래 스텝 아래)
+값 단위는 마이크로초.
+"""
+
+import argparse
+import cProfile
+import glob
+import html
+import os
+import pstats
+import runpy
+import signal
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+PROFILERS = ("cprofile", "sample")
+_MAX_DEPTH = 128
+
+
+def _frame_label(filename: str, lineno: int, funcname: str) -> str:
+    if filename in ("~", "") or funcname.startswith("<built-in") or funcname.startswith("<method"):
+        return funcname.replace(";", ":")
+    return f"{funcname} ({os.path.basename(filename)}:{lineno})".replace(";", ":")
+
+
+# ---- 샘플링 프로파일러 ----
+class _Sampler(threading.Thread):
+    def __init__(self, thread_id: int, interval_ms: float, root_file: str = None):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval_s = max(interval_ms, 0.1) / 1000.0
+        self.root_file = root_file
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = self._stack(frame) if frame is not None else None
+            if stack:
+                self.counts[stack] += 1
+
+    def _stack(self, frame):
+        labels = []
+        while frame is not None and len(labels) < _MAX_DEPTH:
+            code = frame.f_code
+            labels.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+            if self.root_file and code.co_filename == self.root_file:
+                return ";".join(reversed(labels))  # 스크립트 모듈 프레임 위(runpy/래퍼)는 제외
+            frame = frame.f_back
+        # root_file 이 있는데 스크립트 밖(시작/종료 구간)이면 버린다
+        return None if self.root_file else ";".join(reversed(labels))
+
+    def stop(self) -> dict:
+        self._stop_event.set()
+        self.join()
+        us = int(self.interval_s * 1_000_000)
+        return {stack: n * us for stack, n in self.counts.items()}
+
+
+# ---- cProfile -> collapsed (호출 간선 비율로 inclusive 시간을 나눠 경로 복원, flameprof 방식 근사) ----
+def pstats_to_collapsed(stats: pstats.Stats, min_us: int = 1) -> dict:
+    raw = stats.stats
+    callees = defaultdict(dict)
+    for func, (_cc, _nc, _tt, _ct, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]  # caller->func 로 호출됐을 때의 inclusive 시간
+
+    out = Counter()
+
+    def _walk(func, inclusive, path, labels):
+        _cc, _nc, tt, ct, _callers = raw[func]
+        share = inclusive / ct if ct > 0 else 0.0
+        own = int(tt * share * 1_000_000)
+        stack = ";".join(labels)
+        if own >= min_us:
+            out[stack] += own
+        if len(labels) >= _MAX_DEPTH:
+            return
+        for child, edge_ct in callees.get(func, {}).items():
+            if child in path:
+                continue  # 재귀는 한 번만 펼친다
+            child_inclusive = edge_ct * share
+            if child_inclusive * 1_000_000 >= min_us:
+                _walk(child, child_inclusive, path | {child}, labels + [_frame_label(*child)])
+
+    roots = [f for f, v in raw.items() if not v[4]]
+    for root in roots:
+        _walk(root, raw[root][3], {root}, [_frame_label(*root)])
+    return dict(out)
+
+
+@contextmanager
+def profile_block(output_prefix: str, profiler: str = "cprofile", interval_ms: float = 5.0, root_file: str = None):
+    """현재 스레드 실행 구간을 프로파일해 <prefix>.collapsed/.svg(/.prof) 로 저장"""
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profiler}'. Choose from {PROFILERS}.")
+    os.makedirs(os.path.dirname(output_prefix) or ".", exist_ok=True)
+    started = time.perf_counter()
+    if profiler == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()
+    else:
+        sampler = _Sampler(threading.get_ident(), interval_ms, root_file)
+        sampler.start()
+    try:
+        yield
+    finally:
+        if profiler == "cprofile":
+            prof.disable()
+            prof.dump_stats(output_prefix + ".prof")
+            collapsed = pstats_to_collapsed(pstats.Stats(prof))
+        else:
+            collapsed = sampler.stop()
+        title = f"{os.path.basename(output_prefix)} ({profiler}, {time.perf_counter() - started:.1f}s wall)"
+        write_collapsed(output_prefix + ".collapsed", collapsed)
+        write_flamegraph(output_prefix + ".svg", collapsed, title)
+
+
+class ProfiledStep:
+    """in-process 노드(sweep 선택 등)를 현재 워커 스레드에서 프로파일하는 래퍼"""
+
+    def __init__(self, step, output_dir: str, profiler: str = "cprofile", interval_ms: float = 5.0):
+        self.step = step
+        self.output_dir = output_dir
+        self.profiler = profiler
+        self.interval_ms = interval_ms
+
+    def __getattr__(self, item):
+        return getattr(self.step, item)
+
+    def run(self, *args, **kwargs):
+        prefix = os.path.join(self.output_dir, self.step.name, "inprocess")
+        with profile_block(prefix, self.profiler, self.interval_ms):
+            return self.step.run(*args, **kwargs)
+
+
+# ---- collapsed 파일 / flamegraph ----
+def read_collapsed(path: str) -> dict:
+    out = Counter()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stack, _, value = line.rstrip("\n").rpartition(" ")
+            if stack and value.isdigit():
+                out[stack] += int(value)
+    return dict(out)
+
+
+def write_collapsed(path: str, collapsed: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for stack, value in sorted(collapsed.items()):
+            f.write(f"{stack} {value}\n")
+    os.replace(tmp, path)
+
+
+def _build_tree(collapsed: dict) -> dict:
+    root = {"name": "all", "value": 0, "children": {}}
+    for stack, value in collapsed.items():
+        root["value"] += value
+        node = root
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"name": name, "value": 0, "children": {}})
+            node["value"] += value
+    return root
+
+
+def write_flamegraph(path: str, collapsed: dict, title: str = "", width: int = 1200, row: int = 16):
+    """의존성 없는 최소 SVG flamegraph (폭 = 누적 시간, 아래에서 위로 호출 깊이)"""
+    root = _build_tree(collapsed)
+    total = root["value"] or 1
+    rects, max_depth = [], 0
+
+    def _layout(node, x, depth):
+        nonlocal max_depth
+        w = node["value"] / total * width
+        if w < 0.3:
+            return
+        max_depth = max(max_depth, depth)
+        rects.append((x, depth, w, node["name"], node["value"]))
+        child_x = x
+        for child in sorted(node["children"].values(), key=lambda c: c["name"]):
+            _layout(child, child_x, depth + 1)
+            child_x += child["value"] / total * width
+
+    _layout(root, 0.0, 0)
+    height = (max_depth + 1) * row + 40
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" font-size="11">',
+        f'<text x="4" y="16">{html.escape(title)} total={total / 1e6:.3f}s</text>',
+    ]
+    for x, depth, w, name, value in rects:
+        y = height - (depth + 1) * row
+        hue = zlib.crc32(name.encode()) % 60  # 빨강~노랑 계열
+        label = html.escape(name)
+        parts.append(
+            f'<g><title>{label} ({value / 1e6:.3f}s, {value / total:.1%})</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row - 1}" fill="hsl({hue},80%,60%)"/>'
+        )
+        if w > 40:
+            chars = int(w / 7)
+            text = label if len(name) <= chars else html.escape(name[:max(chars - 2, 1)]) + ".."
+            parts.append(f'<text x="{x + 3:.1f}" y="{y + row - 4}">{text}</text>')
+        parts.append("</g>")
+    parts.append("</svg>")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+    os.replace(tmp, path)
+
+
+def merge_profiles(profile_dir: str, variant_separator: str = "__v") -> dict:
+    """attempt/in-process 프로파일 -> 스텝별 + run 전체 collapsed/svg. {step: collapsed} 반환"""
+    per_step = defaultdict(Counter)
+    for path in glob.glob(os.path.join(profile_dir, "*", "*.collapsed")):
+        step = os.path.basename(os.path.dirname(path))
+        per_step[step].update(read_collapsed(path))
+
+    run_view = Counter()
+    for step, collapsed in per_step.items():
+        write_collapsed(os.path.join(profile_dir, f"{step}.collapsed"), collapsed)
+        write_flamegraph(os.path.join(profile_dir, f"{step}.svg"), collapsed, step)
+        # sweep variant 는 원래 스텝 아래로 모아 전체 비용을 한눈에
+        base = step.split(variant_separator, 1)[0]
+        prefix = f"{base};{step}" if base != step else step
+        for stack, value in collapsed.items():
+            run_view[f"{prefix};{stack}"] += value
+    if run_view:
+        write_collapsed(os.path.join(profile_dir, "run.collapsed"), run_view)
+        write_flamegraph(os.path.join(profile_dir, "run.svg"), run_view, "run")
+    return dict(per_step)
+
+
+def top_frames(collapsed: dict, n: int = 5) -> list:
+    """self 시간 기준 상위 프레임 [(label, us), ...]"""
+    leaf = Counter()
+    for stack, value in collapsed.items():
+        leaf[stack.rsplit(";", 1)[-1]] += value
+    return leaf.most_common(n)
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Run a step script under a profiler")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    parser.add_argument("--interval_ms", type=float, default=5.0)
+    parser.add_argument("--output", required=True, help="Output path prefix")
+    parser.add_argument("script")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    ns = parser.parse_args()
+
+    script = os.path.abspath(ns.script)
+    # `python script.py` 와 같은 실행 환경 (sys.argv / sys.path[0])
+    sys.argv = [ns.script] + ns.args
+    sys.path[0] = os.path.dirname(script)
+    # 스케줄러 종료(SIGTERM, speculative 패배/조기 종료 variant)에도 그때까지의 프로파일은 남긴다
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    with profile_block(ns.output, ns.profiler, ns.interval_ms, root_file=script):
+        runpy.run_path(script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,419 @@
+# pipeline/sensors.py
+"""데이터 도착 대기용 sensor 스텝.
+
+dag 항목에 type: sensor 로 선언하면 워커 슬롯을 잡지 않고 스케줄러의 SensorManager
+백그라운드 스레드 하나가 모든 sensor 를 평가한다.
+
+    wait_customer_partition:
+      type: sensor
+      sensor:
+        kind: partition            # file | partition | marker | callable
+        path: data/customer/purchase_date={target_date}
+        timeout_s: 3600
+        poke_interval_s: 30        # 재확인 주기 (callable 은 backoff 시작값)
+        max_interval_s: 600        # callable backoff 상한
+        soft_fail: false           # true 면 timeout 시 실패 대신 skipped
+
+- 로컬 경로(file/partition/marker)는 inotify 로 디렉토리 변화를 받아 즉시 재확인한다
+  (inotify 를 못 쓰면 poke_interval_s 주기 polling).
+- callable 은 "package.module:function" 을 target_date 와 kwargs 로 호출, True 면 충족.
+  원격 저장소(S3/Athena 파티션 등) 확인은 callable 로 연결한다.
+"""
+
+import ctypes
+import ctypes.util
+import glob
+import importlib
+import os
+import select
+import struct
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+SENSOR_KINDS = ("file", "partition", "marker", "callable")
+
+# <sys/inotify.h>
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_WATCH_MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Sensor:
+    kind = None
+
+    def __init__(self, name: str, timeout_s: float = 3600, poke_interval_s: float = 30,
+                 max_interval_s: float = 600, soft_fail: bool = False):
+        self.name = name
+        self.timeout_s = timeout_s
+        self.poke_interval_s = poke_interval_s
+        self.max_interval_s = max_interval_s
+        self.soft_fail = soft_fail
+
+    def poke(self) -> bool:
+        raise NotImplementedError
+
+    def watch_dir(self) -> Optional[str]:
+        """inotify 로 감시할 로컬 디렉토리 (원격/callable 이면 None)"""
+        return None
+
+    def next_interval(self, pokes: int) -> float:
+        return self.poke_interval_s
+
+    def describe(self) -> str:
+        return self.kind
+
+
+def _deepest_existing_dir(path: str) -> str:
+    """glob 문자가 나오기 전까지의 경로 중 실제로 존재하는 가장 깊은 디렉토리"""
+    parts = []
+    for part in os.path.normpath(os.path.abspath(path)).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    current = os.sep.join(parts) or os.sep
+    while not os.path.isdir(current):
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    return current
+
+
+class FileSensor(Sensor):
+    """path(glob 허용)에 해당하는 파일이 하나라도 있으면 충족"""
+    kind = "file"
+
+    def __init__(self, name: str, path: str, **kwargs):
+        super().__init__(name, **kwargs)
+        self.path = path
+
+    def poke(self) -> bool:
+        return any(os.path.isfile(p) for p in glob.glob(self.path))
+
+    def watch_dir(self):
+        return _deepest_existing_dir(self.path)
+
+    def describe(self):
+        return f"file {self.path}"
+
+
+class PartitionSensor(Sensor):
+    """파티션 디렉토리가 존재하고 비어 있지 않으면 충족"""
+    kind = "partition"
+
+    def __init__(self, name: str, path: str, **kwargs):
+        super().__init__(name, **kwargs)
+        self.path = path
+
+    def poke(self) -> bool:
+        return any(os.path.isdir(p) and os.listdir(p) for p in glob.glob(self.path))
+
+    def watch_dir(self):
+        if os.path.isdir(self.path):
+            return self.path
+        return _deepest_existing_dir(self.path)
+
+    def describe(self):
+        return f"partition {self.path}"
+
+
+class MarkerSensor(FileSensor):
+    """디렉토리 안의 완료 마커 파일 (기본 _SUCCESS)"""
+    kind = "marker"
+
+    def __init__(self, name: str, path: str, marker: str = "_SUCCESS", **kwargs):
+        super().__init__(name, os.path.join(path, marker), **kwargs)
+
+    def describe(self):
+        return f"marker {self.path}"
+
+
+class CallableSensor(Sensor):
+    """사용자 함수로 원격 조건 확인. 실패할수록 간격을 2배씩 늘린다 (max_interval_s 상한)"""
+    kind = "callable"
+
+    def __init__(self, name: str, func: Callable[..., bool], kwargs: Optional[dict] = None, **sensor_kwargs):
+        super().__init__(name, **sensor_kwargs)
+        self.func = func
+        self.kwargs = kwargs or {}
+
+    def poke(self) -> bool:
+        return bool(self.func(**self.kwargs))
+
+    def next_interval(self, pokes: int) -> float:
+        return min(self.max_interval_s, self.poke_interval_s * (2 ** max(0, pokes - 1)))
+
+    def describe(self):
+        return f"callable {getattr(self.func, '__module__', '?')}:{getattr(self.func, '__name__', '?')}"
+
+
+def _import_callable(spec: str):
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Sensor callable must look like 'package.module:function' (got '{spec}').")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def build_sensor(step_name: str, cfg: dict, target_date: Optional[str] = None) -> Sensor:
+    """dag 항목의 sensor 설정 -> Sensor. 경로의 {target_date} 는 실행 날짜로 치환"""
+    cfg = dict(cfg or {})
+    kind = cfg.pop("kind", None)
+    if kind not in SENSOR_KINDS:
+        raise ValueError(f"Sensor step '{step_name}' needs kind in {SENSOR_KINDS} (got {kind!r}).")
+
+    common = {k: cfg.pop(k) for k in ("timeout_s", "poke_interval_s", "max_interval_s", "soft_fail") if k in cfg}
+
+    def _path():
+        path = cfg.get("path")
+        if not path:
+            raise ValueError(f"Sensor step '{step_name}' ({kind}) requires 'path'.")
+        if "://" in path:
+            raise ValueError(f"Sensor step '{step_name}': remote path '{path}' needs kind: callable.")
+        return path.format(target_date=target_date or "")
+
+    if kind == "file":
+        return FileSensor(step_name, _path(), **common)
+    if kind == "partition":
+        return PartitionSensor(step_name, _path(), **common)
+    if kind == "marker":
+        return MarkerSensor(step_name, _path(), marker=cfg.get("marker", "_SUCCESS"), **common)
+
+    func = _import_callable(cfg.get("callable", ""))
+    kwargs = dict(cfg.get("kwargs") or {})
+    kwargs.setdefault("target_date", target_date)
+    return CallableSensor(step_name, func, kwargs=kwargs, **common)
+
+
+class _Inotify:
+    """ctypes 로 감싼 최소 inotify (Linux 전용). 사용 불가 환경이면 available=False"""
+
+    def __init__(self):
+        self.fd = -1
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            self.fd = -1
+
+    @property
+    def available(self) -> bool:
+        return self.fd >= 0
+
+    def add_watch(self, path: str) -> int:
+        return self._libc.inotify_add_watch(self.fd, os.fsencode(path), _IN_WATCH_MASK)
+
+    def rm_watch(self, wd: int):
+        # 디렉토리가 삭제돼 커널이 이미 지운 wd 면 EINVAL, 무시
+        if self.fd >= 0:
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_wds(self) -> set:
+        wds = set()
+        try:
+            buf = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return wds
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buf):
+            wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            wds.add(wd)
+            offset += _EVENT_HEADER.size + length
+        return wds
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _Watch:
+    def __init__(self, sensor: Sensor, key):
+        self.sensor = sensor
+        self.key = key
+        self.started = time.monotonic()
+        self.pokes = 0
+        self.next_poke = self.started  # 시작하자마자 한 번 확인
+        self.wd = None
+
+
+class SensorManager:
+    """모든 sensor 를 스레드 하나에서 평가하고, 끝나면 on_done(key, result) 호출.
+
+    result 는 StepRunner 결과와 같은 형태: {"success": True} / {"skipped": True} / {"success": False, "error": ...}
+    """
+
+    def __init__(self, on_done: Callable[[str, dict], None], logger, use_inotify: bool = True):
+        self.on_done = on_done
+        self.logger = logger
+        self._watches = {}
+        self._wd_refs = Counter()  # 같은 디렉토리를 보는 sensor 는 wd 를 공유하므로 참조 수로 해제
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._inotify = _Inotify() if use_inotify else None
+        # 스레드를 깨우기 위한 self-pipe (새 sensor 등록/종료)
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="sensor-manager", daemon=True)
+        self._thread.start()
+
+    @property
+    def active(self) -> int:
+        with self._lock:
+            return len(self._watches)
+
+    def start(self, sensor: Sensor, key=None):
+        """key 는 on_done 으로 돌려줄 식별자 (기본 sensor.name, 데몬은 (run_id, step))"""
+        key = sensor.name if key is None else key
+        watch = _Watch(sensor, key)
+        with self._lock:
+            self._watches[key] = watch
+        self.logger.info(f"📡 Sensor '{sensor.name}' waiting for {sensor.describe()} (timeout {sensor.timeout_s}s)")
+        self._wake()
+
+    def cancel(self, key):
+        with self._lock:
+            self._release_wd(self._watches.pop(key, None))
+
+    def cancel_all(self):
+        with self._lock:
+            for watch in self._watches.values():
+                self._release_wd(watch)
+            self._watches.clear()
+        self._wake()
+
+    def stop(self):
+        self._stop.set()
+        self._wake()
+        self._thread.join(timeout=5)
+        if self._inotify:
+            self._inotify.close()
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def _attach_inotify(self, watch: _Watch):
+        if not (self._inotify and self._inotify.available):
+            return
+        directory = watch.sensor.watch_dir()
+        if not directory:
+            return
+        wd = self._inotify.add_watch(directory)
+        with self._lock:
+            if self._watches.get(watch.key) is not watch:
+                # 그 사이 취소됨
+                if wd >= 0 and not self._wd_refs[wd]:
+                    self._inotify.rm_watch(wd)
+                return
+            if wd >= 0 and wd == watch.wd:
+                return
+            self._release_wd(watch)
+            if wd >= 0:
+                self._wd_refs[wd] += 1
+                watch.wd = wd
+
+    def _release_wd(self, watch: Optional[_Watch]):
+        """self._lock 안에서 호출. 마지막 참조면 inotify watch 제거 (데몬에서 wd 누수 방지)"""
+        if watch is None or watch.wd is None:
+            return
+        wd, watch.wd = watch.wd, None
+        self._wd_refs[wd] -= 1
+        if self._wd_refs[wd] <= 0:
+            del self._wd_refs[wd]
+            self._inotify.rm_watch(wd)
+
+    def _finish(self, key, result: dict):
+        with self._lock:
+            watch = self._watches.pop(key, None)
+            if watch is None:
+                return  # 이미 취소됨
+            self._release_wd(watch)
+        self.on_done(key, result)
+
+    def _poke(self, watch: _Watch, now: float):
+        sensor = watch.sensor
+        watch.pokes += 1
+        try:
+            ok = sensor.poke()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Sensor '{sensor.name}' poke error: {e}")
+            ok = False
+
+        elapsed = now - watch.started
+        if ok:
+            self.logger.info(f"📡 Sensor '{sensor.name}' satisfied after {elapsed:.1f}s ({watch.pokes} poke(s)).")
+            self._finish(watch.key, {"success": True, "duration_s": elapsed, "cpu_s": None})
+            return
+        if elapsed >= sensor.timeout_s:
+            message = f"Sensor '{sensor.name}' timed out after {elapsed:.0f}s waiting for {sensor.describe()}."
+            if sensor.soft_fail:
+                self.logger.warning(f"⚠️ {message} (soft_fail)")
+                self._finish(watch.key, {"skipped": True, "duration_s": elapsed})
+            else:
+                self._finish(watch.key, {"success": False, "error": message, "duration_s": elapsed})
+            return
+
+        # 디렉토리가 새로 생겼을 수 있으니 더 깊은 경로로 watch 갱신
+        self._attach_inotify(watch)
+        watch.next_poke = min(now + sensor.next_interval(watch.pokes), watch.started + sensor.timeout_s)
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                watches = list(self._watches.values())
+            for watch in watches:
+                if watch.wd is None and watch.pokes == 0:
+                    self._attach_inotify(watch)
+                if watch.next_poke <= now:
+                    self._poke(watch, now)
+
+            with self._lock:
+                deadlines = [w.next_poke for w in self._watches.values()]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+            fds = [self._wake_r]
+            if self._inotify and self._inotify.available:
+                fds.append(self._inotify.fd)
+            try:
+                readable, _, _ = select.select(fds, [], [], timeout)
+            except (OSError, ValueError):
+                return  # stop() 에서 fd 가 닫힘
+
+            if self._wake_r in readable:
+                os.read(self._wake_r, 4096)
+            if self._inotify and self._inotify.fd in readable:
+                touched = self._inotify.read_wds()
+                with self._lock:
+                    for watch in self._watches.values():
+                        if watch.wd in touched:
+                            watch.next_poke = 0  # 즉시 재확인
+
+
+def wait_for_sensor(sensor: Sensor, logger) -> dict:
+    """sensor 하나를 동기적으로 기다린다 (순차 실행 / 단일 스텝 실행용)"""
+    results = []
+    done = threading.Event()
+
+    def _on_done(_name, result):
+        results.append(result)
+        done.set()
+
+    manager = SensorManager(_on_done, logger)
+    try:
+        manager.start(sensor)
+        done.wait()
+    finally:
+        manager.stop()
+    return results[0]
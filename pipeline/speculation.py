@@ -0,0 +1,70 @@
+# pipeline/speculation.py
+"""straggler 스텝 speculative 재실행 정책.
+
+dag 항목에 speculative: true 를 준 (멱등) 스텝만 대상. 실행 시간이 이력 p95 x multiplier 를 넘고
+워커 슬롯이 비어 있으면 스케줄러가 같은 스텝을 하나 더 띄우고, 먼저 끝난 쪽을 채택한 뒤 나머지는 종료한다.
+
+options.speculative:
+  multiplier: 2.0        # p95 의 몇 배를 넘으면 straggler 로 볼지
+  min_runtime_s: 30      # 이보다 짧게 실행 중인 스텝은 복제하지 않음
+  min_history: 3         # p95 를 믿을 수 있는 최소 성공 이력 수
+  check_interval_s: 5    # straggler 검사 주기
+"""
+
+import time
+
+
+class SpeculationPolicy:
+    def __init__(self, dag_cfg: dict, history, logger, multiplier: float = 2.0, min_runtime_s: float = 30.0,
+                 min_history: int = 3, check_interval_s: float = 5.0):
+        self.logger = logger
+        self.check_interval_s = float(check_interval_s)
+        self.thresholds = {}
+        for name, info in dag_cfg.items():
+            if not info.get("speculative") or info.get("type") is not None:
+                continue
+            durations = history.durations(name) if history else []
+            if len(durations) < int(min_history):
+                self.logger.info(f"🏎️  Speculation for '{name}' disabled until {min_history} successful run(s) are recorded.")
+                continue
+            p95 = history.percentile(name, 95)
+            self.thresholds[name] = max(p95 * float(multiplier), float(min_runtime_s))
+
+        self.started = {}      # step -> monotonic 시작 시각 (원본 attempt)
+        self.speculated = set()
+        self.launched = 0
+        self.won = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.thresholds)
+
+    def step_started(self, name: str):
+        self.started[name] = time.monotonic()
+
+    def stragglers(self, running) -> list:
+        """복제 대상: threshold 를 넘긴 실행 중 스텝 (스텝당 한 번만, 오래 걸린 순)"""
+        now = time.monotonic()
+        due = [
+            name for name in running
+            if name in self.thresholds and name not in self.speculated
+            and now - self.started.get(name, now) > self.thresholds[name]
+        ]
+        return sorted(due, key=lambda n: self.started[n])
+
+    def launched_for(self, name: str):
+        self.speculated.add(name)
+        self.launched += 1
+        elapsed = time.monotonic() - self.started[name]
+        self.logger.warning(
+            f"🏎️  Step '{name}' running {elapsed:.0f}s (> {self.thresholds[name]:.0f}s); launching speculative attempt."
+        )
+
+    def wall_time(self, name: str) -> float:
+        """원본 attempt 제출부터 지금까지 (이력에는 승자 attempt 시간이 아니라 이 값을 남긴다)"""
+        return time.monotonic() - self.started[name]
+
+    def resolved(self, name: str, speculative_won: bool):
+        if speculative_won:
+            self.won += 1
+        self.logger.info(f"🏁 Step '{name}': using the {'speculative' if speculative_won else 'original'} attempt's result.")
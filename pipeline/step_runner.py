@@ -2,14 +2,29 @@
 
 import subprocess
 import os
+import shutil
 import time
 import json
 import threading
+from contextlib import nullcontext
 from typing import Literal, Optional
-from pipeline.logger import setup_logger
+from pipeline.logger import new_run_id, setup_logger
 import re
 
 ERROR_KEYWORDS = {"traceback", "error", "exception", "failed", "fatal"}
+METRICS_FLUSH_LINES = 256     # 로그 라인 수는 attempt 안에서 모았다가 이 단위/주기로 metrics 에 반영
+METRICS_FLUSH_INTERVAL_S = 1.0
+PROFILER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiling.py")
+
+def _wait_with_rusage(process):
+    """자식 종료 대기 + 자식 CPU 시간(user+sys). wait4 를 못 쓰는 환경이면 cpu_s=None"""
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except (AttributeError, TypeError, ChildProcessError):
+        return process.wait(), None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, rusage.ru_utime + rusage.ru_stime
+
 
 class StepRunner:
     def __init__(
@@ -20,19 +35,48 @@ class StepRunner:
         logger=None,
         retries: int = 1,
         log_level: Optional[str] = None,
-        target_date: Optional[str] = None
+        target_date: Optional[str] = None,
+        log_file: Optional[str] = None,
+        log_layout=None,
+        metrics=None,
+        env: Optional[dict] = None,
+        kill_grace_s: float = 10.0,
+        checkpoint_root: Optional[str] = None,
+        run_id: Optional[str] = None,
+        profile: Optional[dict] = None
     ):
         self.name = name
         self.script = script_path
         self.config = config_path
+        self.log_file = log_file or f"logs/{name}.log"
         self.log_level = log_level or os.environ.get("LOG_LEVEL", "INFO")
         self.logger = logger or setup_logger(name, log_file=self.log_file, level=self.log_level)
         self.retries = retries
         self.target_date = target_date
+        self.log_layout = log_layout
+        self.metrics = metrics
+        self.extra_env = dict(env or {})
+        self.kill_grace_s = kill_grace_s
+        self._process = None
+        self._kill_reason = None
+        self.attempt_offset = 0  # speculative 복제본은 원본 attempt 번호 뒤부터 (로그/인덱스 충돌 방지)
+        # (run_id, step, target_date) 별 고정 체크포인트 디렉토리: 재시도 attempt 가 이어서 진행
+        # run id 가 없으면 새로 발급 (고정 이름이면 동시/연속 run 이 같은 체크포인트를 이어받는다)
+        self.run_id = run_id or (log_layout.run_id if log_layout else None)
+        if checkpoint_root and not self.run_id:
+            self.run_id = new_run_id()
+        self.checkpoint_root = checkpoint_root
+        self.checkpoint_dir = os.path.join(
+            checkpoint_root, target_date or "latest", self.run_id, name
+        ) if checkpoint_root else None
+        self.defer_checkpoint_cleanup = False  # speculative 실행 중이면 성공해도 체크포인트를 바로 지우지 않는다
+        # {"dir", "profiler", "interval_ms"} 이면 프로파일러 래퍼로 실행 (pipeline/profiling.py)
+        self.profile = profile
 
     def _log_stream(self, pipe, collector: list, default_level="INFO"):
         import re
 
+        pending_lines, flushed_at = 0, time.monotonic()
         try:
             traceback_buffer = []
             in_traceback = False
@@ -40,6 +84,11 @@ class StepRunner:
             for line in iter(pipe.readline, ''):
                 line = line.rstrip()
                 collector.append(line)
+                if self.metrics:
+                    pending_lines += 1
+                    if pending_lines >= METRICS_FLUSH_LINES or time.monotonic() - flushed_at >= METRICS_FLUSH_INTERVAL_S:
+                        self.metrics.log_lines(self.name, pending_lines)
+                        pending_lines, flushed_at = 0, time.monotonic()
 
                 # 1. traceback block 또는 SyntaxError 블럭 시작
                 if "Traceback (most recent call last):" in line or re.match(r'^\s*File ".*", line \d+', line):
@@ -79,72 +128,187 @@ class StepRunner:
 
         except Exception as e:
             self.logger.error(f"[{self.name}] ⚠️ log stream error: {str(e)}")
+        finally:
+            if self.metrics:
+                self.metrics.log_lines(self.name, pending_lines)
 
-    def run_subprocess(self) -> dict:
-        self.logger.info(f"[{self.name}] Starting subprocess...")
-        attempt = 0
+    def _build_env(self, attempt: int) -> dict:
+        env = os.environ.copy()
+        env["PYTHONUNBUFFERED"] = "1"
+        env["PIPELINE_ATTEMPT"] = str(attempt)
+        if self.checkpoint_dir:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            env["PIPELINE_CHECKPOINT_DIR"] = self.checkpoint_dir
+        if self.log_layout:
+            env["PIPELINE_RUN_ID"] = self.log_layout.run_id
+            env.update(self.log_layout.step_env(self.name, attempt))
+        env.update(self.extra_env)
+        return env
 
-        while attempt < self.retries:
-            attempt += 1
-            try:
-                cmd = ["python", "-u", self.script, "--config_file", self.config]
-                if self.target_date:
-                    cmd += ["--target_date", self.target_date]
-
-                env = os.environ.copy()
-                env["PYTHONUNBUFFERED"] = "1"
-
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    env=env,
-                    text=True,
-                    bufsize=1
-                )
+    def kill(self, reason: str):
+        """실행 중(또는 시작 전) 스텝 종료 요청. SIGTERM 후 kill_grace_s 지나도 살아있으면 SIGKILL"""
+        self._kill_reason = reason
+        process = self._process
+        if process is None or process.returncode is not None:
+            return
+        self.logger.warning(f"[{self.name}] 🛑 Terminating: {reason}")
+        process.terminate()
 
-                stdout_lines = []
-                stderr_lines = []
+        def _force_kill():
+            if process.returncode is None:
+                process.kill()
 
-                t_out = threading.Thread(target=self._log_stream, args=(process.stdout, stdout_lines), daemon=True)
-                t_err = threading.Thread(target=self._log_stream, args=(process.stderr, stderr_lines, "ERROR"), daemon=True)
+        timer = threading.Timer(self.kill_grace_s, _force_kill)
+        timer.daemon = True
+        timer.start()
 
-                t_out.start()
-                t_err.start()
+    def _command(self, attempt: int) -> list:
+        cmd = ["python", "-u", self.script, "--config_file", self.config]
+        if self.profile:
+            prefix = os.path.join(self.profile["dir"], self.name, f"attempt-{attempt}")
+            cmd[2:2] = [
+                PROFILER_SCRIPT, "--profiler", self.profile.get("profiler", "cprofile"),
+                "--interval_ms", str(self.profile.get("interval_ms", 5.0)), "--output", prefix,
+            ]
+        if self.target_date:
+            cmd += ["--target_date", self.target_date]
+        return cmd
 
-                return_code = process.wait()
+    def _run_attempt(self, attempt: int) -> dict:
+        cmd = self._command(attempt)
 
-                t_out.join()
-                t_err.join()
+        started = time.monotonic()
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=self._build_env(attempt),
+            text=True,
+            bufsize=1
+        )
+        self._process = process
+        if self._kill_reason:
+            process.terminate()  # Popen 직전에 kill 요청이 들어온 경우
+        if self.metrics:
+            self.metrics.attempt_started(self.name, attempt, process.pid)
 
-                stdout_clean = "\n".join(stdout_lines)
-                stderr_clean = "\n".join(stderr_lines)
+        stdout_lines = []
+        stderr_lines = []
 
-                if return_code == 0:
-                    try:
-                        output_json = json.loads(stdout_clean)
-                        if output_json.get("skipped"):
-                            self.logger.warning(f"[{self.name}] ⚠️ Step skipped by logic.")
-                            return {"skipped": True, "stdout": stdout_clean, "stderr": stderr_clean}
-                    except json.JSONDecodeError:
-                        pass
+        t_out = threading.Thread(target=self._log_stream, args=(process.stdout, stdout_lines), daemon=True)
+        t_err = threading.Thread(target=self._log_stream, args=(process.stderr, stderr_lines, "ERROR"), daemon=True)
 
-                    self.logger.info(f"[{self.name}] ✅ Success")
-                    return {"success": True, "stdout": stdout_clean, "stderr": stderr_clean}
-                else:
-                    self.logger.error(f"[{self.name}] ❌ Failed with return code {return_code}")
-                    return {"success": False, "stdout": stdout_clean, "stderr": stderr_clean}
+        t_out.start()
+        t_err.start()
+
+        return_code, cpu_s = _wait_with_rusage(process)
+
+        t_out.join()
+        t_err.join()
 
-            except Exception as e:
+        stdout_clean = "\n".join(stdout_lines)
+        stderr_clean = "\n".join(stderr_lines)
+        usage = {"duration_s": time.monotonic() - started, "cpu_s": cpu_s}
+        self._process = None
+
+        if self._kill_reason:
+            # 스케줄러가 의도적으로 종료한 경우는 실패가 아니라 스킵으로 본다
+            self.logger.warning(f"[{self.name}] ✂️ Killed: {self._kill_reason}")
+            return {"skipped": True, "killed": True, "reason": self._kill_reason,
+                    "stdout": stdout_clean, "stderr": stderr_clean, **usage}
+
+        if return_code == 0:
+            try:
+                output_json = json.loads(stdout_clean)
+                if output_json.get("skipped"):
+                    self.logger.warning(f"[{self.name}] ⚠️ Step skipped by logic.")
+                    return {"skipped": True, "stdout": stdout_clean, "stderr": stderr_clean, **usage}
+            except json.JSONDecodeError:
+                pass
 
-                self.logger.exception(f"[{self.name}] ❌ Unexpected error: {str(e)}")
+            self.logger.info(f"[{self.name}] ✅ Success")
+            return {"success": True, "stdout": stdout_clean, "stderr": stderr_clean, **usage}
+        else:
+            self.logger.error(f"[{self.name}] ❌ Failed with return code {return_code}")
+            return {"success": False, "stdout": stdout_clean, "stderr": stderr_clean, "returncode": return_code, **usage}
+
+    def run_subprocess(self) -> dict:
+        attempt = 0
+        result = None
+
+        while attempt < self.retries:
+            if self._kill_reason:
+                return {"skipped": True, "killed": True, "reason": self._kill_reason}
+            attempt += 1
+            number = self.attempt_offset + attempt
+            # run 로그 레이아웃이 있으면 attempt 전용 로그 파일로 기록 + 인덱스 등록
+            attempt_ctx = (
+                self.log_layout.attempt(self.logger, self.name, number)
+                if self.log_layout else nullcontext()
+            )
+            with attempt_ctx:
+                self.logger.info(f"[{self.name}] Starting subprocess... (attempt {attempt}/{self.retries})")
+                try:
+                    result = self._run_attempt(number)
+                except Exception as e:
+                    self.logger.exception(f"[{self.name}] ❌ Unexpected error: {str(e)}")
+                    result = None
+
+            if self.log_layout:
+                status = "error" if result is None else (
+                    "success" if result.get("success") else "skipped" if result.get("skipped") else "failed"
+                )
+                self.log_layout.record_attempt(self.name, number, status=status)
+
+            if result is not None and (result.get("success") or result.get("skipped")):
+                if result.get("success") and not self.defer_checkpoint_cleanup:
+                    self.cleanup_checkpoints()
+                return dict(result, attempts=attempt)
+            if attempt < self.retries:
+                # 실패 attempt 도 재시도. 체크포인트는 남겨 두어 다음 attempt 가 이어서 진행
+                self.logger.warning(f"[{self.name}] 🔁 Retrying (attempt {attempt + 1}/{self.retries})")
                 time.sleep(1)
 
+        if result is not None:
+            return dict(result, attempts=attempt)
         return {
             "success": False,
-            "error": f"Step '{self.name}' failed after {self.retries} attempt(s)."
+            "error": f"Step '{self.name}' failed after {self.retries} attempt(s).",
+            "attempts": attempt,
         }
 
+    def speculative_copy(self) -> "StepRunner":
+        """같은 스텝의 중복 실행용 복제본 (단일 attempt, 체크포인트 디렉토리 공유 -> 원본 진행분부터 이어서)"""
+        # attempt 별 파일 핸들러가 섞이지 않도록 별도 로거 사용
+        logger = setup_logger(
+            f"{self.name}-speculative", None if self.log_layout else self.log_file, self.log_level, layout=self.log_layout
+        )
+        copy = StepRunner(
+            name=self.name, script_path=self.script, config_path=self.config, logger=logger, retries=1,
+            log_level=self.log_level, target_date=self.target_date, log_file=self.log_file,
+            log_layout=self.log_layout, metrics=self.metrics, env=self.extra_env,
+            kill_grace_s=self.kill_grace_s, run_id=self.run_id, profile=self.profile,
+        )
+        copy.checkpoint_root, copy.checkpoint_dir = self.checkpoint_root, self.checkpoint_dir
+        copy.attempt_offset = self.attempt_offset + self.retries
+        # 두 attempt 가 체크포인트를 공유하므로 정리는 둘 다 끝난 뒤 스케줄러가 한다
+        self.defer_checkpoint_cleanup = copy.defer_checkpoint_cleanup = True
+        return copy
+
+    def cleanup_checkpoints(self):
+        if self.checkpoint_dir and os.path.isdir(self.checkpoint_dir):
+            shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+        # 비어 있는 <date>/<run_id> 상위 디렉토리도 정리 (다른 스텝이 쓰는 중이면 비어 있지 않아 남는다)
+        parent = os.path.dirname(self.checkpoint_dir or "")
+        for _ in range(2):
+            if not self.checkpoint_root or os.path.abspath(parent) == os.path.abspath(self.checkpoint_root):
+                break
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+
     def run(self, mode: Literal["subprocess", "sagemaker", "shell"] = "subprocess") -> dict:
         if mode == "subprocess":
             return self.run_subprocess()
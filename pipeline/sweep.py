@@ -0,0 +1,299 @@
+# pipeline/sweep.py
+"""스텝 설정 YAML 의 sweep: 섹션을 병렬 variant 스텝으로 펼친다.
+
+  sweep:
+    mode: grid             # grid | random
+    budget: 8              # random: 샘플 수 / grid: 최대 variant 수 (생략 시 전체 조합)
+    seed: 0
+    metric: val_auc        # 스텝이 report_metric() 으로 보고하는 값
+    goal: max              # max | min
+    params:                # config 아래 키 (점 표기 가능) 덮어쓰기
+      param1: [value1, value3]
+      lr: {low: 0.0001, high: 0.1, log: true}   # random 전용 연속 구간
+    halving:               # (선택) successive halving: 중간 metric 으로 하위 variant 조기 종료
+      rungs: [1, 3, 9]     # 판정할 중간 보고 step (epoch 등)
+      eta: 3               # rung 마다 상위 1/eta 만 계속 진행
+      min_reports: 3       # rung 에 이만큼 보고가 모여야 판정 (기본 eta)
+
+train 스텝은 train__v0, train__v1, ... 로 펼쳐지고, 원래 이름(train)은 best variant 를 고르는
+선택 노드가 된다. 하위 스텝은 그대로 train 에 의존하며 PIPELINE_SWEEP_<STEP> 로 best.json 경로를 받는다.
+"""
+
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+
+import yaml
+
+from pipeline.watermark import PENDING_WATERMARK_FILE, apply_pending
+
+VARIANT_SEPARATOR = "__v"
+METRICS_FILE_ENV = "PIPELINE_METRICS_FILE"
+
+
+def variant_name(step_name: str, index: int) -> str:
+    return f"{step_name}{VARIANT_SEPARATOR}{index}"
+
+
+def best_file_env(step_name: str) -> str:
+    return f"PIPELINE_SWEEP_{step_name.upper()}"
+
+
+def report_metric(name: str, value: float, step=None):
+    """(스텝 프로세스 쪽) metric 보고. step 을 주면 중간 값(successive halving 판정용)
+
+    파이프라인 밖에서 단독 실행하면 아무 것도 하지 않는다.
+    """
+    path = os.environ.get(METRICS_FILE_ENV)
+    if not path:
+        return
+    record = {"name": name, "value": float(value), "step": step, "ts": time.time()}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def read_metrics(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_sweep(config_path: str):
+    """스텝 설정 파일의 sweep 섹션 (없으면 None)"""
+    if not config_path or not os.path.exists(config_path):
+        return None
+    with open(config_path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return data.get("sweep") or None
+
+
+def _sample(spec, rng: random.Random):
+    if isinstance(spec, list):
+        return rng.choice(spec)
+    if isinstance(spec, dict):
+        low, high = float(spec["low"]), float(spec["high"])
+        if spec.get("log"):
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        return int(round(value)) if spec.get("type") == "int" else value
+    return spec
+
+
+def expand_params(sweep_cfg: dict) -> list:
+    """sweep 설정 -> variant 별 파라미터 dict 목록"""
+    params = sweep_cfg.get("params") or {}
+    if not params:
+        raise ValueError("sweep.params must define at least one parameter.")
+    mode = sweep_cfg.get("mode", "grid")
+    budget = sweep_cfg.get("budget")
+    rng = random.Random(sweep_cfg.get("seed", 0))
+
+    if mode == "grid":
+        for key, spec in params.items():
+            if isinstance(spec, dict):
+                raise ValueError(f"sweep.params.{key}: ranges are only supported in random mode.")
+        keys = list(params)
+        values = [spec if isinstance(spec, list) else [spec] for spec in params.values()]
+        combos = [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+        if budget and len(combos) > int(budget):
+            combos = rng.sample(combos, int(budget))
+        return combos
+    if mode == "random":
+        return [{key: _sample(spec, rng) for key, spec in params.items()} for _ in range(int(budget or 10))]
+    raise ValueError(f"Unknown sweep mode '{mode}' (expected grid or random).")
+
+
+def _set_path(cfg: dict, dotted: str, value):
+    *parents, leaf = dotted.split(".")
+    for key in parents:
+        cfg = cfg.setdefault(key, {})
+    cfg[leaf] = value
+
+
+def write_variant_configs(step_name: str, config_path: str, sweep_dir: str) -> list:
+    """variant 별 설정 파일/출력 디렉토리 생성. [{name, config, dir, params, metrics_file}, ...]"""
+    with open(config_path, encoding="utf-8") as f:
+        base = yaml.safe_load(f) or {}
+    sweep_cfg = base.pop("sweep")
+
+    variants = []
+    for i, params in enumerate(expand_params(sweep_cfg)):
+        name = variant_name(step_name, i)
+        variant_dir = os.path.join(sweep_dir, name)
+        os.makedirs(variant_dir, exist_ok=True)
+
+        cfg = json.loads(json.dumps(base))  # deep copy
+        cfg.setdefault("config", {})
+        for key, value in params.items():
+            _set_path(cfg["config"], key, value)
+        cfg["config"]["output_dir"] = variant_dir  # variant 간 산출물 격리
+
+        variant_config = os.path.join(variant_dir, os.path.basename(config_path))
+        with open(variant_config, "w", encoding="utf-8") as f:
+            yaml.safe_dump(cfg, f, allow_unicode=True, sort_keys=False)
+
+        metrics_file = os.path.join(variant_dir, "metrics.jsonl")
+        if os.path.exists(metrics_file):
+            os.remove(metrics_file)  # 같은 run 재실행 시 이전 보고값이 섞이지 않도록
+        variants.append({"name": name, "config": variant_config, "dir": variant_dir,
+                         "params": params, "metrics_file": metrics_file})
+    return variants
+
+
+class SuccessiveHalving:
+    """비동기 successive halving. rung 에 보고가 min_reports 이상 모이면 상위 ceil(n/eta) 밖은 종료"""
+
+    def __init__(self, rungs, eta: int = 3, min_reports: int = None, goal: str = "max"):
+        self.rungs = sorted(rungs)
+        self.eta = max(int(eta), 2)
+        self.min_reports = int(min_reports or self.eta)
+        self.sign = 1 if goal == "max" else -1
+        self.values = {r: {} for r in self.rungs}  # rung -> {variant: value}
+        self.latest = {}  # variant -> 마지막으로 도달한 rung
+        self.pruned = set()
+
+    def report(self, variant: str, step, value: float) -> list:
+        """보고 반영 후 새로 종료할 variant 목록"""
+        if step not in self.values or variant in self.pruned:
+            return []
+        self.values[step][variant] = value
+        self.latest[variant] = step
+
+        scores = self.values[step]
+        if len(scores) < self.min_reports:
+            return []
+        keep = math.ceil(len(scores) / self.eta)
+        ranked = sorted(scores, key=lambda v: self.sign * scores[v], reverse=True)
+        newly = [
+            v for v in ranked[keep:]
+            if v not in self.pruned and self.latest.get(v) == step  # 이미 다음 rung 으로 넘어간 variant 는 유지
+        ]
+        self.pruned.update(newly)
+        return newly
+
+
+class SweepMonitor:
+    """variant 들의 metrics 파일을 tail 하면서 halving 판정 -> StepRunner.kill()"""
+
+    def __init__(self, step_name: str, variants: list, runners: dict, halving: SuccessiveHalving,
+                 metric: str, logger, poll_interval: float = 1.0):
+        self.step_name = step_name
+        self.variants = variants
+        self.runners = runners
+        self.halving = halving
+        self.metric = metric
+        self.logger = logger
+        self.poll_interval = poll_interval
+        self._offsets = {v["name"]: 0 for v in variants}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name=f"sweep-{self.step_name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self.poll()
+
+    def poll(self):
+        for variant in self.variants:
+            for record in self._read_new(variant):
+                if record.get("name") != self.metric or record.get("step") is None:
+                    continue
+                for name in self.halving.report(variant["name"], record["step"], record["value"]):
+                    self.logger.info(
+                        f"✂️  Pruning '{name}' at rung {record['step']} "
+                        f"(successive halving on {self.metric})"
+                    )
+                    self.runners[name].kill(f"pruned by successive halving at rung {record['step']}")
+
+    def _read_new(self, variant: dict) -> list:
+        path = variant["metrics_file"]
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            f.seek(self._offsets[variant["name"]])
+            chunk = f.read()
+        complete = chunk[:chunk.rfind("\n") + 1]  # 쓰는 중인 마지막 줄은 다음 poll 에서
+        self._offsets[variant["name"]] += len(complete.encode("utf-8"))
+        return [json.loads(line) for line in complete.splitlines() if line.strip()]
+
+
+class SweepSelector:
+    """선택 노드: 프로세스 없이 variant 들의 최종 metric 을 비교해 best.json 기록"""
+
+    def __init__(self, name: str, variants: list, metric: str, goal: str, sweep_dir: str, logger):
+        self.name = name
+        self.variants = variants
+        self.metric = metric
+        self.goal = goal
+        self.sweep_dir = sweep_dir
+        self.best_file = os.path.join(sweep_dir, "best.json")
+        self.logger = logger
+        self.outcomes = None  # variant -> 상태 (DagRun.status), bind 전이면 모든 variant 후보
+        self.pruned = set()
+
+    def bind(self, outcomes: dict, pruned=None):
+        """이번 run 의 variant 상태와 successive halving 으로 종료된 variant"""
+        self.outcomes = outcomes
+        self.pruned = pruned if pruned is not None else set()
+
+    def _eligible(self, variant: dict) -> bool:
+        # 성공하지 못했거나(실패/스킵) 조기 종료된 variant 의 보고값은 비교하지 않는다
+        if self.outcomes is not None and self.outcomes.get(variant["name"]) != "success":
+            return False
+        return variant["name"] not in self.pruned
+
+    def _final_value(self, variant: dict):
+        # 최종 보고값만 (step 이 있는 중간 보고는 halving 판정용)
+        values = [r["value"] for r in read_metrics(variant["metrics_file"])
+                  if r.get("name") == self.metric and r.get("step") is None]
+        return values[-1] if values else None
+
+    def run(self, mode: str = "subprocess") -> dict:
+        eligible = [v for v in self.variants if self._eligible(v)]
+        candidates = {v["name"]: self._final_value(v) for v in eligible}
+        scored = [v for v in eligible if candidates[v["name"]] is not None]
+        if not scored:
+            return {"success": False, "error": f"No successful variant of '{self.name}' reported metric '{self.metric}'."}
+
+        sign = 1 if self.goal == "max" else -1
+        best = max(scored, key=lambda v: sign * candidates[v["name"]])
+        selection = {
+            "step": self.name,
+            "variant": best["name"],
+            "metric": self.metric,
+            "goal": self.goal,
+            "value": candidates[best["name"]],
+            "params": best["params"],
+            "config": best["config"],
+            "output_dir": best["dir"],
+            "candidates": candidates,
+            "excluded": [v["name"] for v in self.variants if v not in eligible],
+        }
+        tmp = self.best_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(selection, f, indent=2)
+        os.replace(tmp, self.best_file)
+        # 증분 처리 스텝이면 best variant 가 조회한 구간까지만 watermark 전진
+        if apply_pending(os.path.join(best["dir"], PENDING_WATERMARK_FILE)):
+            self.logger.info(f"💧 [{self.name}] watermark advanced from {best['name']}")
+
+        self.logger.info(
+            f"🏆 [{self.name}] best variant: {best['name']} ({self.metric}={selection['value']}, "
+            f"{len(scored)}/{len(self.variants)} reported) -> {self.best_file}"
+        )
+        return {"success": True, "best": best["name"], "best_file": self.best_file}
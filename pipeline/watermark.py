@@ -0,0 +1,195 @@
+# pipeline/watermark.py
+"""(스텝 프로세스 쪽) 증분 처리용 watermark / row fingerprint 저장소 (로컬 sqlite).
+
+- watermark: 스텝별 마지막 처리 파티션(partition) + 조회 시점(updated_at, UTC)
+  -> ETL 쿼리는 이후 새 파티션 + 늦게 도착/수정된 행만 조회 (watermark_condition)
+- row fingerprint: 스텝별 row key -> 행 내용 해시
+  -> 조회된 행 중 이전과 내용이 같은 행은 다시 처리하지 않는다 (changed)
+
+StepRunner 가 넘겨주는 환경 변수:
+  PIPELINE_WATERMARK_DB       저장소 경로 (options.watermark_db)
+  PIPELINE_FULL_REFRESH       1 이면 watermark/fingerprint 를 무시하고 전체 재처리 (main.py --full-refresh)
+  PIPELINE_WATERMARK_KEY      watermark 키 = DAG 스텝 이름 (sweep variant 는 원래 스텝 이름)
+  PIPELINE_WATERMARK_PENDING  sweep variant: 전진 값을 이 파일에 남기고, 선택 노드가 best variant 것만 반영
+
+사용 예:
+    store, key = WatermarkStore(), watermark_key("inference")
+    window = store.window(key, target_date)                   # None 이면 전체 파티션 조회
+    query = generate_inference_dataset_etl_query(cfg, target_date, watermark=window)
+    ...
+    mask = store.changed(key, keys, fingerprints)             # 처리할 행
+    ... 결과 저장 후 ...
+    store.commit_rows(key, keys[mask], fingerprints[mask])
+    store.finish(key, target_date, queried_at)
+
+상태는 결과를 저장한 뒤에만 갱신한다 (중간에 실패하면 다음 실행이 같은 행을 다시 처리).
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+WATERMARK_DB_ENV = "PIPELINE_WATERMARK_DB"
+FULL_REFRESH_ENV = "PIPELINE_FULL_REFRESH"
+WATERMARK_KEY_ENV = "PIPELINE_WATERMARK_KEY"
+PENDING_WATERMARK_ENV = "PIPELINE_WATERMARK_PENDING"
+PENDING_WATERMARK_FILE = "watermark.json"  # sweep variant 출력 디렉토리 아래
+DEFAULT_DB = "state/watermarks.sqlite"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_LOOKBACK_DAYS = 30  # 늦게 수정된 행을 찾는 과거 파티션 범위
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    step TEXT PRIMARY KEY,
+    partition TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS row_fingerprints (
+    step TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    PRIMARY KEY (step, row_key)
+);
+"""
+
+
+def is_full_refresh() -> bool:
+    return os.environ.get(FULL_REFRESH_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def watermark_key(default: str) -> str:
+    """watermark 키. 파이프라인에서는 DAG 스텝 이름, 단독 실행이면 default (스텝 설정의 name)"""
+    return os.environ.get(WATERMARK_KEY_ENV) or default
+
+
+def apply_pending(path: str) -> bool:
+    """sweep variant 가 남긴 전진 값을 반영 (선택 노드가 best variant 에 대해 한 번 호출)"""
+    if not path or not os.path.exists(path):
+        return False
+    with open(path, encoding="utf-8") as f:
+        pending = json.load(f)
+    WatermarkStore(pending["db"]).advance(pending["step"], pending["partition"], pending["updated_at"])
+    return True
+
+
+def utc_now() -> str:
+    """쿼리 조회 시점 (다음 실행의 updated_at 기준)"""
+    return datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def watermark_condition(target_date: str, watermark: Optional[dict], partition_column: str = "purchase_date",
+                        updated_at_column: str = "updated_at", lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> str:
+    """ETL 쿼리 WHERE 조건. watermark 가 없으면 기존과 같은 단일 파티션 조건.
+    늦게 수정된 행은 최근 lookback_days 파티션 안에서만 찾는다 (updated_at 조건만으로는 전체 파티션 스캔)"""
+    if not watermark:
+        return f"{partition_column} = DATE('{target_date}')"
+    since = datetime.strptime(_date_key(target_date), "%Y-%m-%d") - timedelta(days=int(lookback_days))
+    return (
+        f"{partition_column} <= DATE('{target_date}')\n"
+        f"      AND ({partition_column} > DATE('{watermark['partition']}')"
+        f" OR ({partition_column} >= DATE('{since:%Y-%m-%d}')"
+        f" AND {updated_at_column} > TIMESTAMP '{watermark['updated_at']}'))"
+    )
+
+
+class WatermarkStore:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get(WATERMARK_DB_ENV) or DEFAULT_DB
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # sweep variant 등 여러 스텝 프로세스가 동시에 열 수 있으므로 WAL + busy timeout
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, step: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT partition, updated_at FROM watermarks WHERE step = ?", (step,)).fetchone()
+        return {"partition": row[0], "updated_at": row[1]} if row else None
+
+    def window(self, step: str, target_date: str, full_refresh: Optional[bool] = None,
+               lookback_s: float = 0) -> Optional[dict]:
+        """증분 조회 기준 watermark. None 이면 전체 파티션 조회
+        (full refresh / 첫 실행 / watermark 보다 이전 날짜의 backfill)"""
+        if is_full_refresh() if full_refresh is None else full_refresh:
+            return None
+        watermark = self.get(step)
+        if not watermark or _date_key(target_date) < _date_key(watermark["partition"]):
+            return None
+        if lookback_s:
+            # 조회 시점 직전에 커밋 중이던 행을 놓치지 않도록 여유를 둔다
+            shifted = datetime.strptime(watermark["updated_at"], TIMESTAMP_FORMAT) - timedelta(seconds=lookback_s)
+            watermark = dict(watermark, updated_at=shifted.strftime(TIMESTAMP_FORMAT))
+        return watermark
+
+    def advance(self, step: str, partition: str, updated_at: str):
+        """watermark 전진 (backfill 로 과거 날짜를 다시 처리해도 뒤로 가지 않는다).
+        비교를 UPSERT 안에서 해서 동시에 전진하는 프로세스끼리 값을 덮어쓰지 않는다"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO watermarks (step, partition, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(step) DO UPDATE SET partition = MAX(partition, excluded.partition), "
+                "updated_at = MAX(updated_at, excluded.updated_at)",
+                (step, _date_key(partition), updated_at),
+            )
+
+    def finish(self, step: str, partition: str, updated_at: str):
+        """스텝 성공 후 watermark 전진. sweep variant 면 바로 전진하지 않고 pending 파일로 넘긴다
+        (variant 마다 전진하면 재시도/늦게 시작한 variant 가 다른 구간을 조회하게 된다)"""
+        pending = os.environ.get(PENDING_WATERMARK_ENV)
+        if not pending:
+            self.advance(step, partition, updated_at)
+            return
+        os.makedirs(os.path.dirname(pending) or ".", exist_ok=True)
+        with open(pending + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"db": self.path, "step": step, "partition": partition, "updated_at": updated_at}, f)
+        os.replace(pending + ".tmp", pending)
+
+    def fingerprints(self, step: str) -> dict:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT row_key, fingerprint FROM row_fingerprints WHERE step = ?", (step,)))
+
+    def changed(self, step: str, keys, fingerprints) -> list:
+        """새 key 이거나 fingerprint 가 달라진 행이면 True (저장된 fingerprint 전체를 읽지 않고 sqlite 에서 join)"""
+        rows = [(i, str(k), int(fp)) for i, (k, fp) in enumerate(zip(keys, fingerprints))]
+        with self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE incoming (idx INTEGER PRIMARY KEY, row_key TEXT NOT NULL, fingerprint INTEGER NOT NULL)")
+            conn.executemany("INSERT INTO incoming VALUES (?, ?, ?)", rows)
+            changed = {idx for (idx,) in conn.execute(
+                "SELECT i.idx FROM incoming i LEFT JOIN row_fingerprints r ON r.step = ? AND r.row_key = i.row_key "
+                "WHERE r.fingerprint IS NULL OR r.fingerprint != i.fingerprint",
+                (step,),
+            )}
+        return [i in changed for i in range(len(rows))]
+
+    def commit_rows(self, step: str, keys, fingerprints):
+        rows = [(step, str(k), int(fp)) for k, fp in zip(keys, fingerprints)]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO row_fingerprints (step, row_key, fingerprint) VALUES (?, ?, ?) "
+                "ON CONFLICT(step, row_key) DO UPDATE SET fingerprint = excluded.fingerprint",
+                rows,
+            )
+
+    def reset(self, step: str):
+        """full refresh: 스텝의 watermark / fingerprint 삭제"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM watermarks WHERE step = ?", (step,))
+            conn.execute("DELETE FROM row_fingerprints WHERE step = ?", (step,))
+
+
+def _date_key(value: str) -> str:
+    """target_date 형식(YYYYMMDD / YYYY-MM-DD) 을 비교 가능한 YYYY-MM-DD 로"""
+    value = str(value)
+    return f"{value[:4]}-{value[4:6]}-{value[6:8]}" if len(value) == 8 and value.isdigit() else value
@@ -3,10 +3,30 @@
 import json
 import argparse
 import os
+import numpy as np
 from pipeline.config_loader import ConfigLoader
 from pipeline.logger import setup_logger
+from pipeline.watermark import DEFAULT_LOOKBACK_DAYS, WatermarkStore, is_full_refresh, utc_now, watermark_key
+from steps.preprocess.features import (
+    FeatureStateCache, load_csv_columns, merge_keyed, model_feature_state, row_fingerprints,
+)
 from steps.inference.queries.inference_dataset_etl_query import generate_inference_dataset_etl_query
 
+def write_output(path: str, features: dict, merge: bool, logger):
+    """결과 저장. merge 면 기존 결과에 cust_id 기준으로 병합 (임시 파일 후 교체)"""
+    if merge and os.path.exists(path):
+        with np.load(path, allow_pickle=False) as existing:
+            try:
+                features = merge_keyed(dict(existing), features)
+            except ValueError as e:
+                logger.warning(f"[WARNING] Rebuilding output from this run only: {e}")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **features)
+    os.replace(tmp, path)
+    return len(features["cust_id"])
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Step: inference")
     parser.add_argument('--config_file', type=str, required=True)
@@ -41,7 +61,70 @@ if __name__ == "__main__":
     logger.info(f"[INFO] Global config: env={global_config.env}, db={global_config.db}, s3={global_config.s3.base_output}")
     logger.info(f"[INFO] Step config: {json.dumps(inference_config, indent=2)}")
 
-    query = generate_inference_dataset_etl_query(cfg=global_config, target_date=args.target_date)
+    # train 이 sweep 으로 실행된 경우 선택된 variant 의 산출물 사용
+    model_dir = inference_config.get("model_dir")
+    best_file = os.environ.get("PIPELINE_SWEEP_TRAIN")
+    if best_file and os.path.exists(best_file):
+        with open(best_file) as f:
+            best = json.load(f)
+        logger.info(f"[INFO] Using sweep best variant: {best['variant']} ({best['metric']}={best['value']}) -> {best['output_dir']}")
+        model_dir = best["output_dir"]
+
+    # 증분 처리: 마지막 watermark 이후 조회 + 내용이 바뀐 고객만 처리 (--full-refresh 면 전체)
+    incremental_config = inference_config.get("incremental") or {}
+    store = WatermarkStore(inference_config.get("state_db")) if incremental_config else None
+    if store and "{target_date}" in (inference_config.get("output_path") or ""):
+        # 날짜별 파일에는 그날 바뀐 고객만 남게 된다 -> 누적 결과 파일 하나에 병합해야 한다
+        raise ValueError("output_path must not contain {target_date} when incremental is enabled.")
+    watermark_step = watermark_key(step_name)  # DAG 스텝 이름
+    full_refresh = is_full_refresh()
+    if store and full_refresh:
+        store.reset(watermark_step)
+        logger.info("[INFO] Full refresh: watermark and row fingerprints cleared")
+    window = store.window(
+        watermark_step, args.target_date, lookback_s=float(incremental_config.get("lookback_s", 0))
+    ) if store else None
+    queried_at = utc_now()
+
+    query = generate_inference_dataset_etl_query(
+        cfg=global_config, target_date=args.target_date, watermark=window,
+        updated_at_column=incremental_config.get("updated_at_column", "updated_at"),
+        lookback_days=int(incremental_config.get("lookback_days", DEFAULT_LOOKBACK_DAYS)),
+    )
     logger.info(f"[QUERY]\n{query}")
 
+    # 학습 때 fit 된 피처 state 를 그대로 사용 (inference 데이터로 다시 fit 하지 않음)
+    input_path = inference_config.get("input_path")
+    if input_path:
+        cache = FeatureStateCache(inference_config.get("state_dir", "state/features"))
+        # 설정 > 모델과 함께 기록된 state > latest (모델 기록이 없을 때만)
+        feature_state = inference_config.get("feature_state") or model_feature_state(model_dir)
+        if not feature_state:
+            feature_state = cache.latest()
+            logger.warning(f"[WARNING] No feature state recorded with the model; using latest: {feature_state}")
+        logger.info(f"[INFO] Feature state: {feature_state}")
+        transformer = cache.load(feature_state)
+        columns = load_csv_columns(input_path.format(target_date=args.target_date))
+        total = len(columns["cust_id"])
+        if store:
+            # 피처 state 가 바뀌면 fingerprint 도 바뀌므로 전체 고객이 다시 처리된다
+            fingerprints = row_fingerprints(columns, salt=feature_state or "")
+            changed = np.asarray(store.changed(watermark_step, columns["cust_id"], fingerprints), dtype=bool)
+            columns = {name: values[changed] for name, values in columns.items()}
+        features = transformer.transform(columns)
+        logger.info(
+            f"[INFO] Features: {len(features['cust_id'])}/{total} rows changed x {len(transformer.feature_names)} features"
+        )
+
+        output_path = inference_config.get("output_path")
+        if output_path:
+            output_path = output_path.format(target_date=args.target_date)
+            rows = write_output(output_path, features, merge=bool(store) and not full_refresh, logger=logger)
+            logger.info(f"[INFO] Output: {rows} rows -> {output_path}")
+        if store:
+            store.commit_rows(watermark_step, columns["cust_id"], fingerprints[changed])
+
+    if store:
+        store.finish(watermark_step, args.target_date, queried_at)
+
     print(json.dumps({"success": True}))
\ No newline at end of file
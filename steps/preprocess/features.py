@@ -0,0 +1,379 @@
+# steps/preprocess/features.py
+"""train / inference 공용 피처 변환 (cust_id, age, gender, purchase_date).
+
+- fit(): 학습 데이터에서 작은 상태(성별 vocabulary, age 통계/구간, 기준일)만 계산
+- transform(): 컬럼 배열을 chunk 단위로 NumPy 벡터 연산 (행 단위 파이썬 루프 없음)
+- FeatureStateCache: 데이터 fingerprint 로 fitted state 를 캐시 -> 같은 데이터 재fit 생략,
+  inference 는 train 이 남긴 state 를 그대로 로드
+- row_fingerprints / merge_keyed: 증분 처리 (변경된 행만 변환 후 기존 결과에 key 기준 병합)
+
+사용 예:
+    cache = FeatureStateCache("state/features")
+    transformer, fp, cached = cache.get_or_fit(train_columns)   # preprocess / train
+    features = cache.load().transform(inference_columns)          # inference (마지막 fit state 재사용)
+"""
+
+import csv
+import hashlib
+import json
+import os
+
+import numpy as np
+
+STATE_VERSION = 1
+DEFAULT_AGE_BINS = (0, 20, 30, 40, 50, 60, 200)
+DEFAULT_CHUNK_SIZE = 262_144
+FIT_COLUMNS = ("age", "gender", "purchase_date")
+
+
+def _missing_to_empty(values) -> np.ndarray:
+    """None/NaN 포함 컬럼 -> 유니코드 배열 (결측은 빈 문자열)"""
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        missing = (arr == None) | (arr != arr)  # noqa: E711  (None / NaN 을 원소 단위로)
+        arr = np.where(missing, "", arr)
+    return arr.astype(str, copy=False)
+
+
+def _as_str_array(values) -> np.ndarray:
+    """범주형 정규화 (strip + upper). 카디널리티가 낮으므로 unique 값만 변환 후 되돌린다"""
+    uniq, inverse = np.unique(_missing_to_empty(values), return_inverse=True)
+    return np.char.upper(np.char.strip(uniq))[inverse]
+
+
+def _as_float_array(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype.kind in "fiub":
+        return arr.astype(np.float64, copy=False)
+    # 문자열/None 혼합: 빈 값은 NaN
+    strs = _missing_to_empty(arr)
+    return np.where(strs == "", "nan", strs).astype(np.float64)
+
+
+_MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _parse_iso_dates(strs: np.ndarray):
+    """'YYYY-MM-DD' 고정 폭 문자열 빠른 경로 (문자 코드 배열 산술). 형식이 다르면 None"""
+    width = strs.dtype.itemsize // 4
+    if strs.dtype.kind != "U" or width < 10 or not strs.size:
+        return None
+    codes = np.ascontiguousarray(strs).reshape(-1).view(np.uint32).reshape(-1, width)
+    present = codes[:, 0] != 0  # 빈 문자열 = 결측
+    rows = codes if present.all() else codes[present]
+    if not ((rows[:, 4] == 45) & (rows[:, 7] == 45)).all():  # '-'
+        return None
+    if width > 10 and rows[:, 10:].any():  # 시간 등 뒤에 더 붙은 값
+        return None
+    digits = rows[:, [0, 1, 2, 3, 5, 6, 8, 9]].astype(np.int64) - 48
+    if ((digits < 0) | (digits > 9)).any():
+        return None
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    if ((month < 1) | (month > 12)).any():
+        return None
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _MONTH_DAYS[month - 1] + (leap & (month == 2))
+    if ((day < 1) | (day > month_days)).any():
+        return None
+    # days-from-civil (그레고리력 -> 1970-01-01 기준 일수). datetime64[M]->[D] 변환보다 훨씬 빠르다
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    out = np.full(strs.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+    out[present] = (era * 146097 + doe - 719468).astype("datetime64[D]")
+    return out
+
+
+def _civil_from_days(days: np.ndarray):
+    """1970-01-01 기준 일수 -> (year, month, day) 정수 배열 (days-from-civil 의 역변환)"""
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + np.where(mp < 10, 3, -9)
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+def _as_dates(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype.kind == "M":
+        return arr.astype("datetime64[D]")
+    strs = _missing_to_empty(arr)
+    parsed = _parse_iso_dates(strs)
+    if parsed is not None:
+        return parsed
+    try:
+        return np.where(strs == "", "NaT", strs).astype("datetime64[D]")
+    except ValueError:
+        # 파싱할 수 없는 값이 섞여 있으면 행 단위로: 잘못된 날짜는 결측(NaT -> -1 특성)
+        return np.array([_parse_date_or_nat(s) for s in strs.reshape(-1)], dtype="datetime64[D]").reshape(strs.shape)
+
+
+def _parse_date_or_nat(value: str) -> np.datetime64:
+    if not value:
+        return np.datetime64("NaT")
+    try:
+        return np.datetime64(value, "D")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+_NORMALIZERS = {"age": _as_float_array, "gender": _as_str_array, "purchase_date": _as_dates}
+
+
+def data_fingerprint(columns: dict, names=FIT_COLUMNS) -> str:
+    """fit 입력 컬럼 내용 기반 fingerprint (타입 정규화 후 sha256 — CSV/DB 로드 방식이 달라도 같은 값)"""
+    digest = hashlib.sha256(f"v{STATE_VERSION}".encode())
+    for name in names:
+        values = np.ascontiguousarray(_NORMALIZERS[name](columns[name]))
+        digest.update(f"{name}:{values.dtype}:{len(values)}".encode())
+        digest.update(values.view(np.uint8))
+    return digest.hexdigest()[:16]
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (uint64 원소 단위, overflow 는 wrap)"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _column_bits(values: np.ndarray) -> np.ndarray:
+    """정규화된 컬럼 -> 행별 uint64 (같은 값이면 같은 비트)"""
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[D]").astype(np.int64).view(np.uint64)
+    if values.dtype.kind == "f":
+        canon = values.astype(np.float64) + 0.0  # -0.0 -> 0.0
+        canon[np.isnan(canon)] = np.nan           # NaN payload 통일
+        return canon.view(np.uint64)
+    # 문자열: unique 값만 해시 후 되돌린다
+    uniq, inverse = np.unique(values.astype(str), return_inverse=True)
+    hashed = np.array(
+        [int.from_bytes(hashlib.blake2b(u.encode(), digest_size=8).digest(), "little") for u in uniq.tolist()],
+        dtype=np.uint64,
+    )
+    return hashed[inverse]
+
+
+def row_fingerprints(columns: dict, names=FIT_COLUMNS, salt: str = "") -> np.ndarray:
+    """행 내용 fingerprint (int64, 증분 처리의 변경 감지용). salt 에 피처 state fingerprint 를 넣으면
+    state 가 바뀔 때 모든 행이 변경으로 잡힌다"""
+    n = len(columns[names[0]])
+    seed = int.from_bytes(hashlib.blake2b(f"v{STATE_VERSION}:{salt}".encode(), digest_size=8).digest(), "little")
+    h = np.full(n, seed, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for i, name in enumerate(names):
+            bits = _column_bits(_NORMALIZERS[name](columns[name]))
+            h = _mix64(h ^ _mix64(bits + np.uint64(i + 1)))
+    return h.view(np.int64)
+
+
+def merge_keyed(existing: dict, updates: dict, key: str = "cust_id") -> dict:
+    """기존 결과에 updates 병합: 같은 key 행은 교체, 새 key 는 추가"""
+    if set(existing) != set(updates):
+        raise ValueError(f"Cannot merge outputs with different columns: {sorted(set(existing) ^ set(updates))}")
+    keep = ~np.isin(existing[key], updates[key])
+    return {name: np.concatenate([existing[name][keep], updates[name]]) for name in updates}
+
+
+class FeatureTransformer:
+    def __init__(self, age_bins=DEFAULT_AGE_BINS, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.age_bins = tuple(float(b) for b in age_bins)
+        self.chunk_size = int(chunk_size)
+        self.state = None
+
+    # ---- fit ----
+    def fit(self, columns: dict) -> "FeatureTransformer":
+        gender = _as_str_array(columns["gender"])
+        age = _as_float_array(columns["age"])
+        dates = _as_dates(columns["purchase_date"])
+
+        valid_age = age[~np.isnan(age)]
+        valid_dates = dates[~np.isnat(dates)]
+        self.state = {
+            "version": STATE_VERSION,
+            "gender_vocab": sorted(set(np.unique(gender).tolist()) - {""}),
+            "age_fill": float(np.median(valid_age)) if valid_age.size else 0.0,
+            "age_mean": float(valid_age.mean()) if valid_age.size else 0.0,
+            "age_std": (float(valid_age.std()) or 1.0) if valid_age.size else 1.0,
+            "age_bins": list(self.age_bins),
+            "date_ref": str(valid_dates.min()) if valid_dates.size else "1970-01-01",
+            "rows": int(len(gender)),
+        }
+        return self
+
+    @property
+    def feature_names(self) -> list:
+        self._require_fitted()
+        return (
+            [f"gender_{g}" for g in self.state["gender_vocab"]] + ["gender_unknown"]
+            + ["age_scaled", "age_bin", "age_missing"]
+            + ["purchase_dow", "purchase_month", "purchase_day", "purchase_is_weekend", "purchase_days_since_ref"]
+        )
+
+    def _require_fitted(self):
+        if self.state is None:
+            raise RuntimeError("FeatureTransformer is not fitted. Call fit() or load() first.")
+
+    # ---- transform ----
+    def transform(self, columns: dict, chunk_size: int = None) -> dict:
+        """컬럼 dict -> 피처 dict (name -> 1-D 배열). chunk 단위로 처리해 중간 메모리 제한"""
+        self._require_fitted()
+        n = len(columns["gender"])
+        chunk_size = chunk_size or self.chunk_size
+        vocab = np.array(self.state["gender_vocab"], dtype=str)
+
+        out = {name: np.empty(n, dtype=np.float32) for name in self.feature_names}
+        out["age_bin"] = np.empty(n, dtype=np.int8)
+        for name in ("purchase_dow", "purchase_month", "purchase_day"):
+            out[name] = np.empty(n, dtype=np.int8)
+
+        for start in range(0, n, chunk_size):
+            sl = slice(start, min(start + chunk_size, n))
+            self._transform_gender(_as_str_array(columns["gender"][sl]), vocab, out, sl)
+            self._transform_age(_as_float_array(columns["age"][sl]), out, sl)
+            self._transform_dates(_as_dates(columns["purchase_date"][sl]), out, sl)
+
+        if "cust_id" in columns:
+            out["cust_id"] = np.asarray(columns["cust_id"])
+        return out
+
+    def _transform_gender(self, gender, vocab, out, sl):
+        if vocab.size:
+            idx = np.searchsorted(vocab, gender)
+            idx_clipped = np.minimum(idx, vocab.size - 1)
+            known = vocab[idx_clipped] == gender
+        else:
+            idx_clipped = np.zeros(gender.shape, dtype=np.intp)
+            known = np.zeros(gender.shape, dtype=bool)
+        for k, g in enumerate(self.state["gender_vocab"]):
+            out[f"gender_{g}"][sl] = known & (idx_clipped == k)
+        out["gender_unknown"][sl] = ~known
+
+    def _transform_age(self, age, out, sl):
+        missing = np.isnan(age)
+        filled = np.where(missing, self.state["age_fill"], age)
+        out["age_scaled"][sl] = (filled - self.state["age_mean"]) / self.state["age_std"]
+        # 구간 경계 밖 값은 첫/마지막 구간으로
+        bins = np.asarray(self.state["age_bins"][1:-1])
+        out["age_bin"][sl] = np.digitize(filled, bins)
+        out["age_missing"][sl] = missing
+
+    def _transform_dates(self, dates, out, sl):
+        missing = np.isnat(dates)
+        ref = np.datetime64(self.state["date_ref"], "D").astype(np.int64)
+        epoch_days = np.where(missing, ref, dates.astype(np.int64))
+        _, month, day = _civil_from_days(epoch_days)
+        dow = (epoch_days + 3) % 7  # 월=0 (1970-01-01 은 목요일)
+        out["purchase_dow"][sl] = np.where(missing, -1, dow)
+        out["purchase_month"][sl] = np.where(missing, -1, month)
+        out["purchase_day"][sl] = np.where(missing, -1, day)
+        out["purchase_is_weekend"][sl] = ~missing & (dow >= 5)
+        out["purchase_days_since_ref"][sl] = epoch_days - ref
+
+    def to_matrix(self, features: dict) -> np.ndarray:
+        return np.column_stack([features[name].astype(np.float32, copy=False) for name in self.feature_names])
+
+    # ---- 상태 저장/로드 ----
+    def save(self, path: str):
+        self._require_fitted()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> "FeatureTransformer":
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported feature state version {state.get('version')} in {path}")
+        transformer = cls(age_bins=state["age_bins"], chunk_size=chunk_size)
+        transformer.state = state
+        return transformer
+
+
+class FeatureStateCache:
+    """fingerprint -> fitted state 파일 캐시. latest 포인터로 inference 가 마지막 학습 state 를 찾는다"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{fingerprint}.json")
+
+    def get_or_fit(self, columns: dict, age_bins=DEFAULT_AGE_BINS, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """(transformer, fingerprint, cached) — 같은 데이터/설정이면 fit 생략"""
+        fingerprint = data_fingerprint(columns)
+        fingerprint = hashlib.sha256(f"{fingerprint}:{list(age_bins)}".encode()).hexdigest()[:16]
+        path = self.path(fingerprint)
+        if os.path.exists(path):
+            transformer, cached = FeatureTransformer.load(path, chunk_size=chunk_size), True
+        else:
+            transformer, cached = FeatureTransformer(age_bins, chunk_size).fit(columns), False
+            transformer.save(path)
+        self._write_latest(fingerprint)
+        return transformer, fingerprint, cached
+
+    def _write_latest(self, fingerprint: str):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = os.path.join(self.cache_dir, "latest.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(fingerprint)
+        os.replace(tmp, os.path.join(self.cache_dir, "latest"))
+
+    def latest(self):
+        pointer = os.path.join(self.cache_dir, "latest")
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer, encoding="utf-8") as f:
+            return f.read().strip() or None
+
+    def load(self, fingerprint: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> FeatureTransformer:
+        fingerprint = fingerprint or self.latest()
+        if not fingerprint:
+            raise FileNotFoundError(f"No fitted feature state in {self.cache_dir}")
+        return FeatureTransformer.load(self.path(fingerprint), chunk_size=chunk_size)
+
+
+# 모델 산출물 디렉토리에 학습 때 쓴 피처 state fingerprint 를 남긴다.
+# inference 는 latest(마지막 preprocess fit) 대신 이 값을 써서 모델과 피처 인코딩이 어긋나지 않게 한다.
+MODEL_FEATURE_STATE_FILE = "feature_state"
+
+
+def write_model_feature_state(model_dir: str, fingerprint: str):
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, MODEL_FEATURE_STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(fingerprint)
+    os.replace(path + ".tmp", path)
+
+
+def model_feature_state(model_dir: str):
+    """모델과 함께 기록된 피처 state fingerprint (없으면 None)"""
+    path = os.path.join(model_dir or "", MODEL_FEATURE_STATE_FILE)
+    if not model_dir or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def load_csv_columns(path: str, names=("cust_id", "age", "gender", "purchase_date")) -> dict:
+    """ETL 결과 CSV -> 컬럼 배열 dict"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f, restval="")
+        rows = {name: [] for name in names}
+        for row in reader:
+            for name in names:
+                rows[name].append(row.get(name))
+    columns = {name: np.asarray(values, dtype=str) for name, values in rows.items()}
+    columns["age"] = _as_float_array(columns["age"])
+    return columns
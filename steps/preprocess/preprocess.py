@@ -3,8 +3,10 @@ import time
 import json
 import argparse
 import os
+import numpy as np
 from pipeline.config_loader import ConfigLoader
 from pipeline.logger import setup_logger
+from steps.preprocess.features import DEFAULT_AGE_BINS, DEFAULT_CHUNK_SIZE, FeatureStateCache, load_csv_columns
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Step: preprocess")
@@ -35,6 +37,27 @@ if __name__ == "__main__":
     logger.info(f"[INFO] Global config: env={global_config.env}, db={global_config.db}, s3={global_config.s3.base_output}")
     logger.info(f"[INFO] Step config: {json.dumps(preprocess_config, indent=2)}")
 
-    time.sleep(5)
+    input_path = preprocess_config.get("input_path")
+    if input_path:
+        # fit 은 데이터 fingerprint 별로 한 번만 (같은 입력 재실행 / inference 는 캐시된 state 재사용)
+        started = time.monotonic()
+        columns = load_csv_columns(input_path.format(target_date=args.target_date))
+        cache = FeatureStateCache(preprocess_config.get("state_dir", "state/features"))
+        transformer, fingerprint, cached = cache.get_or_fit(
+            columns,
+            age_bins=preprocess_config.get("age_bins", DEFAULT_AGE_BINS),
+            chunk_size=preprocess_config.get("chunk_size", DEFAULT_CHUNK_SIZE),
+        )
+        features = transformer.transform(columns)
+
+        output_path = preprocess_config.get("output_path", "state/features/{target_date}.npz").format(target_date=args.target_date)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        np.savez(output_path, **features)
+        logger.info(
+            f"[INFO] Features: {len(columns['gender'])} rows, state={fingerprint} ({'cached' if cached else 'fitted'}), "
+            f"{time.monotonic() - started:.2f}s -> {output_path}"
+        )
+    else:
+        time.sleep(5)
 
     print(json.dumps({"success": True}))
\ No newline at end of file
@@ -1,7 +1,12 @@
-from steps.settings import GlobalConfig
+from typing import Optional
 
-def generate_train_dataset_etl_query(cfg: GlobalConfig, target_date: str) -> str:
+from pipeline.watermark import DEFAULT_LOOKBACK_DAYS, watermark_condition
+from steps.settings import GlobalConfig
 
+def generate_train_dataset_etl_query(cfg: GlobalConfig, target_date: str, watermark: Optional[dict] = None,
+                                     updated_at_column: str = "updated_at",
+                                     lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> str:
+    # watermark 가 있으면 마지막 처리 이후 새 파티션 + 늦게 도착/수정된 행만 조회
     return f"""
     SELECT
         cust_id,
@@ -9,6 +14,6 @@ def generate_train_dataset_etl_query(cfg: GlobalConfig, target_date: str) -> str
         gender,
         purchase_date
     FROM {cfg.athena.customer}
-    WHERE purchase_date = DATE('{target_date}')
+    WHERE {watermark_condition(target_date, watermark, updated_at_column=updated_at_column, lookback_days=lookback_days)}
 
     """
@@ -4,6 +4,8 @@ import argparse
 import os
 from pipeline.config_loader import ConfigLoader
 from pipeline.logger import setup_logger
+from pipeline.watermark import DEFAULT_LOOKBACK_DAYS, WatermarkStore, is_full_refresh, utc_now, watermark_key
+from steps.preprocess.features import FeatureStateCache, write_model_feature_state
 from steps.train.queries.train_dataset_etl_query import generate_train_dataset_etl_query
 
 def training_needed():
@@ -46,7 +48,50 @@ if __name__ == "__main__":
     logger.info(f"[INFO] Global config: env={global_config.env}, db={global_config.db}, s3={global_config.s3.base_output}")
     logger.info(f"[INFO] Step config: {json.dumps(train_config, indent=2)}")
 
-    query = generate_train_dataset_etl_query(cfg=global_config, target_date=args.target_date)
+    # 증분 처리: 마지막 watermark 이후 새 파티션 + 늦게 도착/수정된 행만 조회 (--full-refresh 면 전체)
+    incremental_config = train_config.get("incremental") or {}
+    store = WatermarkStore(train_config.get("state_db")) if incremental_config else None
+    # 키는 DAG 스텝 이름 (sweep variant 들은 원래 스텝의 watermark 하나를 같이 쓴다)
+    watermark_step = watermark_key(step_name)
+    if store and is_full_refresh():
+        # 학습은 매번 조회 구간 전체로 새 모델을 만들므로 이전 출력과 병합할 것은 없고 watermark 만 초기화
+        store.reset(watermark_step)
+        logger.info("[INFO] Full refresh: watermark cleared")
+    window = store.window(
+        watermark_step, args.target_date, lookback_s=float(incremental_config.get("lookback_s", 0))
+    ) if store else None
+    queried_at = utc_now()
+
+    query = generate_train_dataset_etl_query(
+        cfg=global_config, target_date=args.target_date, watermark=window,
+        updated_at_column=incremental_config.get("updated_at_column", "updated_at"),
+        lookback_days=int(incremental_config.get("lookback_days", DEFAULT_LOOKBACK_DAYS)),
+    )
     logger.info(f"[QUERY]\n{query}")
 
+    # 장시간 학습은 pipeline.checkpoint 로 진행 상황 저장 -> 재시도 attempt 가 이어서 진행
+    #   state = load_checkpoint("train_state", default={"epoch": 0})
+    #   save_checkpoint("train_state", {"epoch": epoch + 1, ...})
+
+    # sweep variant 로 실행되면 output_dir 가 variant 별로 분리되어 들어온다
+    output_dir = train_config.get("output_dir")
+    if output_dir:
+        logger.info(f"[INFO] Output dir: {output_dir}")
+        # 학습에 쓴 피처 state 를 모델 옆에 기록 -> inference 가 같은 state 로 변환
+        feature_state = train_config.get("feature_state") or FeatureStateCache(
+            train_config.get("state_dir", "state/features")).latest()
+        if feature_state:
+            write_model_feature_state(output_dir, feature_state)
+            logger.info(f"[INFO] Feature state: {feature_state}")
+
+    # sweep 사용 시 학습 후 검증 metric 을 반드시 보고해야 선택 노드가 best 를 고를 수 있다 (파이프라인 밖에서는 no-op)
+    #   from pipeline.sweep import report_metric
+    #   report_metric("val_auc", auc)               # 최종 값
+    #   report_metric("val_auc", auc, step=epoch)   # 중간 값 (halving rung 판정)
+
+    # 학습이 끝난 뒤에만 watermark 전진 (실패하면 다음 실행이 같은 구간을 다시 조회)
+    # sweep variant 면 선택 노드가 best variant 의 값으로 한 번만 전진
+    if store:
+        store.finish(watermark_step, args.target_date, queried_at)
+
     print(json.dumps({"success": True}))
\ No newline at end of file
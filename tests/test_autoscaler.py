@@ -0,0 +1,46 @@
+# tests/test_autoscaler.py
+
+import logging
+import unittest
+from unittest.mock import patch
+
+from pipeline.autoscaler import AdaptiveConcurrency, available_cpus
+
+
+def _scaler(probe, **kwargs):
+    logger = logging.getLogger("test.autoscaler")
+    with patch("pipeline.autoscaler.available_cpus", return_value=4):
+        scaler = AdaptiveConcurrency(logger, interval_s=0, probe=lambda: dict(probe), **kwargs)
+    scaler.initial()
+    return scaler
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    def test_initial_is_clamped_cpu_count(self):
+        self.assertEqual(_scaler({}, min_workers=1, max_workers=2).limit, 2)
+        self.assertEqual(_scaler({}, min_workers=6, max_workers=8).limit, 6)
+        self.assertGreaterEqual(available_cpus(), 1)
+
+    def test_grows_for_io_bound_backlog_on_idle_host(self):
+        scaler = _scaler({"load_per_cpu": 0.1, "mem_available": 0.8}, max_workers=16)
+        scaler.observe({"duration_s": 10.0, "cpu_s": 1.0})  # I/O 위주 스텝
+        self.assertEqual(scaler.adjust(running=4, backlog=10), 5)
+
+    def test_holds_for_cpu_bound_steps(self):
+        scaler = _scaler({"load_per_cpu": 0.1, "mem_available": 0.8}, max_workers=16)
+        scaler.observe({"duration_s": 10.0, "cpu_s": 10.0})
+        self.assertEqual(scaler.adjust(running=4, backlog=10), 4)
+
+    def test_shrinks_under_load_or_memory_pressure(self):
+        self.assertEqual(_scaler({"load_per_cpu": 3.0}).adjust(running=4, backlog=0), 3)
+        self.assertEqual(_scaler({"mem_available": 0.02}).adjust(running=4, backlog=5), 3)
+        self.assertEqual(_scaler({"mem_pressure": 40.0}, min_workers=4).adjust(running=4, backlog=5), 4)
+
+    def test_every_decision_is_recorded(self):
+        scaler = _scaler({"load_per_cpu": 0.1})
+        scaler.adjust(running=1, backlog=0)
+        self.assertEqual([d["reason"] for d in scaler.decisions][-1], "hold")
+        self.assertEqual(len(scaler.decisions), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# tests/test_checkpoint.py
+
+import json
+import os
+import tempfile
+import textwrap
+import unittest
+from unittest.mock import patch
+
+from pipeline import checkpoint
+from pipeline.step_runner import StepRunner
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 첫 attempt 는 진행 상황 저장 후 실패, 재시도 attempt 는 저장된 지점부터 이어서 완료
+_RESUMABLE_SCRIPT = textwrap.dedent(f"""
+    import json, sys
+    sys.path.insert(0, {REPO_ROOT!r})
+    from pipeline.checkpoint import current_attempt, load_checkpoint, save_checkpoint
+    state = load_checkpoint("progress", default={{"done": []}})
+    for chunk in range(len(state["done"]), 4):
+        if current_attempt() == 1 and chunk == 2:
+            sys.exit(3)
+        state["done"].append((chunk, current_attempt()))
+        save_checkpoint("progress", state)
+    print(json.dumps({{"success": True, "done": state["done"]}}))
+""")
+
+
+class TestCheckpointHelpers(unittest.TestCase):
+    def test_noop_outside_pipeline(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(checkpoint.save_checkpoint("x", 1))
+            self.assertEqual(checkpoint.load_checkpoint("x", default=5), 5)
+            self.assertFalse(checkpoint.is_retry())
+
+    def test_atomic_save_and_load(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            with patch.dict(os.environ, {"PIPELINE_CHECKPOINT_DIR": tmp, "PIPELINE_ATTEMPT": "2"}):
+                checkpoint.save_checkpoint("state", {"epoch": 3})
+                self.assertEqual(checkpoint.load_checkpoint("state"), {"epoch": 3})
+                self.assertTrue(checkpoint.is_retry())
+                # 쓰는 도중 예외가 나면 이전 체크포인트가 그대로 남는다
+                with self.assertRaises(RuntimeError):
+                    with checkpoint.atomic_checkpoint("state") as path:
+                        with open(path, "wb") as f:
+                            f.write(b"partial")
+                        raise RuntimeError("crash")
+                self.assertEqual(checkpoint.load_checkpoint("state"), {"epoch": 3})
+                self.assertEqual(sorted(os.listdir(tmp)), ["state"])
+
+    def test_atomic_checkpoint_requires_written_file(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            with patch.dict(os.environ, {"PIPELINE_CHECKPOINT_DIR": tmp}):
+                with self.assertRaisesRegex(FileNotFoundError, "was not written"):
+                    with checkpoint.atomic_checkpoint("state"):
+                        pass
+                self.assertEqual(os.listdir(tmp), [])
+
+
+class TestResumeAcrossAttempts(unittest.TestCase):
+    @patch("time.sleep")
+    def test_retry_resumes_from_checkpoint(self, _mock_sleep):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            script = os.path.join(tmp, "step.py")
+            with open(script, "w") as f:
+                f.write(_RESUMABLE_SCRIPT)
+            step = StepRunner(name="resumable", script_path=script, config_path="unused.yaml", retries=2,
+                              target_date="20250101", checkpoint_root=os.path.join(tmp, "ckpt"), run_id="r1",
+                              log_file=os.path.join(tmp, "resumable.log"))
+
+            result = step.run_subprocess()
+
+            self.assertTrue(result["success"])
+            self.assertEqual(result["attempts"], 2)
+            done = json.loads(result["stdout"].splitlines()[-1])["done"]
+            self.assertEqual(done, [[0, 1], [1, 1], [2, 2], [3, 2]])
+            self.assertFalse(os.path.exists(step.checkpoint_dir))
+            # 비어 있는 <date>/<run_id> 상위 디렉토리도 남지 않는다
+            self.assertEqual(os.listdir(os.path.join(tmp, "ckpt")), [])
+
+    def test_runs_without_run_id_get_separate_checkpoints(self):
+        runners = [StepRunner(name="s", script_path="unused.py", config_path="unused.yaml", target_date="20250101",
+                              checkpoint_root="/tmp/ckpt", log_file=os.devnull) for _ in range(2)]
+        self.assertNotEqual(runners[0].checkpoint_dir, runners[1].checkpoint_dir)
+        self.assertNotIn(os.sep + "run" + os.sep, runners[0].checkpoint_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
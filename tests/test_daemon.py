@@ -0,0 +1,111 @@
+# tests/test_daemon.py
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from benchmarks.synthetic import generate_dag, write_synthetic_pipeline
+from pipeline.dag_run import DagRun
+from pipeline.daemon import PipelineDaemon, _ActiveRun, send_request, submit_and_wait
+
+
+def _wait_until(predicate, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestPipelineDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(dir="/tmp")
+        self.config_path = write_synthetic_pipeline(os.path.join(self.tmp.name, "p"), generate_dag("diamond", 4))
+        self.socket_path = os.path.join(self.tmp.name, "d.sock")
+        self.spool_dir = os.path.join(self.tmp.name, "spool")
+        self.daemon = PipelineDaemon(
+            max_workers=2, socket_path=self.socket_path, spool_dir=self.spool_dir,
+            logger=logging.getLogger("test.daemon"), poll_interval=0.05,
+        )
+        self.thread = threading.Thread(target=self.daemon.run_forever, daemon=True)
+        self.thread.start()
+        self.assertTrue(_wait_until(lambda: os.path.exists(self.socket_path)))
+
+    def tearDown(self):
+        self.daemon.stop()
+        self.thread.join(timeout=10)
+        self.tmp.cleanup()
+
+    def test_socket_submit_and_wait(self):
+        status = submit_and_wait(self.socket_path, {"config": self.config_path, "target_date": "20250101"},
+                                 poll_interval=0.05)
+        self.assertEqual(status["state"], "success")
+        self.assertEqual(set(status["steps"].values()), {"success"})
+
+    def test_step_selection(self):
+        status = submit_and_wait(self.socket_path, {"config": self.config_path, "steps": ["s00003"]},
+                                 poll_interval=0.05)
+        self.assertEqual(status["steps"], {"s00003": "success"})
+
+    def test_spool_requests_and_status_files(self):
+        incoming = os.path.join(self.spool_dir, "incoming", "batch.jsonl")
+        with open(incoming + ".tmp", "w") as f:
+            f.write(json.dumps({"config": self.config_path, "target_date": "20250101", "run_id": "spool-a"}) + "\n")
+            f.write(json.dumps({"config": self.config_path, "target_date": "20250102", "run_id": "spool-b"}) + "\n")
+        os.replace(incoming + ".tmp", incoming)
+
+        status_dir = os.path.join(self.spool_dir, "status")
+
+        def _done(run_id):
+            path = os.path.join(status_dir, f"{run_id}.json")
+            if not os.path.exists(path):
+                return False
+            with open(path) as f:
+                return json.load(f)["state"] == "success"
+
+        self.assertTrue(_wait_until(lambda: _done("spool-a") and _done("spool-b")))
+        runs = send_request(self.socket_path, {"op": "list"})["runs"]
+        self.assertEqual({r["run_id"] for r in runs}, {"spool-a", "spool-b"})
+
+    def test_unknown_config_fails_run(self):
+        status = submit_and_wait(self.socket_path, {"config": os.path.join(self.tmp.name, "missing.yaml")},
+                                 poll_interval=0.05)
+        self.assertEqual(status["state"], "failed")
+        self.assertTrue(status["error"])
+
+    def test_dag_structure_is_cached_until_config_changes(self):
+        submit_and_wait(self.socket_path, {"config": self.config_path}, poll_interval=0.05)
+        submit_and_wait(self.socket_path, {"config": self.config_path}, poll_interval=0.05)
+        (mtime, spec), = self.daemon._dags.values()
+        loader = self.daemon._get_loader(self.config_path)
+        self.assertIs(self.daemon._get_dag(self.config_path, loader), spec)
+
+        step_config = next(iter(spec["files"]))
+        os.utime(step_config, (mtime + 10, mtime + 10))
+        self.assertIsNot(self.daemon._get_dag(self.config_path, loader), spec)
+
+
+class TestFairScheduling(unittest.TestCase):
+    def test_round_robin_across_runs(self):
+        daemon = PipelineDaemon(max_workers=1, logger=logging.getLogger("test.daemon"))
+        try:
+            runs = []
+            for name in ("a", "b"):
+                run = _ActiveRun(name, {})
+                dag = {f"{name}1": {}, f"{name}2": {}}
+                run.dag_run = DagRun(dag, {}, global_force=False, logger=daemon.logger)
+                run.builder = type("B", (), {"step_pool": staticmethod(lambda step: (None, 0))})()
+                runs.append(run)
+            daemon._active = runs
+            picked = [daemon._next_ready()[0] for _ in range(4)]
+            self.assertEqual(picked, [runs[0], runs[1], runs[0], runs[1]])
+        finally:
+            daemon.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
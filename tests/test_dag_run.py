@@ -0,0 +1,65 @@
+# tests/test_dag_run.py
+
+import logging
+import unittest
+
+from pipeline.dag_run import DagRun
+
+
+def _dag(**deps):
+    return {name: {"depends_on": parents} for name, parents in deps.items()}
+
+
+class TestDagRun(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("test.dag_run")
+
+    def _drain(self, run, results):
+        while run.ready and not run.aborted:
+            name = run.pop_ready()
+            run.complete(name, results.get(name, {"success": True}))
+
+    def test_failure_skips_all_descendants(self):
+        dag = _dag(a=[], b=["a"], c=["b"], d=[])
+        run = DagRun(dag, {}, global_force=False, logger=self.logger)
+        run.complete(run.take_ready("a"), {"success": False, "stderr": "boom"})
+        self.assertEqual(run.status["b"], "skipped")
+        self.assertEqual(run.status["c"], "skipped")  # 손자까지 전파
+        self.assertTrue(run.aborted)
+
+    def test_forced_child_runs_after_failed_parent(self):
+        dag = _dag(a=[], b=["a"], c=["b"])
+        run = DagRun(dag, {"b": True}, global_force=False, logger=self.logger)
+        self._drain(run, {"a": {"success": False}})
+        self.assertEqual(run.status, {"a": "failed", "b": "success", "c": "success"})
+
+    def test_join_waits_for_all_parents(self):
+        dag = _dag(a=[], b=[], c=["a", "b"])
+        run = DagRun(dag, {}, global_force=False, logger=self.logger)
+        run.complete(run.take_ready("a"), {"success": True})
+        self.assertNotIn("c", run.ready)
+        run.complete(run.take_ready("b"), {"success": True})
+        self.assertIn("c", run.ready)
+
+    def test_one_success_select_tolerates_variant_failure_only(self):
+        dag = _dag(v0=[], v1=[], other=[], after=["other"])
+        dag["select"] = {"depends_on": ["v0", "v1"], "trigger_rule": "one_success"}
+        run = DagRun(dag, {}, global_force=False, logger=self.logger)
+        self.assertFalse(run.force_any)
+        run.complete(run.take_ready("v0"), {"success": False, "stderr": "boom"})
+        self.assertFalse(run.aborted)  # variant 실패는 run 을 중단하지 않는다
+        run.complete(run.take_ready("v1"), {"success": True})
+        self.assertIn("select", run.ready)
+        run.complete(run.take_ready("other"), {"success": False})
+        self.assertTrue(run.aborted)  # 다른 스텝 실패는 기존처럼 중단
+
+    def test_one_success_skipped_when_no_parent_succeeds(self):
+        dag = _dag(v0=[], v1=[])
+        dag["select"] = {"depends_on": ["v0", "v1"], "trigger_rule": "one_success"}
+        run = DagRun(dag, {}, global_force=False, logger=self.logger)
+        run.complete(run.take_ready("v0"), {"skipped": True})
+        run.complete(run.take_ready("v1"), {"success": False})
+        self.assertEqual(run.status["select"], "skipped")
+
+if __name__ == "__main__":
+    unittest.main()
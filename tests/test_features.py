@@ -0,0 +1,124 @@
+# tests/test_features.py
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmarks.preprocess_bench import make_columns, naive_fit, naive_transform
+from steps.preprocess.features import (
+    FeatureStateCache, FeatureTransformer, data_fingerprint, load_csv_columns, merge_keyed, row_fingerprints,
+)
+
+
+class TestFeatureTransformer(unittest.TestCase):
+    def setUp(self):
+        self.columns = {
+            "cust_id": np.arange(5),
+            "age": np.array([25.0, np.nan, 61.0, 15.0, 33.0]),
+            "gender": np.array(["m", " F ", None, "x", "F"], dtype=object),
+            "purchase_date": np.array(["2025-01-04", "2024-02-29", None, "2024-12-31", "2025-01-06"], dtype=object),
+        }
+
+    def test_encodings(self):
+        t = FeatureTransformer().fit(self.columns)
+        self.assertEqual(t.state["gender_vocab"], ["F", "M", "X"])
+        f = t.transform(self.columns)
+        np.testing.assert_array_equal(f["gender_F"], [0, 1, 0, 0, 1])
+        np.testing.assert_array_equal(f["gender_unknown"], [0, 0, 1, 0, 0])
+        np.testing.assert_array_equal(f["age_bin"], [1, 1, 5, 0, 2])
+        np.testing.assert_array_equal(f["age_missing"], [0, 1, 0, 0, 0])
+        # 2025-01-04 토요일, 2024-02-29 목요일 (월=0)
+        np.testing.assert_array_equal(f["purchase_dow"], [5, 3, -1, 1, 0])
+        np.testing.assert_array_equal(f["purchase_month"], [1, 2, -1, 12, 1])
+        np.testing.assert_array_equal(f["purchase_day"], [4, 29, -1, 31, 6])
+        np.testing.assert_array_equal(f["purchase_is_weekend"], [1, 0, 0, 0, 0])
+        self.assertEqual(t.to_matrix(f).shape, (5, len(t.feature_names)))
+
+    def test_malformed_dates_are_missing(self):
+        t = FeatureTransformer().fit(self.columns)
+        dates = np.array(["2025-01-04", "2025-02-30", "not a date", "2024-12-31 10:00:00", ""], dtype=object)
+        f = t.transform(dict(self.columns, purchase_date=dates))
+        np.testing.assert_array_equal(f["purchase_month"], [1, -1, -1, 12, -1])
+        np.testing.assert_array_equal(f["purchase_day"], [4, -1, -1, 31, -1])
+
+    def test_unseen_category_at_transform(self):
+        t = FeatureTransformer().fit(self.columns)
+        f = t.transform(dict(self.columns, gender=np.array(["Z", "f", "M", "", "x"])))
+        np.testing.assert_array_equal(f["gender_unknown"], [1, 0, 0, 1, 0])
+
+    def test_chunking_does_not_change_output(self):
+        columns = make_columns(5000, seed=3)
+        t = FeatureTransformer().fit(columns)
+        whole, chunked = t.transform(columns, chunk_size=10**6), t.transform(columns, chunk_size=333)
+        for name in t.feature_names:
+            np.testing.assert_array_equal(whole[name], chunked[name])
+
+    def test_matches_per_row_reference(self):
+        columns = make_columns(2000, seed=1)
+        t = FeatureTransformer().fit(columns)
+        features = t.transform(columns)
+        rows = naive_transform(columns, naive_fit(columns, t.age_bins))
+        for name in t.feature_names:
+            np.testing.assert_allclose(features[name], [r[name] for r in rows], atol=1e-4, err_msg=name)
+
+
+class TestFeatureStateCache(unittest.TestCase):
+    def test_fit_once_and_reuse(self):
+        columns = make_columns(1000)
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            cache = FeatureStateCache(tmp)
+            t1, fp1, cached1 = cache.get_or_fit(columns)
+            t2, fp2, cached2 = cache.get_or_fit({k: v.copy() for k, v in columns.items()})
+            self.assertEqual((fp1, cached1, cached2), (fp2, False, True))
+            self.assertEqual(t1.state, t2.state)
+            self.assertEqual(cache.latest(), fp1)
+            self.assertEqual(cache.load().state, t1.state)
+
+            _, fp3, cached3 = cache.get_or_fit(make_columns(1000, seed=9))
+            self.assertNotEqual(fp3, fp1)
+            self.assertFalse(cached3)
+
+    def test_fingerprint_ignores_storage_type(self):
+        columns = make_columns(500)
+        as_text = dict(columns, age=np.array([("" if a != a else str(a)) for a in columns["age"]], dtype=object))
+        self.assertEqual(data_fingerprint(columns), data_fingerprint(as_text))
+
+    def test_csv_roundtrip(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            path = os.path.join(tmp, "data.csv")
+            with open(path, "w") as f:
+                f.write("cust_id,age,gender,purchase_date\n1,30,M,2025-01-01\n2,,F,\n")
+            columns = load_csv_columns(path)
+            f = FeatureTransformer().fit(columns).transform(columns)
+            np.testing.assert_array_equal(f["age_missing"], [0, 1])
+            np.testing.assert_array_equal(f["purchase_month"], [1, -1])
+
+
+
+class TestIncrementalHelpers(unittest.TestCase):
+    def test_row_fingerprints_follow_normalized_content(self):
+        columns = {
+            "age": np.array([30.0, np.nan, 0.0]),
+            "gender": np.array(["M", "f", None], dtype=object),
+            "purchase_date": np.array(["2025-01-01", None, "2025-01-02"], dtype=object),
+        }
+        base = row_fingerprints(columns)
+        same = row_fingerprints(dict(columns, age=np.array([30, np.nan, -0.0]), gender=np.array([" m", "F", ""])))
+        np.testing.assert_array_equal(base, same)
+        changed = row_fingerprints(dict(columns, age=np.array([30.0, np.nan, 1.0])))
+        np.testing.assert_array_equal(base == changed, [True, True, False])
+        self.assertFalse((row_fingerprints(columns, salt="other-state") == base).any())
+
+    def test_merge_keyed_replaces_and_appends(self):
+        existing = {"cust_id": np.array(["1", "2", "3"]), "score": np.array([0.1, 0.2, 0.3])}
+        updates = {"cust_id": np.array(["2", "4"]), "score": np.array([0.9, 0.4])}
+        merged = merge_keyed(existing, updates)
+        self.assertEqual(dict(zip(merged["cust_id"], merged["score"])), {"1": 0.1, "2": 0.9, "3": 0.3, "4": 0.4})
+        with self.assertRaises(ValueError):
+            merge_keyed(existing, {"cust_id": updates["cust_id"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# tests/test_logger.py
+
+import glob
+import gzip
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pipeline.logger import (
+    CompressingRotatingFileHandler, RunLogLayout, _compressor, find_attempt_log, release_logger, setup_logger,
+)
+
+
+class TestRunLogLayout(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_runs_do_not_share_files_or_loggers(self):
+        run_a = RunLogLayout(self.root, target_date="20250101", run_id="run-a")
+        run_b = RunLogLayout(self.root, target_date="20250101", run_id="run-b")
+
+        logger_a = setup_logger("pipeline", run_a.pipeline_log, layout=run_a, split_streams=False)
+        logger_b = setup_logger("pipeline", run_b.pipeline_log, layout=run_b, split_streams=False)
+        self.assertIsNot(logger_a, logger_b)
+
+        logger_a.info("only in a")
+        logger_b.info("only in b")
+        release_logger(logger_a)
+        release_logger(logger_b)
+
+        with open(os.path.join(self.root, "20250101", "run-a", "pipeline.log")) as f:
+            content = f.read()
+        self.assertIn("only in a", content)
+        self.assertNotIn("only in b", content)
+
+    def test_rotated_segments_are_compressed(self):
+        layout = RunLogLayout(self.root, target_date="20250101", run_id="rot", max_bytes=2000, backup_count=3)
+        logger = setup_logger("rotating", layout.pipeline_log, layout=layout, split_streams=False)
+        for i in range(200):
+            logger.info(f"line {i} " + "x" * 40)
+        release_logger(logger)
+        _compressor.wait_idle()
+
+        segments = sorted(glob.glob(layout.pipeline_log + ".*"))
+        self.assertTrue(segments)
+        self.assertTrue(all(s.endswith(".gz") for s in segments), segments)
+        self.assertLessEqual(len(segments), 3)
+        with gzip.open(segments[0], "rt") as f:
+            self.assertIn("line", f.read())
+
+    def test_step_process_log_rotates_like_layout(self):
+        layout = RunLogLayout(self.root, target_date="20250101", run_id="step", max_bytes=2000, backup_count=2)
+        env = layout.step_env("train", 1)
+        with patch.dict(os.environ, env):
+            logger = setup_logger("train-proc", env["PIPELINE_STEP_LOG_FILE"], split_streams=False)
+            self.assertIsInstance(logger.handlers[0], CompressingRotatingFileHandler)
+            for i in range(200):
+                logger.info(f"line {i} " + "x" * 40)
+            handler = logger.handlers[0]
+            release_logger(logger)
+        handler._pending.wait(5)
+        self.assertTrue(glob.glob(env["PIPELINE_STEP_LOG_FILE"] + ".*.gz"))
+
+    def test_attempt_index_lookup(self):
+        layout = RunLogLayout(self.root, target_date="20250101", run_id="idx")
+        logger = setup_logger("train", None, layout=layout, split_streams=False)
+
+        for attempt in (1, 2):
+            with layout.attempt(logger, "train", attempt):
+                logger.info(f"attempt {attempt} output")
+            layout.record_attempt("train", attempt, status="failed" if attempt == 1 else "success")
+        release_logger(logger)
+
+        entry = find_attempt_log(self.root, "idx", "train", attempt=1)
+        self.assertEqual(entry["status"], "failed")
+        with open(entry["log"]) as f:
+            self.assertIn("attempt 1 output", f.read())
+
+        latest = find_attempt_log(self.root, "idx", "train")
+        self.assertEqual(latest["attempt"], 2)
+        self.assertIsNone(find_attempt_log(self.root, "missing-run", "train"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# tests/test_metrics.py
+
+import json
+import logging
+import tempfile
+import unittest
+import urllib.request
+from unittest.mock import patch
+
+from benchmarks.synthetic import generate_dag, write_synthetic_pipeline
+from pipeline.config_loader import ConfigLoader
+from pipeline.dag_run import DagRun
+from pipeline.metrics import MetricsServer, RunMetrics
+from pipeline.pipeline_builder import PipelineBuilder
+
+
+class TestRunMetrics(unittest.TestCase):
+    def test_states_and_retries(self):
+        metrics = RunMetrics()
+        metrics.start_run({"a": [], "b": ["a"]}, max_workers=2, run_id="r1")
+        metrics.step_queued("a")
+        metrics.step_started("a")
+        metrics.attempt_started("a", 2, pid=None)
+        metrics.log_line("a")
+
+        snap = metrics.snapshot()
+        self.assertEqual(snap["states"]["running"], 1)
+        self.assertEqual(snap["states"]["pending"], 1)
+        self.assertEqual(snap["active_workers"], 1)
+        self.assertEqual(snap["steps"]["a"]["retries"], 1)
+
+        text = metrics.render_prometheus()
+        self.assertIn('pipeline_steps{state="running"} 1', text)
+        self.assertIn('pipeline_step_retries_total{step="a"} 1', text)
+        self.assertIn("pipeline_max_workers 2", text)
+        self.assertTrue(metrics.render_prometheus(openmetrics=True).rstrip().endswith("# EOF"))
+
+    def test_counter_family_names(self):
+        metrics = RunMetrics()
+        metrics.start_run({"a": []}, max_workers=1)
+        text = metrics.render_prometheus()
+        self.assertIn("# TYPE pipeline_step_retries_total counter", text)
+        self.assertIn("# HELP pipeline_log_lines_total ", text)
+        om = metrics.render_prometheus(openmetrics=True)
+        self.assertIn("# TYPE pipeline_step_retries counter", om)
+        self.assertIn('pipeline_step_retries_total{step="a"} 0', om)
+
+    def test_queue_depth_counts_ready_steps_waiting_for_workers(self):
+        metrics = RunMetrics()
+        dag = {"a": {}, "b": {}, "c": {}, "d": {"depends_on": ["a"]}}
+        metrics.start_run({n: i.get("depends_on", []) for n, i in dag.items()}, max_workers=1)
+        run = DagRun(dag, {}, False, logging.getLogger("test"), metrics=metrics)
+        self.assertEqual(metrics.snapshot()["queue_depth"], 3)
+
+        run.pop_ready()
+        metrics.step_started("a")
+        self.assertEqual(metrics.snapshot()["queue_depth"], 2)
+        run.complete("a", {"success": True})
+        self.assertEqual(metrics.snapshot()["queue_depth"], 3)  # b, c 대기 + d 진입
+
+    def test_log_rate_survives_scrape_interval_longer_than_window(self):
+        metrics = RunMetrics(rate_window=10.0)
+        metrics.start_run({"a": []}, max_workers=1)
+        with patch("pipeline.metrics.time.time", side_effect=[100.0, 115.0, 175.0]):
+            metrics.snapshot()
+            metrics.log_lines("a", 1500)
+            self.assertAlmostEqual(metrics.snapshot()["log_lines_per_s"], 100.0)
+            self.assertEqual(metrics.snapshot()["log_lines_per_s"], 0.0)  # 직전 스크레이프 이후 라인 없음
+        self.assertEqual(metrics.snapshot()["steps"]["a"]["log_lines"], 1500)
+
+
+class TestMetricsServer(unittest.TestCase):
+    def test_http_endpoints_during_run(self):
+        metrics = RunMetrics()
+        server = MetricsServer(metrics, port=0).start()
+        base = f"http://127.0.0.1:{server.port}"
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                dag = generate_dag("diamond", 4)
+                config_path = write_synthetic_pipeline(tmp, dag, step_kind="log_heavy", log_lines=20)
+                builder = PipelineBuilder(ConfigLoader(config_path), metrics=metrics, target_date="20250101")
+                builder.run_all_parallel(max_workers=2)
+
+            with urllib.request.urlopen(f"{base}/status") as resp:
+                status = json.loads(resp.read())
+            self.assertEqual(status["states"]["success"], 4)
+            self.assertEqual(status["steps"]["s00003"]["depends_on"], ["s00001", "s00002"])
+            self.assertGreaterEqual(status["log_lines_total"], 4 * 20)
+
+            with urllib.request.urlopen(f"{base}/metrics") as resp:
+                self.assertTrue(resp.headers["Content-Type"].startswith("text/plain"))
+                body = resp.read().decode()
+            self.assertIn('pipeline_steps{state="success"} 4', body)
+            self.assertIn("pipeline_log_lines_per_second", body)
+        finally:
+            server.stop()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_planner.py
+
+import os
+import tempfile
+import time
+import unittest
+
+from benchmarks.synthetic import generate_dag
+from pipeline.history import RunHistory
+from pipeline.planner import PlanSimulator, replicate_dag
+
+
+def _dag(edges: dict, **estimates):
+    return {name: {"depends_on": parents, "estimate_s": estimates.get(name, 1)} for name, parents in edges.items()}
+
+
+class TestPlanSimulator(unittest.TestCase):
+    def test_critical_path_and_makespan(self):
+        dag = _dag({"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]}, a=2, b=5, c=1, d=3)
+        report = PlanSimulator(dag).plan(workers=2)
+        self.assertEqual(report["critical_path"], ["a", "b", "d"])
+        self.assertEqual(report["critical_path_s"], 10)
+        self.assertEqual(report["expected_makespan_s"], 10)
+
+    def test_worker_limit_serializes(self):
+        dag = _dag({f"s{i}": [] for i in range(4)}, **{f"s{i}": 10 for i in range(4)})
+        sim = PlanSimulator(dag)
+        self.assertEqual(sim.simulate(1, sim.expected_durations())["makespan_s"], 40)
+        result = sim.simulate(2, sim.expected_durations())
+        self.assertEqual(result["makespan_s"], 20)
+        self.assertEqual(result["worker_utilization"], [1.0, 1.0])
+
+    def test_pool_and_sensor(self):
+        dag = _dag({"wait": [], "q1": ["wait"], "q2": ["wait"]}, wait=5, q1=10, q2=10)
+        dag["q1"]["pool"] = dag["q2"]["pool"] = "athena"
+        sim = PlanSimulator(dag, pools={"athena": 1}, sensor_steps={"wait"})
+        result = sim.simulate(1, sim.expected_durations())
+        # sensor 는 워커를 점유하지 않고, pool 1 슬롯 때문에 쿼리는 직렬 실행
+        self.assertEqual(result["makespan_s"], 25)
+        result = sim.simulate(4, sim.expected_durations())
+        self.assertEqual(result["makespan_s"], 25)
+        self.assertEqual(result["pool_wait_s"]["athena"], 10)
+
+    def test_history_overrides_estimate(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            history = RunHistory(os.path.join(tmp, "h.jsonl"))
+            for d in (4, 6, 8):
+                history.record("a", "success", d, None)
+            history.record("a", "failed", 100, None)
+            sim = PlanSimulator(_dag({"a": []}, a=50), history=history)
+            self.assertEqual(sim.expected_durations(), [6])
+            report = sim.plan(workers=1, trials=10)
+            self.assertEqual(report["duration_sources"], {"history": 1})
+            self.assertLessEqual(report["makespan_distribution"]["max_s"], 8)
+
+    def test_large_backfill_is_fast(self):
+        dag = _dag(generate_dag("layered", 10))
+        sim = PlanSimulator(replicate_dag(dag, 1000))
+        start = time.perf_counter()
+        result = sim.simulate(8, sim.expected_durations())
+        self.assertEqual(result["completed"], 10000)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_large_pooled_backfill_is_fast(self):
+        dag = _dag(generate_dag("layered", 10))
+        for name in list(dag)[::2]:
+            dag[name]["pool"] = "athena"
+        sim = PlanSimulator(replicate_dag(dag, 1000), pools={"athena": 2})
+        start = time.perf_counter()
+        result = sim.simulate(8, sim.expected_durations())
+        self.assertEqual(result["completed"], 10000)
+        self.assertGreater(result["pool_wait_s"]["athena"], 0)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
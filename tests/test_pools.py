@@ -0,0 +1,96 @@
+# tests/test_pools.py
+
+import logging
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from benchmarks.synthetic import generate_dag, write_synthetic_pipeline
+from pipeline.config_loader import ConfigLoader
+from pipeline.pipeline_builder import PipelineBuilder
+from pipeline.pools import ConcurrencyPools, parse_pools
+
+
+class TestConcurrencyPools(unittest.TestCase):
+    def test_parse_short_and_long_forms(self):
+        self.assertEqual(parse_pools({"athena": 2, "s3": {"slots": 3}}), {"athena": 2, "s3": 3})
+        with self.assertRaises(ValueError):
+            parse_pools({"athena": 0})
+
+    def test_acquire_release_and_wait_accounting(self):
+        pools = ConcurrencyPools({"athena": 2})
+        self.assertTrue(pools.try_acquire("a", "athena", 2))
+        self.assertFalse(pools.try_acquire("b", "athena", 1))
+        pools.release("athena", 2)
+        self.assertTrue(pools.try_acquire("b", "athena", 1))
+        self.assertEqual(pools.summary()["athena"]["waited_steps"], 1)
+        self.assertTrue(pools.try_acquire("c", None))  # pool 없는 스텝은 제한 없음
+
+    def test_shared_definition_keeps_largest_and_per_owner_waits(self):
+        pools = ConcurrencyPools()
+        pools.define("athena", 1)
+        pools.define("athena", 3)
+        pools.define("athena", 2)
+        self.assertEqual(pools.slots["athena"], 3)
+        pools.validate_step("x", "athena", 3)
+
+        self.assertTrue(pools.try_acquire("a", "athena", 3, owner="run-1"))
+        self.assertFalse(pools.try_acquire("b", "athena", 1, owner="run-2"))
+        pools.release("athena", 3)
+        self.assertTrue(pools.try_acquire("b", "athena", 1, owner="run-2"))
+        self.assertEqual(pools.summary(owner="run-1")["athena"]["waited_steps"], 0)
+        self.assertEqual(pools.summary(owner="run-2")["athena"]["waited_steps"], 1)
+        self.assertEqual(pools.summary(owner="run-2", names=["s3"]), {})
+        pools.forget("run-2")
+        self.assertEqual(pools.summary(owner="run-2")["athena"]["waited_steps"], 0)
+        self.assertEqual(pools.summary()["athena"]["waited_steps"], 1)
+
+    def test_validate_step(self):
+        pools = ConcurrencyPools({"athena": 2})
+        with self.assertRaises(ValueError):
+            pools.validate_step("x", "missing", 1)
+        with self.assertRaises(ValueError):
+            pools.validate_step("x", "athena", 3)
+
+
+class TestPoolScheduling(unittest.TestCase):
+    def test_pool_caps_concurrency_below_max_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = write_synthetic_pipeline(tmp, generate_dag("fan", 7), step_kind="noop")
+            with open(config_path) as f:
+                config = yaml.safe_load(f)
+
+            # 루트 제외 6개 자식이 같은 pool(1 slot)을 쓰도록: 0.2초씩 잡는 스크립트
+            slow_script = os.path.join(tmp, "slow.py")
+            marker_dir = os.path.join(tmp, "markers")
+            os.makedirs(marker_dir)
+            with open(slow_script, "w") as f:
+                f.write(
+                    "import os, sys, time\n"
+                    f"d = {marker_dir!r}\n"
+                    "path = os.path.join(d, str(os.getpid()))\n"
+                    "open(path, 'w').close()\n"
+                    "time.sleep(0.2)\n"
+                    "concurrent = len(os.listdir(d))\n"
+                    "os.remove(path)\n"
+                    "sys.exit(0 if concurrent == 1 else 3)\n"
+                )
+            config["pools"] = {"athena": {"slots": 1}}
+            for name, info in config["dag"].items():
+                if info["depends_on"]:
+                    info.update(script=slow_script, pool="athena")
+            with open(config_path, "w") as f:
+                yaml.safe_dump(config, f)
+
+            builder = PipelineBuilder(ConfigLoader(config_path), logger=logging.getLogger("test.pools"))
+            builder.run_all_parallel(max_workers=4)
+
+            self.assertEqual(builder.failed_steps, [])
+            summary = builder.pools.summary()["athena"]
+            self.assertGreater(summary["wait_s"], 0)
+            self.assertGreaterEqual(summary["waited_steps"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+# tests/test_profiling.py
+
+import cProfile
+import logging
+import os
+import pstats
+import tempfile
+import unittest
+
+import yaml
+
+from pipeline.config_loader import ConfigLoader
+from pipeline.pipeline_builder import PipelineBuilder
+from pipeline.profiling import (
+    ProfiledStep, merge_profiles, pstats_to_collapsed, read_collapsed, top_frames, write_collapsed,
+)
+from pipeline.step_runner import StepRunner
+
+_SCRIPT = """
+import json, sys, yaml
+
+def busy_loop(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+cfg = yaml.safe_load(open(sys.argv[sys.argv.index("--config_file") + 1]))["config"]
+busy_loop(cfg.get("n", 300000))
+if cfg.get("exit_code"):
+    sys.exit(cfg["exit_code"])
+print(json.dumps({"success": True}))
+"""
+
+_SWEEP_SCRIPT = f"""
+import json, sys, yaml
+sys.path.insert(0, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r})
+from pipeline.sweep import report_metric
+cfg = yaml.safe_load(open(sys.argv[sys.argv.index("--config_file") + 1]))["config"]
+report_metric("score", cfg["x"])
+print(json.dumps({{"success": True}}))
+"""
+
+
+def _inner(n):
+    return sum(i * i for i in range(n))
+
+
+def _outer():
+    return _inner(200000) + _inner(100000)
+
+
+def _write_step(tmp, **cfg):
+    script = os.path.join(tmp, "step.py")
+    with open(script, "w") as f:
+        f.write(_SCRIPT)
+    params = os.path.join(tmp, f"params_{len(os.listdir(tmp))}.yaml")
+    with open(params, "w") as f:
+        yaml.safe_dump({"config": cfg}, f)
+    return script, params
+
+
+class TestCollapsedStacks(unittest.TestCase):
+    def test_pstats_paths_follow_call_edges(self):
+        prof = cProfile.Profile()
+        prof.runcall(_outer)
+        collapsed = pstats_to_collapsed(pstats.Stats(prof))
+        stacks = [s for s in collapsed if "_inner" in s]
+        self.assertTrue(stacks)
+        for stack in stacks:
+            frames = stack.split(";")
+            self.assertLess(frames.index(next(f for f in frames if f.startswith("_outer"))),
+                            frames.index(next(f for f in frames if f.startswith("_inner"))))
+        self.assertTrue(top_frames(collapsed, 1))
+
+    def test_merge_groups_variants_under_step(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            for step, stacks in {
+                "train__v0": {"main;fit": 300},
+                "train__v1": {"main;fit": 100},
+                "infer": {"main;predict": 50},
+            }.items():
+                os.makedirs(os.path.join(tmp, step))
+                write_collapsed(os.path.join(tmp, step, "attempt-1.collapsed"), stacks)
+            write_collapsed(os.path.join(tmp, "infer", "attempt-2.collapsed"), {"main;predict": 25})
+
+            profiles = merge_profiles(tmp)
+            self.assertEqual(profiles["infer"], {"main;predict": 75})
+            run_view = read_collapsed(os.path.join(tmp, "run.collapsed"))
+            self.assertEqual(run_view["train;train__v0;main;fit"], 300)
+            self.assertEqual(run_view["infer;main;predict"], 75)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "run.svg")))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "train__v1.svg")))
+
+
+class TestProfiledRunner(unittest.TestCase):
+    def _run(self, tmp, profiler, **cfg):
+        script, params = _write_step(tmp, **cfg)
+        profile_dir = os.path.join(tmp, "profiles")
+        runner = StepRunner("busy", script, params, logger=logging.getLogger("test.profile"), target_date="20250101",
+                            profile={"dir": profile_dir, "profiler": profiler, "interval_ms": 1})
+        return runner.run(), os.path.join(profile_dir, "busy", "attempt-1")
+
+    def test_cprofile_wraps_script(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            result, prefix = self._run(tmp, "cprofile")
+            self.assertTrue(result["success"])
+            for ext in (".prof", ".collapsed", ".svg"):
+                self.assertTrue(os.path.exists(prefix + ext), ext)
+            self.assertTrue(any("busy_loop" in s for s in read_collapsed(prefix + ".collapsed")))
+
+    def test_sampler_keeps_exit_code(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            result, prefix = self._run(tmp, "sample", n=3000000, exit_code=3)
+            self.assertFalse(result["success"])
+            self.assertEqual(result["returncode"], 3)
+            stacks = read_collapsed(prefix + ".collapsed")
+            self.assertTrue(any("busy_loop" in s for s in stacks))
+            # 래퍼/runpy 프레임은 스택에 나오지 않는다
+            self.assertFalse(any("runpy" in s or "profiling.py" in s for s in stacks))
+
+    def test_in_process_step(self):
+        class _Node:
+            name = "select"
+
+            def run(self, mode="subprocess"):
+                return {"success": True, "value": _outer()}
+
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            node = ProfiledStep(_Node(), tmp)
+            self.assertEqual(node.name, "select")
+            self.assertTrue(node.run()["success"])
+            stacks = read_collapsed(os.path.join(tmp, "select", "inprocess.collapsed"))
+            self.assertTrue(any("_inner" in s for s in stacks))
+
+
+class TestBuilderProfiling(unittest.TestCase):
+    def test_selected_steps_only_and_run_view(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            script, params = _write_step(tmp)
+            config_path = os.path.join(tmp, "config.yaml")
+            with open(config_path, "w") as f:
+                yaml.safe_dump({
+                    "name": "profile_test",
+                    "options": {"profile": {"dir": os.path.join(tmp, "profiles")},
+                                "checkpoint_dir": os.path.join(tmp, "ckpt")},
+                    "global": {"env": "test"},
+                    "logging": {"log_file": os.path.join(tmp, "logs", "pipeline.log"), "level": "INFO"},
+                    "dag": {
+                        "a": {"script": script, "config": params},
+                        "b": {"script": script, "config": params, "depends_on": ["a"]},
+                        "c": {"script": script, "config": params, "depends_on": ["a"], "profile": True},
+                    },
+                }, f)
+            builder = PipelineBuilder(ConfigLoader(config_path), target_date="20250101", profile="b")
+            self.assertEqual(builder.profile_steps, {"b", "c"})
+            builder.run_all_parallel(max_workers=2)
+            self.assertEqual(builder.failed_steps, [])
+
+            steps = {line.split(";", 1)[0] for line in read_collapsed(os.path.join(builder.profile_dir, "run.collapsed"))}
+            self.assertEqual(steps, {"b", "c"})
+            self.assertTrue(os.path.exists(os.path.join(builder.profile_dir, "run.svg")))
+
+    def test_sweep_variants_and_selector(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            script = os.path.join(tmp, "train.py")
+            with open(script, "w") as f:
+                f.write(_SWEEP_SCRIPT)
+            params = os.path.join(tmp, "train.yaml")
+            with open(params, "w") as f:
+                yaml.safe_dump({"config": {}, "sweep": {"metric": "score", "params": {"x": [1, 2]}}}, f)
+            config_path = os.path.join(tmp, "config.yaml")
+            with open(config_path, "w") as f:
+                yaml.safe_dump({
+                    "name": "profile_sweep_test",
+                    "options": {"profile": {"dir": os.path.join(tmp, "profiles")},
+                                "sweep_dir": os.path.join(tmp, "sweeps"), "checkpoint_dir": os.path.join(tmp, "ckpt")},
+                    "global": {"env": "test"},
+                    "logging": {"log_file": os.path.join(tmp, "logs", "pipeline.log"), "level": "INFO"},
+                    "dag": {"train": {"script": script, "config": params}},
+                }, f)
+            builder = PipelineBuilder(ConfigLoader(config_path), target_date="20250101", profile="train")
+            self.assertEqual(builder.profile_steps, {"train", "train__v0", "train__v1"})
+            builder.run_all_parallel(max_workers=2)
+            self.assertEqual(builder.failed_steps, [])
+
+            run_view = read_collapsed(os.path.join(builder.profile_dir, "run.collapsed"))
+            for variant in ("train__v0", "train__v1"):
+                self.assertTrue(any(stack.startswith(f"train;{variant};") for stack in run_view), variant)
+            self.assertTrue(os.path.exists(os.path.join(builder.profile_dir, "train", "inprocess.collapsed")))
+
+
+if __name__ == "__main__":
+    unittest.main()
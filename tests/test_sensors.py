@@ -0,0 +1,173 @@
+# tests/test_sensors.py
+
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import yaml
+
+from benchmarks.synthetic import generate_dag, write_synthetic_pipeline
+from pipeline.config_loader import ConfigLoader
+from pipeline.pipeline_builder import PipelineBuilder
+from pipeline.sensors import CallableSensor, SensorManager, build_sensor, wait_for_sensor
+
+_calls = []
+
+
+def flaky_check(target_date=None, ready_after=3):
+    _calls.append(target_date)
+    return len(_calls) >= ready_after
+
+
+def _wait_until(predicate, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestSensorConfig(unittest.TestCase):
+    def test_build_sensor_kinds(self):
+        sensor = build_sensor("s", {"kind": "partition", "path": "data/dt={target_date}"}, "20250101")
+        self.assertEqual(sensor.path, "data/dt=20250101")
+        marker = build_sensor("m", {"kind": "marker", "path": "out"})
+        self.assertTrue(marker.path.endswith(os.path.join("out", "_SUCCESS")))
+        with self.assertRaises(ValueError):
+            build_sensor("bad", {"kind": "nope"})
+        with self.assertRaises(ValueError):
+            build_sensor("s3", {"kind": "file", "path": "s3://bucket/key"})
+
+    def test_callable_backoff(self):
+        sensor = build_sensor("c", {"kind": "callable", "callable": "tests.test_sensors:flaky_check",
+                                    "poke_interval_s": 1, "max_interval_s": 5})
+        self.assertIsInstance(sensor, CallableSensor)
+        self.assertEqual([sensor.next_interval(n) for n in (1, 2, 3, 4, 5)], [1, 2, 4, 5, 5])
+
+
+class TestSensorManager(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("test.sensors")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_local_file_detected_without_waiting_for_poll_interval(self):
+        target = os.path.join(self.tmp.name, "landing", "dt=20250101", "_SUCCESS")
+        sensor = build_sensor("wait", {"kind": "file", "path": target, "poke_interval_s": 60, "timeout_s": 30})
+
+        def _land():
+            time.sleep(0.3)
+            os.makedirs(os.path.dirname(target))
+            open(target, "w").close()
+
+        threading.Thread(target=_land).start()
+        started = time.monotonic()
+        result = wait_for_sensor(sensor, self.logger)
+        self.assertTrue(result["success"])
+        self.assertLess(time.monotonic() - started, 10)  # inotify 로 감지 (60초 poll 이전)
+
+    def test_timeout_and_soft_fail(self):
+        missing = os.path.join(self.tmp.name, "never")
+        hard = build_sensor("hard", {"kind": "partition", "path": missing, "timeout_s": 0.2, "poke_interval_s": 0.05})
+        self.assertFalse(wait_for_sensor(hard, self.logger)["success"])
+        soft = build_sensor("soft", {"kind": "partition", "path": missing, "timeout_s": 0.2,
+                                     "poke_interval_s": 0.05, "soft_fail": True})
+        self.assertTrue(wait_for_sensor(soft, self.logger)["skipped"])
+
+    def test_cancelled_sensor_never_reports(self):
+        results = []
+        manager = SensorManager(lambda key, result: results.append(key), self.logger)
+        try:
+            manager.start(build_sensor("x", {"kind": "file", "path": os.path.join(self.tmp.name, "x")}), key=("r", "x"))
+            manager.cancel(("r", "x"))
+            open(os.path.join(self.tmp.name, "x"), "w").close()
+            time.sleep(0.3)
+            self.assertEqual(results, [])
+        finally:
+            manager.stop()
+
+    def test_inotify_watches_released_on_finish_and_cancel(self):
+        manager = SensorManager(lambda key, result: None, self.logger)
+        if not manager._inotify.available:
+            manager.stop()
+            self.skipTest("inotify not available")
+        try:
+            for name in ("a", "b"):
+                manager.start(build_sensor(name, {"kind": "file", "path": os.path.join(self.tmp.name, name),
+                                                  "poke_interval_s": 60, "timeout_s": 30}))
+            self.assertTrue(_wait_until(lambda: sum(manager._wd_refs.values()) == 2))
+            self.assertEqual(len(manager._wd_refs), 1)  # 같은 디렉토리 -> wd 공유
+            manager.cancel("a")
+            self.assertEqual(sum(manager._wd_refs.values()), 1)
+            open(os.path.join(self.tmp.name, "b"), "w").close()
+            self.assertTrue(_wait_until(lambda: not manager._wd_refs and not manager.active))
+        finally:
+            manager.stop()
+
+
+class _SlowDeliveryManager(SensorManager):
+    """watch 를 지운 뒤 결과 전달이 늦어지는 구간을 넓힌다"""
+
+    def _finish(self, key, result):
+        with self._lock:
+            self._release_wd(self._watches.pop(key, None))
+        time.sleep(1.0)
+        self.on_done(key, result)
+
+
+class TestSensorScheduling(unittest.TestCase):
+    def test_sensor_does_not_take_worker_slot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = write_synthetic_pipeline(tmp, generate_dag("chain", 2), step_kind="noop")
+            with open(config_path) as f:
+                config = yaml.safe_load(f)
+            landing = os.path.join(tmp, "landing")
+            # s00001 은 sensor 뒤에, s00000 은 독립적으로 실행
+            config["dag"]["wait_landing"] = {"type": "sensor", "sensor": {"kind": "partition", "path": landing,
+                                                                          "timeout_s": 30}}
+            config["dag"]["s00001"]["depends_on"] = ["s00000", "wait_landing"]
+            with open(config_path, "w") as f:
+                yaml.safe_dump(config, f)
+
+            def _land():
+                time.sleep(0.5)
+                os.makedirs(landing)
+                open(os.path.join(landing, "part-0"), "w").close()
+
+            threading.Thread(target=_land).start()
+            builder = PipelineBuilder(ConfigLoader(config_path), logger=logging.getLogger("test.sensors"))
+            self.assertIn("wait_landing", builder.get_step_names())
+            builder.run_all_parallel(max_workers=1)  # sensor 가 슬롯을 잡으면 s00000 이 막힌다
+
+            self.assertEqual(builder.failed_steps, [])
+            self.assertEqual(builder.skipped_steps, [])
+
+    def test_scheduler_waits_for_queued_sensor_result(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = write_synthetic_pipeline(tmp, generate_dag("chain", 2), step_kind="noop")
+            with open(config_path) as f:
+                config = yaml.safe_load(f)
+            config["dag"]["wait_landing"] = {"type": "sensor", "sensor": {"kind": "partition", "path": tmp}}
+            config["dag"]["s00001"]["depends_on"] = ["wait_landing"]
+            with open(config_path, "w") as f:
+                yaml.safe_dump(config, f)
+
+            builder = PipelineBuilder(ConfigLoader(config_path), logger=logging.getLogger("test.sensors"))
+            completed = []
+            complete_step = builder.complete_step
+            builder.complete_step = lambda run, name, result: completed.append(name) or complete_step(run, name, result)
+            # s00000 이 끝나 루프가 깨어날 때 sensor 는 active 에서 빠졌지만 결과는 아직 큐에 없다
+            with patch("pipeline.pipeline_builder.SensorManager", _SlowDeliveryManager):
+                builder.run_all_parallel(max_workers=2)
+
+            self.assertEqual(sorted(completed), ["s00000", "s00001", "wait_landing"])
+
+if __name__ == "__main__":
+    unittest.main()
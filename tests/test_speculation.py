@@ -0,0 +1,108 @@
+# tests/test_speculation.py
+
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+import yaml
+
+from pipeline.config_loader import ConfigLoader
+from pipeline.history import RunHistory
+from pipeline.pipeline_builder import PipelineBuilder
+from pipeline.speculation import SpeculationPolicy
+
+# attempt 번호별 소요 시간 (원본 = attempt 1, speculative 복제본 = attempt 2)
+_SCRIPT = """
+import json, os, signal, sys, time, yaml
+
+def _save_and_exit(signum, frame):
+    # 종료 요청을 받으면 진행분을 체크포인트로 남기고 나간다
+    os.makedirs(os.environ["PIPELINE_CHECKPOINT_DIR"], exist_ok=True)
+    with open(os.path.join(os.environ["PIPELINE_CHECKPOINT_DIR"], "state.json"), "w") as f:
+        f.write("{}")
+    sys.exit(1)
+
+signal.signal(signal.SIGTERM, _save_and_exit)
+delays = yaml.safe_load(open(sys.argv[sys.argv.index("--config_file") + 1]))["config"]["delays"]
+time.sleep(delays[int(os.environ["PIPELINE_ATTEMPT"]) - 1])
+print(json.dumps({"success": True}))
+"""
+
+
+class TestSpeculationPolicy(unittest.TestCase):
+    def test_thresholds_need_history_and_opt_in(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            history = RunHistory(os.path.join(tmp, "h.jsonl"))
+            for d in (10, 12, 20):
+                history.record("slow", "success", d, None)
+                history.record("other", "success", d, None)
+            history.record("new", "success", 5, None)
+            dag = {"slow": {"speculative": True}, "other": {}, "new": {"speculative": True}}
+            policy = SpeculationPolicy(dag, history, logging.getLogger("test.spec"), multiplier=2, min_runtime_s=1)
+            self.assertEqual(policy.thresholds, {"slow": 40})
+
+            policy.step_started("slow")
+            self.assertEqual(policy.stragglers(["slow"]), [])
+            policy.started["slow"] -= 41
+            self.assertEqual(policy.stragglers(["slow", "other"]), ["slow"])
+            policy.launched_for("slow")
+            self.assertEqual(policy.stragglers(["slow"]), [])  # 스텝당 한 번만
+
+
+class TestSpeculativeExecution(unittest.TestCase):
+    def _builder(self, tmp, delays):
+        script = os.path.join(tmp, "step.py")
+        with open(script, "w") as f:
+            f.write(_SCRIPT)
+        params = os.path.join(tmp, "params.yaml")
+        with open(params, "w") as f:
+            yaml.safe_dump({"config": {"delays": delays}}, f)
+        history_file = os.path.join(tmp, "history.jsonl")
+        history = RunHistory(history_file)
+        for _ in range(3):
+            history.record("slow", "success", 0.2, None)
+        config_path = os.path.join(tmp, "config.yaml")
+        with open(config_path, "w") as f:
+            yaml.safe_dump({
+                "name": "speculation_test",
+                "options": {"history_file": history_file, "checkpoint_dir": os.path.join(tmp, "ckpt"),
+                            "speculative": {"multiplier": 2, "min_runtime_s": 0.5, "check_interval_s": 0.05}},
+                "global": {"env": "test"},
+                "logging": {"log_file": os.path.join(tmp, "logs", "pipeline.log"), "level": "INFO"},
+                "dag": {"slow": {"script": script, "config": params, "speculative": True}},
+            }, f)
+        return PipelineBuilder(ConfigLoader(config_path), target_date="20250101", history=history)
+
+    def test_duplicate_wins_when_original_hangs(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            builder = self._builder(tmp, [30, 0.1])
+            started = time.monotonic()
+            builder.run_all_parallel(max_workers=2)
+            self.assertLess(time.monotonic() - started, 10)
+            self.assertEqual(builder.failed_steps, [])
+            self.assertEqual((builder.speculation.launched, builder.speculation.won), (1, 1))
+            # 이력에는 복제본 소요 시간(0.1s)이 아니라 원본 제출부터의 wall time
+            self.assertGreater(builder.history.durations("slow")[-1], 0.5)
+
+    def test_original_wins_and_duplicate_is_killed(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            builder = self._builder(tmp, [1.0, 30])
+            started = time.monotonic()
+            builder.run_all_parallel(max_workers=2)
+            self.assertLess(time.monotonic() - started, 10)
+            self.assertEqual(builder.failed_steps, [])
+            self.assertEqual((builder.speculation.launched, builder.speculation.won), (1, 0))
+            # 진 attempt 가 종료 시 저장한 체크포인트까지 정리된다
+            self.assertFalse(os.path.exists(builder.steps[0].checkpoint_dir))
+
+    def test_no_duplicate_without_free_slot(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            builder = self._builder(tmp, [1.0, 30])
+            builder.run_all_parallel(max_workers=1)
+            self.assertEqual(builder.speculation.launched, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,55 +1,109 @@
 # tests/test_step_runner.py
 
+import io
+import os
+import tempfile
 import unittest
-import subprocess  # subprocess 모듈 임포트 추가
 from unittest.mock import patch, MagicMock
 from pipeline.step_runner import StepRunner
-from typing import Any  # Any 임포트 추가
+
+
+def _fake_process(returncode=0, stdout="", stderr=""):
+    """subprocess.Popen 이 돌려주는 프로세스 객체 흉내"""
+    process = MagicMock()
+    process.stdout = io.StringIO(stdout)
+    process.stderr = io.StringIO(stderr)
+    process.wait.return_value = returncode
+    return process
+
 
 class TestStepRunner(unittest.TestCase):
     def setUp(self):
-        """테스트 전에 실행할 준비 작업"""
-        self.step = StepRunner(name="step_a", script_path="steps/a.py", config_path="configs/a.yaml")
-
-    @patch("subprocess.run")  # subprocess.run을 mocking
-    def test_run_subprocess_success(self, mock_run):
-        """subprocess.run이 성공하는 경우 테스트"""
-        # subprocess.run이 성공적인 종료 코드를 반환하도록 mock 설정
-        mock_run.return_value = MagicMock(returncode=0)
-        
+        """테스트 전에 실행할 준비 작업 (로그 파일은 임시 디렉토리에)"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp.name, "step_a.log")
+        self.step = StepRunner(name="step_a", script_path="steps/a.py", config_path="configs/a.yaml",
+                               log_file=self.log_file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch("subprocess.Popen")  # StepRunner는 Popen으로 자식 프로세스를 띄운다
+    def test_run_subprocess_success(self, mock_popen):
+        """자식 프로세스가 0으로 종료되는 경우 테스트"""
+        mock_popen.return_value = _fake_process(0, stdout='{"success": true}\n')
+
         result = self.step.run_subprocess()
-        
-        # 결과가 True여야 한다.
-        self.assertTrue(result)
-        # 호출된 subprocess.run의 인자들 확인
-        mock_run.assert_called_once_with(
-            ["python", "steps/a.py", "--config_file", "configs/a.yaml"],
-            check=True,
-            env=unittest.mock.ANY  # 환경 변수는 구체적으로 검증하지 않고, env 인자가 존재하는지 확인
-        )
-
-    @patch("subprocess.run")
-    def test_run_subprocess_failure(self, mock_run):
-        """subprocess.run이 실패하는 경우 테스트"""
-        # subprocess.run이 예외를 발생시키도록 설정
-        mock_run.side_effect = subprocess.CalledProcessError(1, "python")
-        
+
+        # 결과가 성공이어야 한다.
+        self.assertTrue(result["success"])
+        # 호출된 Popen의 인자들 확인
+        args, kwargs = mock_popen.call_args
+        self.assertEqual(args[0], ["python", "-u", "steps/a.py", "--config_file", "configs/a.yaml"])
+        self.assertIn("env", kwargs)  # 환경 변수는 구체적으로 검증하지 않고, env 인자가 존재하는지 확인
+
+    @patch("subprocess.Popen")
+    def test_run_subprocess_failure(self, mock_popen):
+        """자식 프로세스가 0이 아닌 코드로 종료되는 경우 테스트"""
+        mock_popen.return_value = _fake_process(1, stderr="Traceback (most recent call last):\nValueError: boom\n")
+
         result = self.step.run_subprocess()
-        
-        # 결과가 False여야 한다.
-        self.assertFalse(result)
-
-    @patch("subprocess.run")
-    def test_run_subprocess_retry(self, mock_run):
-        """subprocess.run이 실패하고 재시도하는지 테스트"""
-        # subprocess.run이 첫 번째 시도에서 실패하고, 두 번째 시도에서 성공하도록 설정
-        mock_run.side_effect = [subprocess.CalledProcessError(1, "python"), MagicMock(returncode=0)]
-        
+
+        # 결과가 실패여야 한다.
+        self.assertFalse(result["success"])
+        self.assertIn("ValueError: boom", result["stderr"])
+
+    @patch("time.sleep")
+    @patch("subprocess.Popen")
+    def test_run_subprocess_retry(self, mock_popen, _mock_sleep):
+        """프로세스 실행 중 예외가 나면 재시도하는지 테스트"""
+        step = StepRunner(name="step_a", script_path="steps/a.py", config_path="configs/a.yaml", retries=2,
+                          log_file=self.log_file)
+        # 첫 번째 시도에서 예외, 두 번째 시도에서 성공
+        mock_popen.side_effect = [OSError("spawn failed"), _fake_process(0)]
+
+        result = step.run_subprocess()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(mock_popen.call_count, 2)  # 재시도가 2번 이루어졌는지 확인
+
+    @patch("time.sleep")
+    @patch("subprocess.Popen")
+    def test_nonzero_exit_is_retried(self, mock_popen, _mock_sleep):
+        """0이 아닌 종료 코드도 재시도 대상 (체크포인트로 이어서 진행)"""
+        step = StepRunner(name="step_a", script_path="steps/a.py", config_path="configs/a.yaml", retries=3,
+                          log_file=self.log_file)
+        mock_popen.side_effect = [_fake_process(1), _fake_process(1), _fake_process(0)]
+
+        result = step.run_subprocess()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["attempts"], 3)
+        attempts = [call.kwargs["env"]["PIPELINE_ATTEMPT"] for call in mock_popen.call_args_list]
+        self.assertEqual(attempts, ["1", "2", "3"])
+
+    @patch("subprocess.Popen")
+    def test_checkpoint_dir_env_and_cleanup(self, mock_popen):
+        """(run_id, step, target_date) 별 체크포인트 디렉토리 전달, 성공 시 삭제"""
+        mock_popen.return_value = _fake_process(0)
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            step = StepRunner(name="step_a", script_path="steps/a.py", config_path="configs/a.yaml",
+                              target_date="20250101", checkpoint_root=tmp, run_id="r1", log_file=self.log_file)
+            self.assertEqual(step.checkpoint_dir, os.path.join(tmp, "20250101", "r1", "step_a"))
+
+            step.run_subprocess()
+
+            self.assertEqual(mock_popen.call_args.kwargs["env"]["PIPELINE_CHECKPOINT_DIR"], step.checkpoint_dir)
+            self.assertFalse(os.path.exists(step.checkpoint_dir))
+
+    @patch("subprocess.Popen")
+    def test_skipped_step(self, mock_popen):
+        """자식이 skipped JSON을 출력하면 스킵으로 처리"""
+        mock_popen.return_value = _fake_process(0, stdout='{"skipped": true}\n')
+
         result = self.step.run_subprocess()
-        
-        # 결과가 True여야 한다.
-        self.assertTrue(result)
-        self.assertEqual(mock_run.call_count, 2)  # 재시도가 2번 이루어졌는지 확인
+
+        self.assertTrue(result["skipped"])
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
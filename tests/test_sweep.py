@@ -0,0 +1,208 @@
+# tests/test_sweep.py
+
+import json
+import logging
+import os
+import tempfile
+import textwrap
+import unittest
+
+import yaml
+
+from pipeline.config_loader import ConfigLoader
+from pipeline.pipeline_builder import PipelineBuilder
+from pipeline.sweep import SuccessiveHalving, SweepSelector, expand_params, write_variant_configs
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# variant 설정의 config.x 를 rung 1 중간값과 최종값으로 보고
+_SWEEP_SCRIPT = textwrap.dedent(f"""
+    import json, sys, time, yaml
+    sys.path.insert(0, {REPO_ROOT!r})
+    from pipeline.sweep import report_metric
+    cfg = yaml.safe_load(open(sys.argv[sys.argv.index("--config_file") + 1]))["config"]
+    report_metric("score", cfg["x"], step=1)
+    time.sleep(cfg.get("sleep", 0))
+    report_metric("score", cfg["x"])
+    print(json.dumps({{"success": True}}))
+""")
+
+_NOOP_SCRIPT = "import json\nprint(json.dumps({'success': True}))\n"
+
+
+class TestExpandParams(unittest.TestCase):
+    def test_grid(self):
+        combos = expand_params({"params": {"a": [1, 2], "b": ["x", "y", "z"]}})
+        self.assertEqual(len(combos), 6)
+        self.assertIn({"a": 2, "b": "z"}, combos)
+        self.assertEqual(len(expand_params({"params": {"a": [1, 2], "b": [3, 4]}, "budget": 3})), 3)
+
+    def test_random_is_seeded(self):
+        cfg = {"mode": "random", "budget": 5, "seed": 7,
+               "params": {"lr": {"low": 1e-4, "high": 1e-1, "log": True}, "depth": [2, 4]}}
+        combos = expand_params(cfg)
+        self.assertEqual(combos, expand_params(cfg))
+        self.assertEqual(len(combos), 5)
+        self.assertTrue(all(1e-4 <= c["lr"] <= 1e-1 for c in combos))
+
+    def test_grid_rejects_ranges(self):
+        with self.assertRaises(ValueError):
+            expand_params({"params": {"lr": {"low": 0, "high": 1}}})
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+    def test_prunes_bottom_at_rung(self):
+        sh = SuccessiveHalving(rungs=[1, 2], eta=2, min_reports=4)
+        self.assertEqual(sh.report("a", 1, 0.9), [])
+        self.assertEqual(sh.report("b", 1, 0.1), [])
+        self.assertEqual(sh.report("c", 1, 0.5), [])
+        self.assertEqual(sorted(sh.report("d", 1, 0.3)), ["b", "d"])
+        # 다음 rung 으로 넘어간 variant 는 이전 rung 결과로 다시 판정하지 않음
+        self.assertEqual(sh.report("a", 3, 0.0), [])
+
+    def test_min_goal(self):
+        sh = SuccessiveHalving(rungs=[1], eta=2, min_reports=2, goal="min")
+        sh.report("a", 1, 0.1)
+        self.assertEqual(sh.report("b", 1, 0.9), ["b"])
+
+
+class TestSweepSelector(unittest.TestCase):
+    def test_writes_best_and_isolates_outputs(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            config_path = os.path.join(tmp, "train.yaml")
+            with open(config_path, "w") as f:
+                yaml.safe_dump({"name": "train", "config": {"x": 0},
+                                "sweep": {"metric": "score", "goal": "min", "params": {"x": [3, 1, 2]}}}, f)
+            variants = write_variant_configs("train", config_path, os.path.join(tmp, "sweep"))
+            self.assertEqual(len({v["dir"] for v in variants}), 3)
+            for v in variants:
+                with open(v["config"]) as f:
+                    cfg = yaml.safe_load(f)
+                self.assertNotIn("sweep", cfg)
+                self.assertEqual(cfg["config"]["output_dir"], v["dir"])
+                with open(v["metrics_file"], "w") as f:
+                    f.write(json.dumps({"name": "score", "value": cfg["config"]["x"], "step": None}) + "\n")
+
+            selector = SweepSelector("train", variants, "score", "min", os.path.join(tmp, "sweep"),
+                                     logging.getLogger("test.sweep"))
+            result = selector.run()
+            self.assertTrue(result["success"])
+            with open(selector.best_file) as f:
+                best = json.load(f)
+            self.assertEqual(best["params"], {"x": 1})
+            self.assertEqual(best["variant"], result["best"])
+
+    def test_ignores_unsuccessful_and_pruned_variants(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            variants = []
+            for i, records in enumerate([
+                [{"value": 9, "step": 1}],                    # 중간 보고만 (최종 없음)
+                [{"value": 5, "step": None}],                 # 실패
+                [{"value": 7, "step": None}],                 # 조기 종료
+                [{"value": 8, "step": 1}, {"value": 2, "step": None}],
+            ]):
+                path = os.path.join(tmp, f"v{i}.jsonl")
+                with open(path, "w") as f:
+                    f.writelines(json.dumps(dict(r, name="score")) + "\n" for r in records)
+                variants.append({"name": f"t__v{i}", "metrics_file": path, "params": {"i": i},
+                                 "config": "", "dir": tmp})
+            selector = SweepSelector("t", variants, "score", "max", tmp, logging.getLogger("test.sweep"))
+            selector.bind({"t__v0": "success", "t__v1": "failed", "t__v2": "success", "t__v3": "success"},
+                          pruned={"t__v2"})
+            result = selector.run()
+            self.assertEqual(result["best"], "t__v3")
+            with open(selector.best_file) as f:
+                self.assertEqual(json.load(f)["excluded"], ["t__v1", "t__v2"])
+
+    def test_fails_without_metric(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            variant = {"name": "t__v0", "metrics_file": os.path.join(tmp, "none.jsonl")}
+            result = SweepSelector("t", [variant], "score", "max", tmp, logging.getLogger("test.sweep")).run()
+            self.assertFalse(result["success"])
+
+
+class TestSweepPipeline(unittest.TestCase):
+    def test_fan_out_select_and_prune(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            sweep_script = os.path.join(tmp, "train.py")
+            noop_script = os.path.join(tmp, "noop.py")
+            with open(sweep_script, "w") as f:
+                f.write(_SWEEP_SCRIPT)
+            with open(noop_script, "w") as f:
+                f.write(_NOOP_SCRIPT)
+            train_cfg = os.path.join(tmp, "train.yaml")
+            with open(train_cfg, "w") as f:
+                yaml.safe_dump({"config": {"sleep": 3}, "sweep": {
+                    "metric": "score", "params": {"x": [1, 2, 3, 4]},
+                    "halving": {"rungs": [1], "eta": 2, "min_reports": 4, "poll_interval_s": 0.05},
+                }}, f)
+            noop_cfg = os.path.join(tmp, "noop.yaml")
+            with open(noop_cfg, "w") as f:
+                yaml.safe_dump({"config": {}}, f)
+            config_path = os.path.join(tmp, "config.yaml")
+            with open(config_path, "w") as f:
+                yaml.safe_dump({
+                    "name": "sweep_test",
+                    "options": {"force": False, "sweep_dir": os.path.join(tmp, "sweeps"),
+                                "checkpoint_dir": os.path.join(tmp, "ckpt")},
+                    "global": {"env": "test"},
+                    "logging": {"log_file": os.path.join(tmp, "logs", "pipeline.log"), "level": "INFO"},
+                    "dag": {
+                        "train": {"script": sweep_script, "config": train_cfg},
+                        "inference": {"script": noop_script, "config": noop_cfg, "depends_on": ["train"]},
+                    },
+                }, f)
+
+            builder = PipelineBuilder(ConfigLoader(config_path), target_date="20250101")
+            self.assertEqual([n for n in builder.get_step_names() if n.startswith("train__v")],
+                             [f"train__v{i}" for i in range(4)])
+            inference = next(s for s in builder.steps if s.name == "inference")
+            self.assertTrue(inference.extra_env["PIPELINE_SWEEP_TRAIN"].endswith("best.json"))
+
+            builder.run_all_parallel(max_workers=4)
+
+            self.assertEqual(builder.failed_steps, [])
+            # 하위 2개 variant 는 rung 1 에서 종료 (스킵 처리), 선택 노드와 inference 는 정상 실행
+            self.assertEqual(sorted(builder.skipped_steps), ["train__v0", "train__v1"])
+            with open(os.path.join(builder.sweeps["train"]["dir"], "best.json")) as f:
+                best = json.load(f)
+            self.assertEqual(best["variant"], "train__v3")
+            self.assertEqual(best["value"], 4)
+            self.assertEqual(best["excluded"], ["train__v0", "train__v1"])
+
+            # 로그 디렉토리 없이 같은 날짜를 다시 돌려도 sweep 디렉토리는 run 별로 분리
+            again = PipelineBuilder(ConfigLoader(config_path), target_date="20250101")
+            self.assertNotEqual(again.sweeps["train"]["dir"], builder.sweeps["train"]["dir"])
+
+    def test_single_step_run_expands_variants(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            sweep_script = os.path.join(tmp, "train.py")
+            with open(sweep_script, "w") as f:
+                f.write(_SWEEP_SCRIPT)
+            train_cfg = os.path.join(tmp, "train.yaml")
+            with open(train_cfg, "w") as f:
+                yaml.safe_dump({"config": {}, "sweep": {"metric": "score", "params": {"x": [1, 2]}}}, f)
+            config_path = os.path.join(tmp, "config.yaml")
+            with open(config_path, "w") as f:
+                yaml.safe_dump({
+                    "name": "sweep_step_test",
+                    "options": {"sweep_dir": os.path.join(tmp, "sweeps"), "checkpoint_dir": os.path.join(tmp, "ckpt")},
+                    "global": {"env": "test"},
+                    "logging": {"log_file": os.path.join(tmp, "logs", "pipeline.log"), "level": "INFO"},
+                    "dag": {
+                        "preprocess": {"script": sweep_script, "config": train_cfg.replace("train", "pre")},
+                        "train": {"script": sweep_script, "config": train_cfg, "depends_on": ["preprocess"]},
+                    },
+                }, f)
+            with open(train_cfg.replace("train", "pre"), "w") as f:
+                yaml.safe_dump({"config": {"x": 0}}, f)
+
+            builder = PipelineBuilder(ConfigLoader(config_path), target_date="20250101", selected_step="train")
+            builder.run_step("train")
+            self.assertEqual(builder.failed_steps, [])
+            with open(os.path.join(builder.sweeps["train"]["dir"], "best.json")) as f:
+                self.assertEqual(json.load(f)["variant"], "train__v1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+# tests/test_synthetic_dags.py
+
+import os
+import tempfile
+import unittest
+
+from benchmarks.synthetic import SHAPES, critical_path, generate_dag, write_synthetic_pipeline
+from pipeline.config_loader import ConfigLoader
+
+
+class TestSyntheticDags(unittest.TestCase):
+    def test_all_shapes_are_acyclic_with_requested_size(self):
+        for shape in SHAPES:
+            for n in (1, 10, 250):
+                dag = generate_dag(shape, n, seed=1)
+                self.assertEqual(len(dag), n, shape)
+                # 모든 부모는 DAG 안에 존재
+                for parents in dag.values():
+                    self.assertTrue(set(parents) <= set(dag))
+                critical_path(dag, {name: 1.0 for name in dag})  # 사이클이면 ValueError
+
+    def test_critical_path_per_shape(self):
+        ones = lambda dag: {name: 1.0 for name in dag}
+        self.assertEqual(critical_path(generate_dag("chain", 5), ones(generate_dag("chain", 5))), 5.0)
+        self.assertEqual(critical_path(generate_dag("fan", 5), ones(generate_dag("fan", 5))), 2.0)
+        self.assertEqual(critical_path(generate_dag("diamond", 5), ones(generate_dag("diamond", 5))), 3.0)
+
+    def test_layered_is_deterministic_for_seed(self):
+        self.assertEqual(generate_dag("layered", 100, seed=7), generate_dag("layered", 100, seed=7))
+
+    def test_written_config_is_loadable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = write_synthetic_pipeline(tmp, generate_dag("diamond", 4), step_kind="log_heavy", log_lines=10)
+            loader = ConfigLoader(config_path)
+            self.assertEqual(len(loader.config_data["dag"]), 4)
+            self.assertTrue(os.path.exists(loader.config_data["dag"]["s00000"]["script"]))
+
+if __name__ == "__main__":
+    unittest.main()
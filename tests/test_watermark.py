@@ -0,0 +1,223 @@
+# tests/test_watermark.py
+
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import yaml
+
+from pipeline.config_loader import ConfigLoader
+from pipeline.pipeline_builder import PipelineBuilder
+from pipeline.watermark import (
+    FULL_REFRESH_ENV, PENDING_WATERMARK_ENV, WATERMARK_DB_ENV, WATERMARK_KEY_ENV, WatermarkStore, apply_pending,
+    watermark_condition,
+)
+from steps.preprocess.features import FeatureStateCache, load_csv_columns, write_model_feature_state
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestWatermarkStore(unittest.TestCase):
+    def test_condition_without_watermark_is_single_partition(self):
+        self.assertEqual(watermark_condition("2025-01-02", None), "purchase_date = DATE('2025-01-02')")
+        cond = watermark_condition("2025-01-02", {"partition": "2025-01-01", "updated_at": "2025-01-01 03:00:00"})
+        self.assertIn("purchase_date <= DATE('2025-01-02')", cond)
+        self.assertIn("purchase_date > DATE('2025-01-01')", cond)
+        self.assertIn("updated_at > TIMESTAMP '2025-01-01 03:00:00'", cond)
+        # 늦게 수정된 행은 최근 파티션 범위 안에서만 찾는다
+        self.assertIn("purchase_date >= DATE('2024-12-03')", cond)
+        self.assertIn("purchase_date >= DATE('2024-12-26')", watermark_condition(
+            "20250102", {"partition": "2025-01-01", "updated_at": "2025-01-01 03:00:00"}, lookback_days=7))
+
+    def test_window_and_advance(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp, patch.dict(os.environ, {FULL_REFRESH_ENV: ""}):
+            store = WatermarkStore(os.path.join(tmp, "wm.sqlite"))
+            self.assertIsNone(store.window("inference", "20250102"))  # 첫 실행은 전체 파티션
+
+            store.advance("inference", "20250102", "2025-01-02 03:00:00")
+            self.assertEqual(store.window("inference", "20250103"),
+                             {"partition": "2025-01-02", "updated_at": "2025-01-02 03:00:00"})
+            self.assertEqual(store.window("inference", "20250103", lookback_s=60)["updated_at"], "2025-01-02 02:59:00")
+            # 과거 날짜 backfill 은 전체 파티션으로, watermark 는 뒤로 가지 않는다
+            self.assertIsNone(store.window("inference", "20250101"))
+            store.advance("inference", "20250101", "2025-01-01 00:00:00")
+            self.assertEqual(store.get("inference")["partition"], "2025-01-02")
+            self.assertIsNone(store.window("inference", "20250103", full_refresh=True))
+            # partition 과 updated_at 은 각각 큰 값을 유지
+            store.advance("inference", "20250101", "2025-01-05 00:00:00")
+            self.assertEqual(store.get("inference"), {"partition": "2025-01-02", "updated_at": "2025-01-05 00:00:00"})
+
+    def test_sweep_variant_defers_advance(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            store = WatermarkStore(os.path.join(tmp, "wm.sqlite"))
+            pending = os.path.join(tmp, "train__v1", "watermark.json")
+            with patch.dict(os.environ, {PENDING_WATERMARK_ENV: pending}):
+                store.finish("train", "20250102", "2025-01-02 03:00:00")
+            self.assertIsNone(store.get("train"))  # variant 는 바로 전진하지 않는다
+            self.assertTrue(apply_pending(pending))
+            self.assertEqual(store.get("train")["partition"], "2025-01-02")
+            self.assertFalse(apply_pending(os.path.join(tmp, "missing.json")))
+
+    def test_changed_rows(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            store = WatermarkStore(os.path.join(tmp, "wm.sqlite"))
+            self.assertEqual(store.changed("s", ["a", "b"], [1, 2]), [True, True])
+            store.commit_rows("s", ["a", "b"], [1, 2])
+            self.assertEqual(store.changed("s", ["a", "b", "c"], [1, 5, 3]), [False, True, True])
+            self.assertEqual(store.changed("other", ["a"], [1]), [True])
+            self.assertEqual(store.changed("s", [], []), [])
+            store.reset("s")
+            self.assertEqual(store.fingerprints("s"), {})
+
+
+class TestBuilderStateEnv(unittest.TestCase):
+    def test_full_refresh_and_db_reach_steps(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            params = os.path.join(tmp, "params.yaml")
+            with open(params, "w") as f:
+                yaml.safe_dump({"config": {}}, f)
+            config_path = os.path.join(tmp, "config.yaml")
+            with open(config_path, "w") as f:
+                yaml.safe_dump({
+                    "name": "watermark_test",
+                    "options": {"watermark_db": os.path.join(tmp, "wm.sqlite"), "checkpoint_dir": os.path.join(tmp, "ckpt")},
+                    "global": {"env": "test"},
+                    "logging": {"log_file": os.path.join(tmp, "pipeline.log"), "level": "INFO"},
+                    "dag": {"a": {"script": "step.py", "config": params}},
+                }, f)
+            step = PipelineBuilder(ConfigLoader(config_path), full_refresh=True).steps[0]
+            self.assertEqual(step.extra_env[WATERMARK_DB_ENV], os.path.join(tmp, "wm.sqlite"))
+            self.assertEqual(step.extra_env[FULL_REFRESH_ENV], "1")
+            step = PipelineBuilder(ConfigLoader(config_path)).steps[0]
+            self.assertNotIn(FULL_REFRESH_ENV, step.extra_env)
+            self.assertEqual(step.extra_env[WATERMARK_KEY_ENV], "a")
+            self.assertNotIn(PENDING_WATERMARK_ENV, step.extra_env)
+
+    def test_sweep_variants_share_watermark_key(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            params = os.path.join(tmp, "params.yaml")
+            with open(params, "w") as f:
+                yaml.safe_dump({"config": {}, "sweep": {"params": {"x": [1, 2]}}}, f)
+            config_path = os.path.join(tmp, "config.yaml")
+            with open(config_path, "w") as f:
+                yaml.safe_dump({
+                    "name": "watermark_sweep_test",
+                    "options": {"sweep_dir": os.path.join(tmp, "sweeps"), "checkpoint_dir": os.path.join(tmp, "ckpt")},
+                    "global": {"env": "test"},
+                    "logging": {"log_file": os.path.join(tmp, "pipeline.log"), "level": "INFO"},
+                    "dag": {"train": {"script": "step.py", "config": params}},
+                }, f)
+            builder = PipelineBuilder(ConfigLoader(config_path))
+            variants = [s for s in builder.steps if s.name.startswith("train__v")]
+            self.assertEqual({s.extra_env[WATERMARK_KEY_ENV] for s in variants}, {"train"})
+            self.assertEqual(len({s.extra_env[PENDING_WATERMARK_ENV] for s in variants}), 2)
+
+
+class TestIncrementalInference(unittest.TestCase):
+    def _write_csv(self, path, rows):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["cust_id", "age", "gender", "purchase_date"])
+            writer.writerows(rows)
+
+    def _write_global_config(self, tmp):
+        with open(os.path.join(REPO_ROOT, "configs/config.yaml")) as f:
+            global_cfg = yaml.safe_load(f)
+        global_cfg["logging"] = {"log_file": os.path.join(tmp, "pipeline.log"), "level": "INFO"}
+        with open(os.path.join(tmp, "config.yaml"), "w") as f:
+            yaml.safe_dump(global_cfg, f)
+
+    def _run(self, tmp, target_date, full_refresh=False):
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, PIPELINE_WATERMARK_DB=os.path.join(tmp, "wm.sqlite"))
+        env[FULL_REFRESH_ENV] = "1" if full_refresh else ""
+        out = subprocess.run(
+            [sys.executable, os.path.join(REPO_ROOT, "steps/inference/inference.py"),
+             "--config_file", os.path.join(tmp, "inference.yaml"),
+             "--global_config_file", os.path.join(tmp, "config.yaml"), "--target_date", target_date],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+        )
+        self.assertEqual(out.returncode, 0, out.stderr)
+        return out.stdout
+
+    def test_only_changed_customers_are_processed_and_merged(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            self._write_global_config(tmp)
+            with open(os.path.join(tmp, "inference.yaml"), "w") as f:
+                yaml.safe_dump({"name": "inference", "config": {
+                    "input_path": os.path.join(tmp, "input_{target_date}.csv"),
+                    "output_path": os.path.join(tmp, "scores.npz"),
+                    "state_dir": os.path.join(tmp, "features"),
+                    "incremental": {"updated_at_column": "updated_at"},
+                }}, f)
+
+            day1 = [[1, 30, "M", "2025-01-01"], [2, 40, "F", "2025-01-01"], [3, 50, "F", "2025-01-01"]]
+            self._write_csv(os.path.join(tmp, "input_20250101.csv"), day1)
+            FeatureStateCache(os.path.join(tmp, "features")).get_or_fit(
+                load_csv_columns(os.path.join(tmp, "input_20250101.csv")))
+
+            stdout = self._run(tmp, "20250101")
+            self.assertIn("3/3 rows changed", stdout)
+            self.assertIn("purchase_date = DATE('20250101')", stdout)
+
+            # 2번 고객 나이 변경 + 4번 신규, 1/3번은 그대로
+            day2 = [day1[0], [2, 41, "F", "2025-01-01"], day1[2], [4, 22, "M", "2025-01-02"]]
+            self._write_csv(os.path.join(tmp, "input_20250102.csv"), day2)
+            stdout = self._run(tmp, "20250102")
+            self.assertIn("2/4 rows changed", stdout)
+            self.assertIn("purchase_date > DATE('2025-01-01')", stdout)
+            with np.load(os.path.join(tmp, "scores.npz")) as scores:
+                self.assertEqual(sorted(scores["cust_id"].tolist()), ["1", "2", "3", "4"])
+
+            stdout = self._run(tmp, "20250102", full_refresh=True)
+            self.assertIn("4/4 rows changed", stdout)
+            self.assertIn("purchase_date = DATE('20250102')", stdout)
+
+    def test_rejects_dated_output_path_when_incremental(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            self._write_global_config(tmp)
+            with open(os.path.join(tmp, "inference.yaml"), "w") as f:
+                yaml.safe_dump({"name": "inference", "config": {
+                    "output_path": os.path.join(tmp, "scores_{target_date}.npz"),
+                    "incremental": {"updated_at_column": "updated_at"},
+                }}, f)
+            out = subprocess.run(
+                [sys.executable, os.path.join(REPO_ROOT, "steps/inference/inference.py"),
+                 "--config_file", os.path.join(tmp, "inference.yaml"),
+                 "--global_config_file", os.path.join(tmp, "config.yaml"), "--target_date", "20250101"],
+                cwd=REPO_ROOT, env=dict(os.environ, PYTHONPATH=REPO_ROOT, PIPELINE_WATERMARK_DB=os.path.join(tmp, "wm.sqlite")),
+                capture_output=True, text=True,
+            )
+            self.assertNotEqual(out.returncode, 0)
+            self.assertIn("must not contain {target_date}", out.stderr)
+
+    def test_uses_feature_state_recorded_with_model(self):
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            self._write_global_config(tmp)
+            model_dir = os.path.join(tmp, "model")
+            with open(os.path.join(tmp, "inference.yaml"), "w") as f:
+                yaml.safe_dump({"name": "inference", "config": {
+                    "input_path": os.path.join(tmp, "input_{target_date}.csv"),
+                    "state_dir": os.path.join(tmp, "features"),
+                    "model_dir": model_dir,
+                }}, f)
+
+            cache = FeatureStateCache(os.path.join(tmp, "features"))
+            self._write_csv(os.path.join(tmp, "input_20250101.csv"), [[1, 30, "M", "2025-01-01"]])
+            _, trained, _ = cache.get_or_fit(load_csv_columns(os.path.join(tmp, "input_20250101.csv")))
+            write_model_feature_state(model_dir, trained)
+            # 모델 학습 이후 preprocess 가 새 state 를 fit (latest 가 바뀜)
+            self._write_csv(os.path.join(tmp, "input_20250102.csv"), [[2, 41, "F", "2025-01-02"]])
+            _, newer, _ = cache.get_or_fit(load_csv_columns(os.path.join(tmp, "input_20250102.csv")))
+            self.assertNotEqual(newer, trained)
+
+            stdout = self._run(tmp, "20250102")
+            self.assertIn(f"Feature state: {trained}", stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()